@@ -1,4 +1,120 @@
-from typing import List, Dict, Tuple, Optional, Callable
+from typing import List, Dict, Tuple, Optional, Callable, Iterator, KeysView, ValuesView, Iterable
+from collections import OrderedDict, deque
+from heapq import heappush, heappop, heapify
+from itertools import count
+import asyncio
+import math
+import threading
+import time
+
+class OpCounters:
+    """
+    Opt-in operation counters for the algorithm cores.
+
+    Pass an OpCounters to an algorithm (or set it on an object) to count what
+    it does: relaxations, heap pushes and pops, union/find calls, probes and
+    so on. Left as None, the default, the only cost is an `is not None`
+    check per operation group, so the hooks can stay in production code.
+
+    Attributes:
+        counts (Dict[str, int]): Event name -> number of times it happened.
+        samples (Dict[str, List[float]]): Sample name -> [count, total, max],
+            for values such as latencies and path lengths.
+        sinks (List[Callable[[dict], None]]): Called with snapshot() on flush(),
+            e.g. print, a list's append, or a function feeding a metrics system.
+    """
+
+    def __init__(self, sinks: Iterable[Callable[[dict], None]] = ()):
+        self.counts: Dict[str, int] = {}
+        self.samples: Dict[str, List[float]] = {}
+        self.sinks = list(sinks)
+
+    def add(self, name: str, n: int = 1) -> None:
+        """Counts n occurrences of the event name."""
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def observe(self, name: str, value: float) -> None:
+        """Records one sample of name (a latency, a path length, ...)."""
+        stat = self.samples.get(name)
+        if stat is None:
+            self.samples[name] = [1, value, value]
+        else:
+            stat[0] += 1
+            stat[1] += value
+            if value > stat[2]:
+                stat[2] = value
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: {"counts": {name: n}, "samples": {name: {"count", "total", "mean", "max"}}}.
+        """
+        return {
+            "counts": dict(self.counts),
+            "samples": {name: {"count": c, "total": t, "mean": t / c, "max": m}
+                        for name, (c, t, m) in self.samples.items()},
+        }
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.samples.clear()
+
+    def flush(self) -> dict:
+        """
+        Sends a snapshot to every sink and starts counting from zero again.
+
+        Returns:
+            dict: The snapshot that was sent.
+        """
+        snap = self.snapshot()
+        for sink in self.sinks:
+            sink(snap)
+        self.reset()
+        return snap
+
+
+class _EdgeDict(dict):
+    """
+    The dict behind Vertex.children. Every edit made to any of them bumps
+    the shared edits counter, so a Graph can tell in O(1) that nothing it
+    cached from the children can have changed, hand edits included.
+    """
+
+    __slots__ = ()
+    edits = 0
+
+    def __setitem__(self, key, value):
+        _EdgeDict.edits += 1
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        _EdgeDict.edits += 1
+        dict.__delitem__(self, key)
+
+    def __ior__(self, other):
+        _EdgeDict.edits += 1
+        return dict.__ior__(self, other)
+
+    def pop(self, *args):
+        _EdgeDict.edits += 1
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        _EdgeDict.edits += 1
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        _EdgeDict.edits += 1
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        _EdgeDict.edits += 1
+        dict.update(self, *args, **kwargs)
+
+    def clear(self):
+        _EdgeDict.edits += 1
+        dict.clear(self)
+
 
 class Vertex:
     """
@@ -19,10 +135,23 @@ class Vertex:
         Args:
             name (str): The label or identifier of the vertex.
             children (Optional[Dict[str, Tuple[str, str, float]]]): 
-                A mapping between child vertex names and edges.
+                A mapping between child vertex names and edges. It is
+                copied, so later edits must go through self.children.
         """
         self.name = name
-        self.children: Dict[str, Tuple[str, str, float]] = children if children is not None else {}
+        self.children = children if children is not None else {}
+
+    @property
+    def children(self) -> Dict[str, Tuple[str, str, float]]:
+        return self._children
+
+    @children.setter
+    def children(self, children: Dict[str, Tuple[str, str, float]]) -> None:
+        # a plain dict is copied into an _EdgeDict so that edits to it are seen
+        if type(children) is not _EdgeDict:
+            children = _EdgeDict(children)
+        _EdgeDict.edits += 1
+        self._children = children
 
     def get_children(self) -> List[Tuple[str, str, float]]:
         """
@@ -34,22 +163,150 @@ class Vertex:
         # note-to-self: the dictionary method values() returns a iterable of the type dict_values
         return list(self.children.values())
 
+    def iter_edges(self) -> ValuesView[Tuple[str, str, float]]:
+        """
+        Returns the edges from this vertex without copying them.
+
+        The result is a live view of the children dictionary: iterating it
+        allocates nothing per edge, but the vertex must not be changed
+        while the view is being iterated.
+
+        Returns:
+            ValuesView[Tuple[str, str, float]]: The edges from this vertex.
+        """
+        return self.children.values()
+
+    def iter_neighbors(self) -> KeysView[str]:
+        """
+        Returns the names of this vertex's children without copying them.
+
+        Returns:
+            KeysView[str]: A live view of the child vertex names.
+        """
+        return self.children.keys()
+
+    def iter_neighbor_ids(self, ids: Dict[str, int]) -> Iterator[int]:
+        """
+        Yields the integer id of every child, looked up in ids.
+
+        Args:
+            ids (Dict[str, int]): A mapping from vertex names to integer ids.
+
+        Returns:
+            Iterator[int]: The ids of the child vertices.
+        """
+        for name in self.children:
+            yield ids[name]
+
 class Graph:
     """
     Represents a graph consisting of multiple vertices.
 
     Attributes:
         vertices (List[Vertex]): The list of vertices in the graph.
+        generation (int): A counter that goes up every time the graph is
+            marked as changed. Derived data (such as the cached edge list)
+            remembers the generation it was built for.
+        changes (Deque[tuple]): The most recent mutations, oldest first, as
+            (generation, op, *args) tuples. See changes_since.
     """
 
-    def __init__(self, vertices: List[Vertex]):
+    def __init__(self, vertices: List[Vertex], log_size: int = 1024):
         """
         Initializes a Graph.
     
         Args:
             vertices (List[Vertex]): The list of vertices that make up the graph.
+            log_size (int): How many mutations the change log keeps.
         """
         self.vertices = vertices
+        self.generation = 0
+        self.changes = deque(maxlen=log_size)
+        self._edge_list = None  # (stamp, vertices, edges) built by get_edge_list
+        self._index = None  # name -> Vertex, built lazily by get_vertex
+        self._index_size = 0  # len(vertices) when _index was built
+
+    def _record(self, op: str, *args) -> None:
+        self.generation += 1
+        self.changes.append((self.generation, op) + args)
+
+    def touch(self) -> None:
+        """
+        Marks the graph as changed so that cached derived data is rebuilt.
+        Call this after editing Vertex.children or the vertex list by hand.
+        """
+        self._index = None
+        self._record("touch")
+
+    def changes_since(self, generation: int) -> Optional[List[tuple]]:
+        """
+        Returns the mutations made after the given generation, oldest first.
+
+        The entries are
+            (generation, "add_vertex", name)
+            (generation, "remove_vertex", name)
+            (generation, "add_edge", u, v, weight, directed)
+            (generation, "remove_edge", u, v, directed)
+            (generation, "set_weight", u, v, weight, directed)
+        and an undirected edge operation covers both u->v and v->u.
+
+        Args:
+            generation (int): The generation the caller's data was built for.
+
+        Returns:
+            Optional[List[tuple]]: The changes, or None if they can't be
+            replayed (the log has dropped some of them or the graph was
+            touch()ed) and the caller has to rebuild from scratch.
+        """
+        if generation == self.generation:
+            return []
+        if generation > self.generation or not self.changes or self.changes[0][0] > generation + 1:
+            return None
+        changes = []
+        # walk back from the newest entry until we reach what the caller has
+        for change in reversed(self.changes):
+            if change[0] <= generation:
+                break
+            if change[1] == "touch":
+                return None
+            changes.append(change)
+        changes.reverse()
+        return changes
+
+    def _stamp(self) -> Tuple[int, int]:
+        # _EdgeDict.edits moves on any edit to any vertex's children, hand
+        # edits included; edits to the vertex list are checked separately
+        return (self.generation, _EdgeDict.edits)
+
+    def get_edge_list(self) -> Tuple[Tuple[str, str, float], ...]:
+        """
+        Returns the undirected edges of the graph. The list is built once
+        and reused until the graph changes, which includes any edit to a
+        vertex's children or to the vertex list, with or without touch().
+
+        Each edge appears once as (u, v, weight) with u < v, self-loops are
+        left out, and the edges are sorted by (weight, u, v). The result is
+        a tuple shared by every caller, so it must not be modified.
+
+        Returns:
+            Tuple[Tuple[str, str, float], ...]: The canonical sorted edge list.
+        """
+        stamp = self._stamp()
+        cached = self._edge_list
+        # the list comparison is by identity, so it is one pass over pointers
+        if cached is not None and cached[0] == stamp and cached[1] == self.vertices:
+            return cached[2]
+
+        edges = set()
+        for vertex in self.vertices:
+            for u, v, weight in vertex.iter_edges():
+                if u < v:
+                    edges.add((u, v, weight))
+                elif v < u:
+                    edges.add((v, u, weight))
+        edges = tuple(sorted(edges, key=lambda edge: (edge[2], edge[0], edge[1])))
+        self._edge_list = (stamp, list(self.vertices), edges)
+        return edges
 
     def get_vertices(self) -> List[Vertex]:
         """
@@ -60,6 +317,134 @@ class Graph:
         """
         return self.vertices
 
+    def get_vertex(self, name: str) -> Optional[Vertex]:
+        """
+        Looks up a vertex by name through a name index, which is kept up to
+        date by the mutation methods and rebuilt if the vertex list was
+        edited by hand.
+
+        Args:
+            name (str): The name of the vertex.
+
+        Returns:
+            Optional[Vertex]: The vertex, or None if there is no such vertex.
+        """
+        if self._index is None or self._index_size != len(self.vertices):
+            self._index = {}
+            for vertex in self.vertices:
+                # first one wins, like the linear scans did
+                self._index.setdefault(vertex.name, vertex)
+            self._index_size = len(self.vertices)
+        vertex = self._index.get(name)
+        if vertex is not None and vertex.name != name:
+            # renamed behind our back
+            self._index = None
+            return self.get_vertex(name)
+        return vertex
+
+    def add_vertex(self, name: str) -> Vertex:
+        """
+        Adds a vertex with no edges, unless one with that name already exists.
+
+        Args:
+            name (str): The name of the vertex.
+
+        Returns:
+            Vertex: The new or existing vertex.
+        """
+        vertex = self.get_vertex(name)
+        if vertex is not None:
+            return vertex
+        vertex = Vertex(name)
+        self.vertices.append(vertex)
+        self._index[name] = vertex
+        self._index_size = len(self.vertices)
+        self._record("add_vertex", name)
+        return vertex
+
+    def remove_vertex(self, name: str) -> bool:
+        """
+        Removes a vertex and every edge into or out of it.
+
+        Args:
+            name (str): The name of the vertex.
+
+        Returns:
+            bool: True if the vertex existed.
+        """
+        vertex = self.get_vertex(name)
+        if vertex is None:
+            return False
+        self.vertices.remove(vertex)
+        del self._index[name]
+        self._index_size = len(self.vertices)
+        # edges into the vertex aren't indexed, so every vertex is checked
+        for other in self.vertices:
+            other.children.pop(name, None)
+        self._record("remove_vertex", name)
+        return True
+
+    def add_edge(self, u_name: str, v_name: str, weight: float, directed: bool = False) -> None:
+        """
+        Adds the edge u-v (creating either vertex if needed), replacing any
+        edge already there.
+
+        Args:
+            u_name (str): The name of the parent vertex.
+            v_name (str): The name of the child vertex.
+            weight (float): The weight of the edge.
+            directed (bool): If False, the edge v-u is added as well.
+        """
+        u = self.add_vertex(u_name)
+        v = self.add_vertex(v_name)
+        u.children[v_name] = (u_name, v_name, weight)
+        if not directed:
+            v.children[u_name] = (v_name, u_name, weight)
+        self._record("add_edge", u_name, v_name, weight, directed)
+
+    def remove_edge(self, u_name: str, v_name: str, directed: bool = False) -> bool:
+        """
+        Removes the edge u-v.
+
+        Args:
+            u_name (str): The name of the parent vertex.
+            v_name (str): The name of the child vertex.
+            directed (bool): If False, the edge v-u is removed as well.
+
+        Returns:
+            bool: True if anything was removed.
+        """
+        u = self.get_vertex(u_name)
+        v = self.get_vertex(v_name)
+        removed = u is not None and u.children.pop(v_name, None) is not None
+        if not directed and v is not None:
+            removed = v.children.pop(u_name, None) is not None or removed
+        if removed:
+            self._record("remove_edge", u_name, v_name, directed)
+        return removed
+
+    def set_weight(self, u_name: str, v_name: str, weight: float, directed: bool = False) -> None:
+        """
+        Changes the weight of the existing edge u-v.
+
+        Args:
+            u_name (str): The name of the parent vertex.
+            v_name (str): The name of the child vertex.
+            weight (float): The new weight.
+            directed (bool): If False, the edge v-u (if present) is changed as well.
+
+        Raises:
+            KeyError: If there is no edge u-v, or (unless directed) no vertex v.
+        """
+        u = self.get_vertex(u_name)
+        v = self.get_vertex(v_name)
+        if u is None or v_name not in u.children or (not directed and v is None):
+            raise KeyError((u_name, v_name))
+        u.children[v_name] = (u_name, v_name, weight)
+        if not directed and u_name in v.children:
+            v.children[u_name] = (v_name, u_name, weight)
+        self._record("set_weight", u_name, v_name, weight, directed)
+
     def is_child(self, u_name: str, v_name: str) -> bool:
         """
         Checks if vertex v_name is a child of vertex u_name.
@@ -71,14 +456,7 @@ class Graph:
         Returns:
             bool: True if the vertex v_name is a child of the vertex u_name, False otherwise.
         """
-        u = None
-        vertices = self.get_vertices()
-
-        # traverse through the vertices to find the vertex object u
-        for vertex in vertices:
-            if vertex.name == u_name:
-                u = vertex
-                break
+        u = self.get_vertex(u_name)
         if u is None:
             return False
 
@@ -97,21 +475,562 @@ class Graph:
             Optional[Tuple[str, str, float]]: The edge if it exists, 
             or None if no such edge is found.
         """
-        u = None
-        vertices = self.get_vertices()
-
-        # traverse through the vertices to find the vertex object u
-        for vertex in vertices:
-            if vertex.name == u_name:
-                u = vertex
-                break
-        
+        u = self.get_vertex(u_name)
         if u is None:
             return None
         
         return u.children.get(v_name)
         
 
+# ----------------------------------------------------------------------
+# Shortest path core
+# ----------------------------------------------------------------------
+def _out_edges(graph: Graph) -> Callable[[str], Iterable[Tuple[str, str, float]]]:
+    """Returns a function giving the edges leaving a vertex of graph."""
+    def edges_of(name: str) -> Iterable[Tuple[str, str, float]]:
+        vertex = graph.get_vertex(name)
+        return () if vertex is None else vertex.iter_edges()
+    return edges_of
+
+
+def _in_edges(graph: Graph) -> Callable[[str], Iterable[Tuple[str, str, float]]]:
+    """
+    Returns a function giving the edges entering a vertex of graph, each
+    flipped to (v, u, weight) so a search over them runs against the arrows.
+    """
+    incoming = {}
+    for vertex in graph.get_vertices():
+        for u, v, weight in vertex.iter_edges():
+            incoming.setdefault(v, []).append((v, u, weight))
+    return lambda name: incoming.get(name, ())
+
+
+def _dijkstra(edges_of: Callable[[str], Iterable[Tuple[str, str, float]]], source: str,
+              target: Optional[str] = None, heuristic: Optional[Dict[str, float]] = None,
+              banned_vertices: Iterable[str] = frozenset(), banned_edges: Iterable[Tuple[str, str]] = frozenset(),
+              counters: Optional[OpCounters] = None,
+              targets: Iterable[str] = ()) -> Tuple[Dict[str, float], Dict[str, Optional[str]]]:
+    """
+    Cheapest-first search from source over a binary heap. An improved
+    distance is pushed as a new entry and the outdated one is skipped when
+    it comes off the heap.
+
+    Args:
+        edges_of (Callable): Returns the (u, v, weight) edges leaving a vertex.
+        source (str): The vertex to search from.
+        target (Optional[str]): Stop as soon as this vertex is settled.
+        heuristic (Optional[Dict[str, float]]): Exact or lower-bound costs from
+            each vertex to target (A*). Vertices missing from it cannot reach
+            target and are never pushed.
+        banned_vertices (Iterable[str]): Vertices the search may not enter.
+        banned_edges (Iterable[Tuple[str, str]]): (u, v) pairs it may not use.
+        counters (Optional[OpCounters]): Counts pushes, pops, stale pops and relaxations.
+        targets (Iterable[str]): Stop as soon as all of these are settled.
+
+    Returns:
+        Tuple[Dict[str, float], Dict[str, Optional[str]]]: The cost of the
+        cheapest path found to each reached vertex, and the vertex before it
+        on that path. The costs of target and targets are final whenever they
+        appear.
+    """
+    dist = {source: 0.0}
+    parent = {source: None}
+    if heuristic is not None and source not in heuristic:
+        return dist, parent
+    settled = set()
+    pending_targets = set(targets)
+    heap = [(0.0 if heuristic is None else heuristic[source], 0.0, source)]
+    pushes = 1
+    stale = 0
+    relaxations = 0
+
+    while heap:
+        _, cost, name = heappop(heap)
+        if name in settled:
+            stale += 1
+            continue
+        settled.add(name)
+        if name == target:
+            break
+        if pending_targets and name in pending_targets:
+            pending_targets.discard(name)
+            if not pending_targets:
+                break
+        for edge in edges_of(name):
+            child = edge[1]
+            if child in settled or child in banned_vertices:
+                continue
+            if banned_edges and (name, child) in banned_edges:
+                continue
+            relaxations += 1
+            new_cost = cost + edge[2]
+            if child in dist and new_cost >= dist[child]:
+                continue
+            if heuristic is None:
+                priority = new_cost
+            else:
+                estimate = heuristic.get(child)
+                if estimate is None:
+                    continue
+                priority = new_cost + estimate
+            dist[child] = new_cost
+            parent[child] = name
+            heappush(heap, (priority, new_cost, child))
+            pushes += 1
+
+    if counters is not None:
+        counters.add("dijkstra.searches")
+        counters.add("dijkstra.pushes", pushes)
+        counters.add("dijkstra.pops", len(settled) + stale)
+        counters.add("dijkstra.stale_pops", stale)
+        counters.add("dijkstra.relaxations", relaxations)
+    return dist, parent
+
+
+def _walk(parent: Dict[str, Optional[str]], end: str) -> List[str]:
+    """Follows parent pointers back from end and returns the path in forward order."""
+    path = []
+    while end is not None:
+        path.append(end)
+        end = parent[end]
+    return path[::-1]
+
+
+class SearchFrontier:
+    """
+    A cheapest-first search from one vertex that can be paused and resumed.
+
+    Vertices are settled one at a time in order of cost. Whatever has been
+    settled stays settled, so a later question about the same source (another
+    target, more matches for a filter) continues from where the last one
+    stopped instead of starting over. The frontier describes the graph at
+    one generation; check is_stale before reusing it.
+
+    Attributes:
+        graph (Graph): The graph being searched.
+        generation (int): graph.generation when the search started.
+        source (str): The vertex the search starts from.
+        dist (Dict[str, float]): Best known cost of every reached vertex;
+            final for settled ones.
+        parent (Dict[str, Optional[str]]): The vertex before each reached
+            vertex on its best known path.
+        order (List[str]): The settled vertices, cheapest first.
+    """
+
+    def __init__(self, graph: Graph, source: str, counters: Optional[OpCounters] = None):
+        self.graph = graph
+        self.generation = graph.generation
+        self.source = source
+        self.counters = counters
+        self.dist: Dict[str, float] = {source: 0.0}
+        self.parent: Dict[str, Optional[str]] = {source: None}
+        self.order: List[str] = []
+        self._settled = set()
+        self._heap = [(0.0, source)]
+        self._edges_of = _out_edges(graph)
+        # RouteService advances frontiers from executor threads
+        self._lock = threading.Lock()
+
+    def is_stale(self, graph: Graph) -> bool:
+        """Returns True if the search wasn't started on graph as it is now."""
+        return graph is not self.graph or graph.generation != self.generation
+
+    def is_settled(self, name: str) -> bool:
+        return name in self._settled
+
+    def _step(self) -> Optional[str]:
+        """Settles the next cheapest vertex and returns it, or None when the search is exhausted."""
+        heap = self._heap
+        dist = self.dist
+        while heap:
+            cost, name = heappop(heap)
+            if name in self._settled:
+                continue
+            self._settled.add(name)
+            self.order.append(name)
+            pushes = 0
+            for edge in self._edges_of(name):
+                child = edge[1]
+                if child in self._settled:
+                    continue
+                new_cost = cost + edge[2]
+                if child not in dist or new_cost < dist[child]:
+                    dist[child] = new_cost
+                    self.parent[child] = name
+                    heappush(heap, (new_cost, child))
+                    pushes += 1
+            if self.counters is not None:
+                self.counters.add("frontier.settled")
+                self.counters.add("frontier.pushes", pushes)
+            return name
+        return None
+
+    def settle(self, names: Iterable[str]) -> None:
+        """Advances the search until every one of names is settled or known to be unreachable."""
+        with self._lock:
+            remaining = {name for name in names if name not in self._settled}
+            while remaining:
+                name = self._step()
+                if name is None:
+                    break
+                remaining.discard(name)
+
+    def settled_matching(self, predicate: Callable[[str], bool], k: int) -> List[str]:
+        """
+        Returns the first k settled vertices (cheapest first) that satisfy
+        predicate, advancing the search only as far as needed.
+        """
+        found = []
+        if k <= 0:
+            return found
+        with self._lock:
+            for name in self.order:
+                if predicate(name):
+                    found.append(name)
+                    if len(found) == k:
+                        return found
+            while True:
+                name = self._step()
+                if name is None:
+                    return found
+                if predicate(name):
+                    found.append(name)
+                    if len(found) == k:
+                        return found
+
+    def path(self, name: str) -> Optional[List[str]]:
+        """The cheapest path to a settled vertex, or None if name isn't settled."""
+        if name not in self._settled:
+            return None
+        return _walk(self.parent, name)
+
+
+# ----------------------------------------------------------------------
+# Contraction hierarchy
+# ----------------------------------------------------------------------
+class ContractionHierarchy:
+    """
+    A speed-up index for repeated cheapest-path queries on a graph that
+    rarely changes.
+
+    Preprocessing contracts the vertices one at a time, least important
+    first. Contracting v removes it and adds a shortcut u -> x for every
+    u -> v -> x that is the only cheapest way from u to x (a short local
+    "witness" search checks for another one). Each vertex ends up with a
+    rank, and every cheapest path then climbs to a highest-ranked vertex
+    and comes back down. A query therefore runs two small searches that
+    only move upwards, one from the source and one (against the arrows)
+    from the target, and meets in the middle. Shortcuts on the resulting
+    path are unpacked back into original edges.
+
+    Vertices that still have many edges when their turn comes (hubs, or the
+    dense middle of graphs without much hierarchy) are left uncontracted in
+    a top-level core, which queries cross with a plain bidirectional search.
+    Once the core holds more than core_fraction of the vertices, contraction
+    stops and everything left joins it: there is no hierarchy to find, and
+    each further contraction would only add shortcuts to the hubs. Road-like
+    and tree-like networks contract well; random graphs with no hierarchy
+    end up with a large core, and pays_off() tells callers to search them
+    directly instead.
+
+    Attributes:
+        graph (Graph): The graph the index was built from.
+        generation (int): graph.generation at build time. The index is
+            stale once the graph has changed.
+        rank (Dict[str, int]): The contraction order of each vertex.
+        up (Dict[str, Dict[str, float]]): Edges v -> x towards higher ranks.
+        down (Dict[str, Dict[str, float]]): Edges u -> v from higher ranks,
+            keyed by v, for the backward search.
+        middle (Dict[Tuple[str, str], str]): The vertex each shortcut skips.
+        shortcut_count (int): How many shortcuts were added.
+        core_size (int): How many vertices were left in the core.
+    """
+
+    def __init__(self, graph: Graph, witness_limit: int = 150, core_degree: int = 32, core_fraction: float = 0.05):
+        """
+        Builds the hierarchy.
+
+        Args:
+            graph (Graph): The graph to index. Edge weights must not be negative.
+            witness_limit (int): How many edges a witness search may relax
+                before giving up. Giving up early only adds a shortcut that
+                wasn't needed; it never makes a query wrong.
+            core_degree (int): Vertices with more edges than this when their
+                turn comes are left uncontracted, in a top-level core.
+            core_fraction (float): The share of the vertices the core may
+                reach before contraction stops and the rest join it.
+        """
+        self.graph = graph
+        self.generation = graph.generation
+        self.witness_limit = witness_limit
+        self.core_degree = core_degree
+        self.core_fraction = core_fraction
+        self.rank: Dict[str, int] = {}
+        self.up: Dict[str, Dict[str, float]] = {}
+        self.down: Dict[str, Dict[str, float]] = {}
+        self.middle: Dict[Tuple[str, str], str] = {}
+        self.shortcut_count = 0
+        self.core_size = 0
+
+        # the remaining (not yet contracted) graph, shortcuts included
+        self._out: Dict[str, Dict[str, float]] = {}
+        self._in: Dict[str, Dict[str, float]] = {}
+        for vertex in graph.get_vertices():
+            self._out.setdefault(vertex.name, {})
+            self._in.setdefault(vertex.name, {})
+            for u, v, weight in vertex.iter_edges():
+                if u == v:
+                    continue
+                self._out.setdefault(v, {})
+                self._in.setdefault(v, {})
+                if v not in self._out[u] or weight < self._out[u][v]:
+                    self._out[u][v] = weight
+                    self._in[v][u] = weight
+        self._contract_all()
+        del self._out, self._in
+
+    def _witness(self, source: str, skip: str, limit: float, targets: set, budget: int) -> Dict[str, float]:
+        """Costs from source in the remaining graph without skip, up to limit."""
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        remaining = len(targets)
+        # the budget is spent per edge relaxed, so a hub can't blow it up
+        while heap and budget > 0:
+            cost, name = heappop(heap)
+            if cost > dist[name]:
+                continue
+            if cost > limit:
+                break
+            if name in targets:
+                remaining -= 1
+                if remaining == 0:
+                    break
+            for child, weight in self._out[name].items():
+                budget -= 1
+                if child == skip:
+                    continue
+                new_cost = cost + weight
+                if new_cost <= limit and (child not in dist or new_cost < dist[child]):
+                    dist[child] = new_cost
+                    heappush(heap, (new_cost, child))
+        return dist
+
+    def _shortcuts(self, v: str, budget: Optional[int] = None) -> List[Tuple[str, str, float]]:
+        """
+        The shortcuts contracting v would need right now. A smaller witness
+        budget gives a quick over-estimate, which is good enough for ordering.
+        """
+        if budget is None:
+            budget = self.witness_limit
+        outs = self._out[v]
+        shortcuts = []
+        if not outs:
+            return shortcuts
+        for u, w_in in self._in[v].items():
+            targets = {x for x in outs if x != u}
+            if not targets:
+                continue
+            limit = w_in + max(outs[x] for x in targets)
+            dist = self._witness(u, v, limit, targets, budget)
+            for x in targets:
+                via = w_in + outs[x]
+                if dist.get(x, math.inf) > via:
+                    shortcuts.append((u, x, via))
+        return shortcuts
+
+    def _contract_all(self) -> None:
+        deleted = {name: 0 for name in self._out}
+        core = set()
+        core_limit = self.core_fraction * len(self._out)
+        # priorities only order the work, so they get a cheaper witness search
+        estimate = max(1, self.witness_limit // 8)
+        # each queued vertex's latest heap entry; older ones are skipped
+        latest: Dict[str, int] = {}
+        entries = count()
+
+        def is_hub(v: str) -> bool:
+            return len(self._out[v]) + len(self._in[v]) > self.core_degree
+
+        def priority(v: str, shortcuts: List[Tuple[str, str, float]]) -> int:
+            # edge difference, plus a term that spreads contraction evenly
+            return len(shortcuts) - len(self._out[v]) - len(self._in[v]) + deleted[v]
+
+        def push(v: str, value: int) -> None:
+            latest[v] = next(entries)
+            heappush(heap, (value, latest[v], v))
+
+        heap = []
+        for v in self._out:
+            if is_hub(v):
+                core.add(v)
+            else:
+                push(v, priority(v, self._shortcuts(v, estimate)))
+        while heap and len(core) <= core_limit:
+            _, entry, v = heappop(heap)
+            if latest.get(v) != entry:
+                # an outdated entry left behind by a neighbour update
+                continue
+            del latest[v]
+            if is_hub(v):
+                core.add(v)
+                continue
+            shortcuts = self._shortcuts(v)
+            current = priority(v, shortcuts)
+            # lazy update: the priority may have grown since v was pushed
+            if heap and current > heap[0][0]:
+                push(v, current)
+                continue
+
+            self.rank[v] = len(self.rank)
+            self.up[v] = self._out.pop(v)
+            self.down[v] = self._in.pop(v)
+            for u in self.down[v]:
+                del self._out[u][v]
+                deleted[u] += 1
+            for x in self.up[v]:
+                del self._in[x][v]
+                deleted[x] += 1
+            for u, x, weight in shortcuts:
+                if x not in self._out[u] or weight < self._out[u][x]:
+                    self._out[u][x] = weight
+                    self._in[x][u] = weight
+                    self.middle[(u, x)] = v
+                    self.shortcut_count += 1
+            # the neighbours' edge differences changed, re-queue them now
+            # rather than letting stale, too-low priorities pull them forward
+            for neighbour in self.up[v].keys() | self.down[v].keys():
+                # hubs bound for the core keep their old entry, re-estimating
+                # them on every contracted neighbour would dominate the build
+                if neighbour not in core and not is_hub(neighbour):
+                    push(neighbour, priority(neighbour, self._shortcuts(neighbour, estimate)))
+
+        # if the core grew too big, everything not yet contracted joins it
+        core.update(latest)
+        # the core shares the top rank; a query crosses it by plain Dijkstra,
+        # so its vertices keep all their remaining edges in both directions
+        for v in core:
+            self.rank[v] = len(self.rank)
+            self.up[v] = self._out[v]
+            self.down[v] = self._in[v]
+        self.core_size = len(core)
+
+    def pays_off(self) -> bool:
+        """
+        Returns True if queries should beat a plain search. They don't once
+        contraction has given up and left a large core, which every query
+        then crosses by a bidirectional search over the hubs and shortcuts.
+        """
+        return self.core_size <= self.core_fraction * len(self.rank)
+
+    def is_stale(self, graph: Graph) -> bool:
+        """Returns True if the index wasn't built from graph as it is now."""
+        return graph is not self.graph or graph.generation != self.generation
+
+    def query(self, source: str, target: str) -> Optional[Tuple[float, List[str]]]:
+        """
+        Finds the cheapest path from source to target.
+
+        Args:
+            source (str): The name of the start vertex.
+            target (str): The name of the destination vertex.
+
+        Returns:
+            Optional[Tuple[float, List[str]]]: (cost, path), or None if there is no path.
+        """
+        if source == target:
+            return (0.0, [source]) if source in self.rank else None
+        if source not in self.rank or target not in self.rank:
+            return None
+
+        # index 0 searches forwards from source, index 1 backwards from target
+        dist = ({source: 0.0}, {target: 0.0})
+        parent = ({source: None}, {target: None})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        edges = (self.up, self.down)
+        best = math.inf
+        meet = None
+        side = 0
+        while heaps[0] or heaps[1]:
+            if not heaps[side]:
+                side = 1 - side
+            heap = heaps[side]
+            cost, name = heappop(heap)
+            if cost > dist[side][name]:
+                continue
+            if cost >= best:
+                # nothing left on this side can improve the meeting point
+                heap.clear()
+                side = 1 - side
+                continue
+            other = dist[1 - side].get(name)
+            if other is not None and cost + other < best:
+                best = cost + other
+                meet = name
+            for child, weight in edges[side][name].items():
+                new_cost = cost + weight
+                if child not in dist[side] or new_cost < dist[side][child]:
+                    dist[side][child] = new_cost
+                    parent[side][child] = name
+                    heappush(heap, (new_cost, child))
+            side = 1 - side
+
+        if meet is None:
+            return None
+        # climb back down both sides, then expand the shortcuts
+        hops = _walk(parent[0], meet)
+        name = parent[1][meet]
+        while name is not None:
+            hops.append(name)
+            name = parent[1][name]
+        path = [source]
+        for a, b in zip(hops, hops[1:]):
+            self._unpack(a, b, path)
+        return best, path
+
+    def _unpack(self, a: str, b: str, path: List[str]) -> None:
+        """Appends the original vertices of the (possibly shortcut) edge a -> b after a."""
+        stack = [(a, b)]
+        while stack:
+            a, b = stack.pop()
+            mid = self.middle.get((a, b))
+            if mid is None:
+                path.append(b)
+            else:
+                stack.append((mid, b))
+                stack.append((a, mid))
+
+
+# ----------------------------------------------------------------------
+# Network discovery
+# ----------------------------------------------------------------------
+class DiscoveredNetwork(Graph):
+    """
+    The Graph built by Device.discover_network, which may stop before the
+    whole network has been explored.
+
+    Attributes:
+        unexplored (Dict[str, List[str]]): Devices that were found but not
+            probed, in the order they would have been probed, mapped to the
+            BFS path that reaches them from the discovering device. Their
+            vertices are in the graph but have no edges yet.
+    """
+
+    def __init__(self, vertices: List[Vertex], unexplored: Optional[Dict[str, List[str]]] = None):
+        """
+        Initializes a DiscoveredNetwork.
+
+        Args:
+            vertices (List[Vertex]): The devices found so far.
+            unexplored (Optional[Dict[str, List[str]]]): The devices left to probe.
+        """
+        super().__init__(vertices)
+        self.unexplored = {} if unexplored is None else unexplored
+
+    def is_complete(self) -> bool:
+        """Returns True if every reachable device has been probed."""
+        return not self.unexplored
+
+
 class Device(Vertex):
     """
     Represents a network device, extending the Vertex class with
@@ -121,7 +1040,14 @@ class Device(Vertex):
         name (str): The label or identifier of the device.
         children (Dict[str, Tuple[str, str, float]]): 
             A mapping between child device names and nearby devices.
-        network (Graph): A graph representing this device's discovered network.
+        network (Graph): A graph representing this device's discovered network,
+            a DiscoveredNetwork once discover_network has run.
+        counters (Optional[OpCounters]): Set to an OpCounters to profile
+            discover_network and find_path; None (the default) disables it.
+        route_index (Optional[ContractionHierarchy]): The index find_path
+            answers from once build_route_index() has been called.
+        frontier (Optional[SearchFrontier]): The search shared by find_paths
+            and nearest, kept while the network is unchanged.
     """
 
     def __init__(self, name: str):
@@ -133,6 +1059,9 @@ class Device(Vertex):
         """
         super().__init__(name)
         self.network = Graph([self])
+        self.counters = None
+        self.route_index = None
+        self.frontier = None
     
     def find_vertex_helper(self, name: str, vertices: List[Vertex]) -> Optional[Vertex]:
             """Given a list of vertices, return the Vertex with name, or None if it doesn't exist"""
@@ -141,27 +1070,80 @@ class Device(Vertex):
                     return vertex
             return None
 
-    def discover_network(self, find_devices_fn: Callable[[List[str]], List[Tuple[str, str, float]]]) -> None:
+    def discover_network(self, find_devices_fn: Callable[[List[str]], List[Tuple[str, str, float]]],
+                         max_depth: Optional[int] = None, max_devices: Optional[int] = None,
+                         probe_budget: Optional[int] = None, deadline: Optional[float] = None,
+                         resume: bool = False) -> "DiscoveredNetwork":
         """
         Discovers the surrounding network starting from this device. Once this 
         function is called, self.network should contain a representation of the 
         device's discovered network.
 
+        Each device is probed with the BFS path that found it, from this device
+        to it, so probes that have to be routed there hop by hop can follow it
+        (see ProbeSessionPool).
+
+        With no limits the whole reachable network is explored. Any limit makes
+        the search stop early; devices that were found but not probed are left
+        in self.network.unexplored, and calling again with resume=True carries
+        on from them instead of starting over.
+
         Args:
             find_devices_fn (Callable[[List[str]], List[Tuple[str, str, float]]]): 
                 A function that takes an ordered list of device names (i.e., a path) 
                 and returns the edges from the last device in the path to its immediate children.
+            max_depth (Optional[int]): Only probe devices fewer than this many hops
+                from this device.
+            max_devices (Optional[int]): Stop probing once this many devices are known.
+            probe_budget (Optional[int]): Call find_devices_fn at most this many times.
+            deadline (Optional[float]): Stop probing after this many seconds.
+            resume (bool): Continue from the unexplored devices of self.network.
+
+        Returns:
+            DiscoveredNetwork: self.network.
         """
 
         # Build the graph using BFS
         
-        queue = [self.name]
-        visited = {self.name}
-        vertices_dict = {self.name: Vertex(self.name)}  # Map name -> Vertex object
+        network = self.network
+        if resume and isinstance(network, DiscoveredNetwork):
+            # the unexplored devices are in BFS order already
+            queue = deque(network.unexplored)
+            # the path to each queued device's parent, shared by its siblings
+            parent_paths = deque(path[:-1] for path in network.unexplored.values())
+            vertices_dict = {vertex.name: vertex for vertex in network.vertices}
+        else:
+            network = None
+            queue = deque([self.name])
+            parent_paths = deque([[]])
+            vertices_dict = {self.name: Vertex(self.name)}  # Map name -> Vertex object
+        known = len(vertices_dict)
+        counters = self.counters
+        probes = 0
+        started = time.monotonic()
         
         while queue:
-            device_name = queue.pop(0)
-            device_edges = find_devices_fn([device_name])
+            # the queue is ordered by depth, so nothing behind this one is shallower
+            if max_depth is not None and len(parent_paths[0]) >= max_depth:
+                break
+            if max_devices is not None and len(vertices_dict) >= max_devices:
+                break
+            if probe_budget is not None and probes >= probe_budget:
+                break
+            if deadline is not None and time.monotonic() - started >= deadline:
+                break
+            device_name = queue.popleft()
+            path = parent_paths.popleft() + [device_name]
+            probes += 1
+
+            if counters is None:
+                device_edges = find_devices_fn(path)
+            else:
+                start = time.perf_counter_ns()
+                device_edges = find_devices_fn(path)
+                counters.add("discover_network.probes")
+                counters.observe("discover_network.probe_ns", time.perf_counter_ns() - start)
+                counters.observe("discover_network.probe_edges", len(device_edges))
             
             # Create or get the parent vertex
             parent_vertex = vertices_dict[device_name]
@@ -172,12 +1154,21 @@ class Device(Vertex):
                 parent_vertex.children[child_name] = edge
                 
                 # create a child vertex if not seen before
-                if child_name not in visited:
+                if child_name not in vertices_dict:
                     vertices_dict[child_name] = Vertex(child_name)
                     queue.append(child_name)
-                    visited.add(child_name)
+                    parent_paths.append(path)
         
-        self.network = Graph(list(vertices_dict.values()))
+        unexplored = {name: parent_path + [name] for name, parent_path in zip(queue, parent_paths)}
+        if network is None:
+            self.network = DiscoveredNetwork(list(vertices_dict.values()), unexplored)
+        else:
+            # the new vertices were appended to vertices_dict after the old ones
+            network.vertices.extend(list(vertices_dict.values())[known:])
+            network.unexplored = unexplored
+            if probes:
+                network.touch()
+        return self.network
 
     def find_path(self, d_name: str) -> Optional[List[str]]:
         """
@@ -191,38 +1182,648 @@ class Device(Vertex):
             Optional[List[str]]: An ordered list of device names representing the path 
             from this device to the target. If no path exists, returns None.
         """
-        pq = [(0, self.name)]
-        cheapest_parents = {self.name: (0, None)}
-
-        # pq stores all the next nodes we could check (and the next one to check)
-        # if pq is not empty, that means there are still more nodes to check
-        # if pq becomes empty before find_path returns, we did not find d_name
-        while pq:
-            pq.sort(key=lambda x: x[0])  # Sort by cost
-            next = pq.pop(0)
-            current_vertex_name = next[1]
-            if current_vertex_name == d_name:
-                path = []
-                last_node = d_name
-                while last_node is not None:
-                    path.append(last_node)
-                    last_node = cheapest_parents[last_node][1]
-                return path[::-1]
+        index = self._useful_route_index()
+        if index is not None:
+            found = index.query(self.name, d_name)
+            return None if found is None else found[1]
+        dist, parent = _dijkstra(_out_edges(self.network), self.name, d_name, counters=self.counters)
+        if d_name not in dist:
+            return None
+        return _walk(parent, d_name)
+
+    def _useful_route_index(self) -> Optional[ContractionHierarchy]:
+        """The route index if one was asked for and it beats a plain search."""
+        if self.route_index is None:
+            return None
+        index = self.build_route_index()
+        return index if index.pays_off() else None
+
+    def _search_frontier(self) -> SearchFrontier:
+        if self.frontier is None or self.frontier.is_stale(self.network):
+            self.frontier = SearchFrontier(self.network, self.name, self.counters)
+        return self.frontier
+
+    def find_paths(self, targets: Iterable[str]) -> Dict[str, Optional[List[str]]]:
+        """
+        Finds the cheapest paths from this device to many devices with one
+        search, which stops as soon as every target is settled. The search is
+        kept and resumed by later find_paths and nearest calls until the
+        network changes, so targets it has already passed cost nothing.
+
+        Args:
+            targets (Iterable[str]): The names of the destination devices.
+
+        Returns:
+            Dict[str, Optional[List[str]]]: The path to each target, or None
+            for targets that can't be reached.
+        """
+        targets = list(targets)
+        frontier = self._search_frontier()
+        frontier.settle(targets)
+        return {target: frontier.path(target) for target in targets}
+
+    def nearest(self, predicate: Callable[[str], bool], k: int = 1) -> List[Tuple[float, str]]:
+        """
+        Finds the k devices, other than this one, that are cheapest to reach
+        among those matching predicate. Shares its search with find_paths.
+
+        Args:
+            predicate (Callable[[str], bool]): Called with a device name,
+                returns True for devices that qualify.
+            k (int): How many devices to return at most.
+
+        Returns:
+            List[Tuple[float, str]]: (cost, name) pairs, cheapest first. Use
+            find_paths to get the paths to them.
+        """
+        frontier = self._search_frontier()
+        found = frontier.settled_matching(lambda name: name != self.name and predicate(name), k)
+        return [(frontier.dist[name], name) for name in found]
+
+    def build_route_index(self) -> ContractionHierarchy:
+        """
+        Builds a contraction hierarchy over the network and makes find_path
+        answer from it from then on, unless the network has too little
+        hierarchy for it to pay off (see ContractionHierarchy.pays_off), in
+        which case find_path keeps searching directly. The index is kept until the network is
+        replaced (e.g. by discover_network) or its generation changes, and is
+        rebuilt on the next query after that. Hand edits to Vertex.children
+        need a network.touch() to be noticed.
+
+        Returns:
+            ContractionHierarchy: The current index.
+        """
+        if self.route_index is None or self.route_index.is_stale(self.network):
+            self.route_index = ContractionHierarchy(self.network)
+            if self.counters is not None:
+                self.counters.add("route_index.builds")
+        return self.route_index
+
+    def find_k_paths(self, d_name: str, k: int) -> List[Tuple[float, List[str]]]:
+        """
+        Finds the k cheapest loopless paths from this device to d_name with
+        Yen's algorithm.
+
+        Each new path branches off an earlier one at some spur device. Rather
+        than running a full search per spur, a single search backwards from
+        d_name gives every device its cheapest cost to d_name and the tree
+        path that achieves it. When a spur device's tree path avoids
+        everything the branch rules out, that path is used as-is. Otherwise,
+        the spur search is an A* search guided by those exact costs, so it
+        goes nearly straight to d_name. The cost of the shared prefix is
+        carried along the previous path instead of being searched again.
+
+        Args:
+            d_name (str): The name of the destination device.
+            k (int): How many paths to return at most.
+
+        Returns:
+            List[Tuple[float, List[str]]]: (cost, path) pairs, cheapest first.
+            Fewer than k are returned if there are no more loopless paths.
+        """
+        graph = self.network
+        counters = self.counters
+        out_edges = _out_edges(graph)
+        # distance from every device to d_name, and the next hop on the way
+        to_target, next_hop = _dijkstra(_in_edges(graph), d_name, counters=counters)
+        if k <= 0 or self.name not in to_target:
+            return []
+
+        def tree_path(name: str) -> List[str]:
+            path = [name]
+            while name != d_name:
+                name = next_hop[name]
+                path.append(name)
+            return path
+
+        best = [(to_target[self.name], tree_path(self.name))]
+        seen = {tuple(best[0][1])}
+        candidates = []  # heap of (cost, length, path)
+        while len(best) < k:
+            _, previous = best[-1]
+            root_cost = 0.0
+            for i in range(len(previous) - 1):
+                spur = previous[i]
+                root = previous[:i + 1]
+                # every accepted path sharing this root already used these edges out of spur
+                banned_edges = {(spur, path[i + 1]) for _, path in best if path[:i + 1] == root}
+                banned_vertices = set(root[:-1])
+
+                tail = tree_path(spur)
+                if (spur, tail[1]) not in banned_edges and banned_vertices.isdisjoint(tail):
+                    spur_cost = to_target[spur]
+                    if counters is not None:
+                        counters.add("k_paths.tree_shortcuts")
+                else:
+                    dist, parent = _dijkstra(out_edges, spur, d_name, heuristic=to_target,
+                                             banned_vertices=banned_vertices, banned_edges=banned_edges,
+                                             counters=counters)
+                    if counters is not None:
+                        counters.add("k_paths.spur_searches")
+                    tail = _walk(parent, d_name) if d_name in dist else None
+                    spur_cost = dist.get(d_name)
+
+                if tail is not None:
+                    path = root[:-1] + tail
+                    key = tuple(path)
+                    if key not in seen:
+                        seen.add(key)
+                        heappush(candidates, (root_cost + spur_cost, len(path), path))
+                root_cost += graph.get_edge(spur, previous[i + 1])[2]
+
+            if not candidates:
+                break
+            cost, _, path = heappop(candidates)
+            best.append((cost, path))
+        return best
+
+    def find_equal_cost_paths(self, d_name: str, limit: Optional[int] = None) -> List[List[str]]:
+        """
+        Finds every cheapest path from this device to d_name (the equal-cost
+        multipath set), e.g. to spread traffic over all of them.
+
+        One search backwards from d_name gives each device its cheapest cost
+        to d_name. An edge u -> v is on some cheapest path exactly when its
+        weight plus v's cost equals u's cost, so the paths are enumerated by
+        following only those edges.
+
+        Args:
+            d_name (str): The name of the destination device.
+            limit (Optional[int]): Stop after this many paths. The number of
+                equal-cost paths can grow exponentially (e.g. in a grid).
+
+        Returns:
+            List[List[str]]: The cheapest paths, or an empty list if d_name
+            can't be reached.
+        """
+        to_target, _ = _dijkstra(_in_edges(self.network), d_name, counters=self.counters)
+        if self.name not in to_target:
+            return []
+        if self.name == d_name:
+            return [[d_name]]
+        out_edges = _out_edges(self.network)
+        path = [self.name]
+        on_path = {self.name}
+
+        def tight_children(name: str) -> Iterator[str]:
+            for _, child, weight in out_edges(name):
+                remaining = to_target.get(child)
+                if remaining is not None and child not in on_path and \
+                        math.isclose(weight + remaining, to_target[name], rel_tol=1e-9, abs_tol=1e-9):
+                    yield child
+
+        paths = []
+        stack = [tight_children(self.name)]
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            if child == d_name:
+                paths.append(path + [child])
+                if limit is not None and len(paths) >= limit:
+                    break
+                continue
+            path.append(child)
+            on_path.add(child)
+            stack.append(tight_children(child))
+        return paths
+
+
+# ----------------------------------------------------------------------
+# Probe cache and sessions
+# ----------------------------------------------------------------------
+class _Probe:
+    """One probe in progress, which other callers of the same key wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ProbeCache:
+    """
+    A shared cache in front of a find_devices_fn, for probes that are real
+    network round trips.
+
+    A ProbeCache is itself a find_devices_fn, so it can be passed straight
+    to Device.discover_network, and one instance can be shared by every
+    Device (and thread) that discovers the same network. Results are kept
+    for ttl seconds and evicted least recently used first once max_entries
+    (or max_edges in total) is exceeded. If a probe for a key is already
+    running, other callers wait for it instead of probing again; if it
+    fails, they all see the same exception, and nothing is cached.
+
+    Attributes:
+        probe (Callable[[List[str]], List[Tuple[str, str, float]]]): The wrapped find_devices_fn.
+        ttl (Optional[float]): Seconds a result stays valid; None keeps it until evicted.
+        max_entries (int): The most results kept.
+        max_edges (Optional[int]): The most edges kept over all results.
+        stats (Dict[str, int]): hits, misses, expired, coalesced, evictions and errors counts.
+    """
+
+    def __init__(self, probe: Callable[[List[str]], List[Tuple[str, str, float]]], ttl: Optional[float] = 60.0,
+                 max_entries: int = 10000, max_edges: Optional[int] = None,
+                 key: Optional[Callable[[List[str]], object]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            probe (Callable): The find_devices_fn to wrap.
+            ttl (Optional[float]): Seconds a result stays valid.
+            max_entries (int): The most results kept.
+            max_edges (Optional[int]): The most edges kept over all results.
+            key (Optional[Callable[[List[str]], object]]): Maps a probe path to
+                its cache key. The default, path[-1], assumes a device's
+                edges don't depend on the route used to reach it.
+            clock (Callable[[], float]): The time source, in seconds.
+        """
+        self.probe = probe
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_edges = max_edges
+        self.key = key if key is not None else (lambda path: path[-1])
+        self.clock = clock
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "coalesced": 0, "evictions": 0, "errors": 0}
+        self._entries: "OrderedDict[object, Tuple[float, Tuple[Tuple[str, str, float], ...]]]" = OrderedDict()
+        self._edge_count = 0
+        self._in_flight: Dict[object, _Probe] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, path: List[str]) -> List[Tuple[str, str, float]]:
+        key = self.key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.ttl is None or self.clock() - entry[0] < self.ttl:
+                    self.stats["hits"] += 1
+                    self._entries.move_to_end(key)
+                    return list(entry[1])
+                self.stats["expired"] += 1
+                self._drop(key)
+            probe = self._in_flight.get(key)
+            leader = probe is None
+            if leader:
+                self.stats["misses"] += 1
+                probe = self._in_flight[key] = _Probe()
             else:
-                current_vertex = self.find_vertex_helper(current_vertex_name, self.network.get_vertices())
-                edges = current_vertex.children.values()
-                for edge in edges:
-                    # edge[2] would be the weight, edge[1] would be the neighbouring vertex name
-                    cost_thus_far = edge[2] + cheapest_parents[current_vertex_name][0]
-                    neighbour = edge[1]
-                    if neighbour in cheapest_parents:
-                        if cost_thus_far < cheapest_parents[neighbour][0]:
-                            pq.append((cost_thus_far, neighbour))
-                            cheapest_parents[neighbour] = (cost_thus_far, current_vertex_name)
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            probe.done.wait()
+            if probe.error is not None:
+                raise probe.error
+            return list(probe.result)
+
+        try:
+            edges = tuple(self.probe(path))
+        except BaseException as exc:
+            with self._lock:
+                self.stats["errors"] += 1
+                del self._in_flight[key]
+            probe.error = exc
+            probe.done.set()
+            raise
+        with self._lock:
+            self._store(key, edges)
+            del self._in_flight[key]
+        probe.result = edges
+        probe.done.set()
+        return list(edges)
+
+    def _store(self, key: object, edges: Tuple[Tuple[str, str, float], ...]) -> None:
+        self._drop(key)
+        self._entries[key] = (self.clock(), edges)
+        self._edge_count += len(edges)
+        while len(self._entries) > self.max_entries or \
+                (self.max_edges is not None and self._edge_count > self.max_edges and len(self._entries) > 1):
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.stats["evictions"] += 1
+
+    def _drop(self, key: object) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._edge_count -= len(entry[1])
+
+    def invalidate(self, key: object) -> None:
+        """Forgets the cached result for key (a device name, with the default key)."""
+        with self._lock:
+            self._drop(key)
+
+    def clear(self) -> None:
+        """Forgets every cached result. The stats are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._edge_count = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of calls answered without a new probe (cache hits and coalesced waits)."""
+        served = self.stats["hits"] + self.stats["coalesced"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+
+class ProbeSessionPool:
+    """
+    A find_devices_fn for probes that have to be routed hop by hop to the
+    device they ask about, e.g. through a chain of jump hosts.
+
+    The pool keeps a session open for each path it has reached. Probing a
+    path extends the session of its longest open prefix one hop at a time,
+    which for discover_network's BFS order is the parent's session, so a
+    deep device costs one new hop instead of a walk from the root. Sessions
+    are evicted least recently used first once there are more than
+    max_sessions, except that a session being connected through or probed
+    is never evicted (the pool can briefly go over max_sessions while many
+    are in use). A session may outlive the prefix it was opened from, so it
+    has to hold whatever it needs of that prefix itself.
+
+    Sessions are opaque to the pool:
+        connect(None, name) opens a session at the first device of a path,
+        connect(session, name) returns a new session one hop further on, at name,
+        probe(session) returns the edges of the session's device, like a find_devices_fn,
+        close(session), if given, is called on every session the pool drops.
+
+    Attributes:
+        max_sessions (int): The most sessions kept open.
+        stats (Dict[str, int]): hops (connect calls), reused (hops an open
+            prefix saved), probes and evictions counts.
+    """
+
+    def __init__(self, connect: Callable[[object, str], object],
+                 probe: Callable[[object], List[Tuple[str, str, float]]],
+                 close: Optional[Callable[[object], None]] = None, max_sessions: int = 4096):
+        """
+        Args:
+            connect (Callable[[object, str], object]): Opens or extends a session by one hop.
+            probe (Callable[[object], List[Tuple[str, str, float]]]): Probes a session's device.
+            close (Optional[Callable[[object], None]]): Closes a dropped session.
+            max_sessions (int): The most sessions kept open, at least 1.
+
+        Raises:
+            ValueError: If max_sessions is less than 1.
+        """
+        if max_sessions < 1:
+            raise ValueError(f"max_sessions must be at least 1, got {max_sessions}")
+        self.connect = connect
+        self.probe = probe
+        self.close = close
+        self.max_sessions = max_sessions
+        self.stats = {"hops": 0, "reused": 0, "probes": 0, "evictions": 0}
+        self._sessions: "OrderedDict[Tuple[str, ...], object]" = OrderedDict()
+        self._pins: Dict[Tuple[str, ...], int] = {}  # key -> callers using that session right now
+        self._lock = threading.Lock()
+
+    def __call__(self, path: List[str]) -> List[Tuple[str, str, float]]:
+        """
+        Probes the device at the end of path through the pool's sessions.
+
+        Raises:
+            ValueError: If path is empty.
+        """
+        if not path:
+            raise ValueError("can't probe an empty path")
+        key = tuple(path)
+        session = self._acquire(key)
+        try:
+            with self._lock:
+                self.stats["probes"] += 1
+            return self.probe(session)
+        finally:
+            self._release(key)
+
+    def _acquire(self, key: Tuple[str, ...]) -> object:
+        """
+        Returns the session at the end of the path key, opening the hops it is
+        missing. The session stays pinned (never evicted) until _release(key).
+        """
+        with self._lock:
+            # the parent's session is the usual hit, so try the longest prefixes first
+            session = None
+            reached = 0
+            for i in range(len(key), 0, -1):
+                if key[:i] in self._sessions:
+                    self._sessions.move_to_end(key[:i])
+                    session, reached = self._sessions[key[:i]], i
+                    self._pins[key[:i]] = self._pins.get(key[:i], 0) + 1
+                    break
+            self.stats["reused"] += reached
+
+        held = key[:reached]  # the pinned prefix, () if none
+        try:
+            for i in range(reached, len(key)):
+                opened = self.connect(session, key[i])
+                hop = key[:i + 1]
+                dropped = []
+                with self._lock:
+                    self.stats["hops"] += 1
+                    if hop in self._sessions:
+                        # another thread opened the same hop meanwhile, use theirs
+                        dropped.append(opened)
+                        self._sessions.move_to_end(hop)
                     else:
-                        cheapest_parents[neighbour] = (cost_thus_far, current_vertex_name)
-                        pq.append((cost_thus_far, neighbour))
-        return None
+                        self._sessions[hop] = opened
+                    session = self._sessions[hop]
+                    self._pins[hop] = self._pins.get(hop, 0) + 1
+                    if held:
+                        self._unpin(held)
+                    held = hop
+                    dropped.extend(self._trim())
+                self._close_sessions(dropped)
+        except BaseException:
+            if held:
+                self._release(held)
+            raise
+        return session
+
+    def _release(self, key: Tuple[str, ...]) -> None:
+        """Unpins the session at key, then evicts down to max_sessions."""
+        with self._lock:
+            self._unpin(key)
+            dropped = self._trim()
+        self._close_sessions(dropped)
+
+    def _unpin(self, key: Tuple[str, ...]) -> None:
+        count = self._pins[key] - 1
+        if count:
+            self._pins[key] = count
+        else:
+            del self._pins[key]
+
+    def _trim(self) -> List[object]:
+        """Evicts unpinned sessions, oldest first, until at most max_sessions are left, and returns them."""
+        over = len(self._sessions) - self.max_sessions
+        if over <= 0:
+            return []
+        victims = []
+        for key in self._sessions:
+            if key not in self._pins:
+                victims.append(key)
+                if len(victims) == over:
+                    break
+        self.stats["evictions"] += len(victims)
+        return [self._sessions.pop(key) for key in victims]
+
+    def _close_sessions(self, sessions: List[object]) -> None:
+        if self.close is not None:
+            for session in sessions:
+                self.close(session)
+
+    def close_all(self) -> None:
+        """Closes and forgets every session not in use. The stats are kept."""
+        with self._lock:
+            idle = [key for key in self._sessions if key not in self._pins]
+            sessions = [self._sessions.pop(key) for key in idle]
+        self._close_sessions(sessions)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+# ----------------------------------------------------------------------
+# Routing service
+# ----------------------------------------------------------------------
+class RouteService:
+    """
+    An asyncio front end that answers many concurrent path queries against
+    one Device.
+
+    Requests are handled in three ways:
+    - An answer already in the cache is returned straight away. The cache
+      is an LRU keyed by (source, dest, network generation), so a change to
+      the network makes older entries unreachable and they age out.
+    - A query identical to one already in flight waits for that one's
+      answer instead of starting its own search.
+    - Anything else joins a batch. The batch is flushed once the event loop
+      comes round (or after batch_window seconds), and each source in it
+      costs one multi-target search that stops once every destination
+      asked of that source is settled.
+
+    Searches run in an executor, so a large network doesn't stall the event
+    loop. If the device has a route index that pays off (see
+    Device.build_route_index), queries are answered from the index instead.
+
+    Attributes:
+        device (Device): The device whose network is searched.
+        cache_size (int): The most paths kept in the cache.
+        batch_window (float): Seconds to wait for more queries before a batch
+            is searched; 0 waits only for the current loop iteration.
+        executor (Optional[concurrent.futures.Executor]): Where searches run;
+            None means the event loop's default executor.
+        stats (Dict[str, int]): hits, misses, coalesced, searches and batched
+            (queries answered by a shared search) counts.
+    """
+
+    def __init__(self, device: "Device", cache_size: int = 4096, batch_window: float = 0.0, executor=None):
+        self.device = device
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.executor = executor
+        self.cache: "OrderedDict[Tuple[str, str, int], Optional[List[str]]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "coalesced": 0, "searches": 0, "batched": 0}
+        self._network = device.network
+        self._in_flight: Dict[Tuple[str, str, int], asyncio.Future] = {}
+        self._pending: Dict[str, List[Tuple[str, str, int]]] = {}  # source -> keys waiting for a search
+        self._flush_scheduled = False
+        self._tasks: "set[asyncio.Task]" = set()  # flushes still running
+
+    async def find_path(self, d_name: str, source: Optional[str] = None) -> Optional[List[str]]:
+        """
+        Finds the cheapest path from source (the device itself by default) to d_name.
+
+        Args:
+            d_name (str): The name of the destination device.
+            source (Optional[str]): The name of the device the path starts from.
+
+        Returns:
+            Optional[List[str]]: The path, or None if d_name can't be reached.
+            The list may be shared with other callers and must not be modified.
+        """
+        network = self.device.network
+        if network is not self._network:
+            # a new network (e.g. from discover_network) restarts its generations
+            self.cache.clear()
+            self._network = network
+        if source is None:
+            source = self.device.name
+        key = (source, d_name, network.generation)
+
+        if key in self.cache:
+            self.stats["hits"] += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            # shield so one caller being cancelled doesn't cancel everyone's answer
+            return await asyncio.shield(future)
+
+        self.stats["misses"] += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._in_flight[key] = future
+        self._pending.setdefault(source, []).append(key)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_later(self.batch_window, self._start_flush, loop)
+        return await asyncio.shield(future)
+
+    def _start_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        # the loop only keeps a weak reference to a task, so hold on to it
+        # until it is done or it may be collected half way through
+        task = loop.create_task(self._flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self) -> None:
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, {}
+        # one search per source, all running in the executor at once
+        await asyncio.gather(*(self._flush_source(source, keys) for source, keys in pending.items()))
+
+    async def _flush_source(self, source: str, keys: List[Tuple[str, str, int]]) -> None:
+        self.stats["searches"] += 1
+        self.stats["batched"] += len(keys)
+        try:
+            targets = list({key[1] for key in keys})
+            paths = await asyncio.get_running_loop().run_in_executor(self.executor, self._search, source, targets)
+        except Exception as exc:
+            for key in keys:
+                future = self._in_flight.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for key in keys:
+            path = paths[key[1]]
+            self.cache[key] = path
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            future = self._in_flight.pop(key)
+            if not future.done():
+                future.set_result(path)
+
+    def _search(self, source: str, targets: List[str]) -> Dict[str, Optional[List[str]]]:
+        """Cheapest paths from source to every target, in one search."""
+        device = self.device
+        index = device._useful_route_index()
+        if source == device.name and index is None:
+            # the device's own frontier may already have settled some targets
+            return device.find_paths(targets)
+        if index is not None:
+            paths = {}
+            for target in targets:
+                found = index.query(source, target)
+                paths[target] = None if found is None else found[1]
+            return paths
+        dist, parent = _dijkstra(_out_edges(device.network), source, targets=targets, counters=device.counters)
+        return {target: _walk(parent, target) if target in dist else None for target in targets}
 
 
 # ----------------------------------------------------------------------
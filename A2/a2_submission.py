@@ -1,6 +1,136 @@
-from typing import List, Dict, Tuple, Optional, Callable
+from typing import List, Dict, Tuple, Optional, Callable, Iterator, KeysView, ValuesView, Iterable, Union
+from array import array
+from bisect import bisect_left
+from collections import deque
+from heapq import heappush, heappop
+import csv
+import itertools
+import mmap
+import multiprocessing
+import random
+import struct
+from multiprocessing import shared_memory
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the batched (array) component APIs
+    np = None
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("this function needs numpy, install it with `pip install numpy`")
 
 ################ CODE FROM A1 ################
+class OpCounters:
+    """
+    Opt-in operation counters for the algorithm cores.
+
+    Pass an OpCounters to an algorithm (or set it on an object) to count what
+    it does: relaxations, heap pushes and pops, union/find calls, probes and
+    so on. Left as None, the default, the only cost is an `is not None`
+    check per operation group, so the hooks can stay in production code.
+
+    Attributes:
+        counts (Dict[str, int]): Event name -> number of times it happened.
+        samples (Dict[str, List[float]]): Sample name -> [count, total, max],
+            for values such as latencies and path lengths.
+        sinks (List[Callable[[dict], None]]): Called with snapshot() on flush(),
+            e.g. print, a list's append, or a function feeding a metrics system.
+    """
+
+    def __init__(self, sinks: Iterable[Callable[[dict], None]] = ()):
+        self.counts: Dict[str, int] = {}
+        self.samples: Dict[str, List[float]] = {}
+        self.sinks = list(sinks)
+
+    def add(self, name: str, n: int = 1) -> None:
+        """Counts n occurrences of the event name."""
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def observe(self, name: str, value: float) -> None:
+        """Records one sample of name (a latency, a path length, ...)."""
+        stat = self.samples.get(name)
+        if stat is None:
+            self.samples[name] = [1, value, value]
+        else:
+            stat[0] += 1
+            stat[1] += value
+            if value > stat[2]:
+                stat[2] = value
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: {"counts": {name: n}, "samples": {name: {"count", "total", "mean", "max"}}}.
+        """
+        return {
+            "counts": dict(self.counts),
+            "samples": {name: {"count": c, "total": t, "mean": t / c, "max": m}
+                        for name, (c, t, m) in self.samples.items()},
+        }
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.samples.clear()
+
+    def flush(self) -> dict:
+        """
+        Sends a snapshot to every sink and starts counting from zero again.
+
+        Returns:
+            dict: The snapshot that was sent.
+        """
+        snap = self.snapshot()
+        for sink in self.sinks:
+            sink(snap)
+        self.reset()
+        return snap
+
+
+class _EdgeDict(dict):
+    """
+    The dict behind Vertex.children. Every edit made to any of them bumps
+    the shared edits counter, so a Graph can tell in O(1) that nothing it
+    cached from the children can have changed, hand edits included.
+    """
+
+    __slots__ = ()
+    edits = 0
+
+    def __setitem__(self, key, value):
+        _EdgeDict.edits += 1
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        _EdgeDict.edits += 1
+        dict.__delitem__(self, key)
+
+    def __ior__(self, other):
+        _EdgeDict.edits += 1
+        return dict.__ior__(self, other)
+
+    def pop(self, *args):
+        _EdgeDict.edits += 1
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        _EdgeDict.edits += 1
+        return dict.popitem(self)
+
+    def setdefault(self, key, default=None):
+        _EdgeDict.edits += 1
+        return dict.setdefault(self, key, default)
+
+    def update(self, *args, **kwargs):
+        _EdgeDict.edits += 1
+        dict.update(self, *args, **kwargs)
+
+    def clear(self):
+        _EdgeDict.edits += 1
+        dict.clear(self)
+
+
 class Vertex:
     """
     Represents a vertex in a graph.
@@ -20,10 +150,23 @@ class Vertex:
         Args:
             name (str): The label or identifier of the vertex.
             children (Optional[Dict[str, Tuple[str, str, float]]]): 
-                A mapping between child vertex names and edges.
+                A mapping between child vertex names and edges. It is
+                copied, so later edits must go through self.children.
         """
         self.name = name
-        self.children: Dict[str, Tuple[str, str, float]] = children if children is not None else {}
+        self.children = children if children is not None else {}
+
+    @property
+    def children(self) -> Dict[str, Tuple[str, str, float]]:
+        return self._children
+
+    @children.setter
+    def children(self, children: Dict[str, Tuple[str, str, float]]) -> None:
+        # a plain dict is copied into an _EdgeDict so that edits to it are seen
+        if type(children) is not _EdgeDict:
+            children = _EdgeDict(children)
+        _EdgeDict.edits += 1
+        self._children = children
 
     def get_children(self) -> List[Tuple[str, str, float]]:
         """
@@ -35,6 +178,41 @@ class Vertex:
         # note-to-self: the dictionary method values() returns a iterable of the type dict_values
         return list(self.children.values())
 
+    def iter_edges(self) -> ValuesView[Tuple[str, str, float]]:
+        """
+        Returns the edges from this vertex without copying them.
+
+        The result is a live view of the children dictionary: iterating it
+        allocates nothing per edge, but the vertex must not be changed
+        while the view is being iterated.
+
+        Returns:
+            ValuesView[Tuple[str, str, float]]: The edges from this vertex.
+        """
+        return self.children.values()
+
+    def iter_neighbors(self) -> KeysView[str]:
+        """
+        Returns the names of this vertex's children without copying them.
+
+        Returns:
+            KeysView[str]: A live view of the child vertex names.
+        """
+        return self.children.keys()
+
+    def iter_neighbor_ids(self, ids: Dict[str, int]) -> Iterator[int]:
+        """
+        Yields the integer id of every child, looked up in ids.
+
+        Args:
+            ids (Dict[str, int]): A mapping from vertex names to integer ids.
+
+        Returns:
+            Iterator[int]: The ids of the child vertices.
+        """
+        for name in self.children:
+            yield ids[name]
+
 
 class Graph:
     """
@@ -42,16 +220,109 @@ class Graph:
 
     Attributes:
         vertices (List[Vertex]): The list of vertices in the graph.
+        generation (int): A counter that goes up every time the graph is
+            marked as changed. Derived data (such as the cached edge list)
+            remembers the generation it was built for.
+        changes (Deque[tuple]): The most recent mutations, oldest first, as
+            (generation, op, *args) tuples. See changes_since.
     """
 
-    def __init__(self, vertices: List[Vertex]):
+    def __init__(self, vertices: List[Vertex], log_size: int = 1024):
         """
         Initializes a Graph.
     
         Args:
             vertices (List[Vertex]): The list of vertices that make up the graph.
+            log_size (int): How many mutations the change log keeps.
         """
         self.vertices = vertices
+        self.generation = 0
+        self.changes = deque(maxlen=log_size)
+        self._edge_list = None  # (stamp, vertices, edges) built by get_edge_list
+        self._index = None  # name -> Vertex, built lazily by get_vertex
+        self._index_size = 0  # len(vertices) when _index was built
+
+    def _record(self, op: str, *args) -> None:
+        self.generation += 1
+        self.changes.append((self.generation, op) + args)
+
+    def touch(self) -> None:
+        """
+        Marks the graph as changed so that cached derived data is rebuilt.
+        Call this after editing Vertex.children or the vertex list by hand.
+        """
+        self._index = None
+        self._record("touch")
+
+    def changes_since(self, generation: int) -> Optional[List[tuple]]:
+        """
+        Returns the mutations made after the given generation, oldest first.
+
+        The entries are
+            (generation, "add_vertex", name)
+            (generation, "remove_vertex", name)
+            (generation, "add_edge", u, v, weight, directed)
+            (generation, "remove_edge", u, v, directed)
+            (generation, "set_weight", u, v, weight, directed)
+        and an undirected edge operation covers both u->v and v->u.
+
+        Args:
+            generation (int): The generation the caller's data was built for.
+
+        Returns:
+            Optional[List[tuple]]: The changes, or None if they can't be
+            replayed (the log has dropped some of them or the graph was
+            touch()ed) and the caller has to rebuild from scratch.
+        """
+        if generation == self.generation:
+            return []
+        if generation > self.generation or not self.changes or self.changes[0][0] > generation + 1:
+            return None
+        changes = []
+        # walk back from the newest entry until we reach what the caller has
+        for change in reversed(self.changes):
+            if change[0] <= generation:
+                break
+            if change[1] == "touch":
+                return None
+            changes.append(change)
+        changes.reverse()
+        return changes
+
+    def _stamp(self) -> Tuple[int, int]:
+        # _EdgeDict.edits moves on any edit to any vertex's children, hand
+        # edits included; edits to the vertex list are checked separately
+        return (self.generation, _EdgeDict.edits)
+
+    def get_edge_list(self) -> Tuple[Tuple[str, str, float], ...]:
+        """
+        Returns the undirected edges of the graph. The list is built once
+        and reused until the graph changes, which includes any edit to a
+        vertex's children or to the vertex list, with or without touch().
+
+        Each edge appears once as (u, v, weight) with u < v, self-loops are
+        left out, and the edges are sorted by (weight, u, v). The result is
+        a tuple shared by every caller, so it must not be modified.
+
+        Returns:
+            Tuple[Tuple[str, str, float], ...]: The canonical sorted edge list.
+        """
+        stamp = self._stamp()
+        cached = self._edge_list
+        # the list comparison is by identity, so it is one pass over pointers
+        if cached is not None and cached[0] == stamp and cached[1] == self.vertices:
+            return cached[2]
+
+        edges = set()
+        for vertex in self.vertices:
+            for u, v, weight in vertex.iter_edges():
+                if u < v:
+                    edges.add((u, v, weight))
+                elif v < u:
+                    edges.add((v, u, weight))
+        edges = tuple(sorted(edges, key=lambda edge: (edge[2], edge[0], edge[1])))
+        self._edge_list = (stamp, list(self.vertices), edges)
+        return edges
 
     def get_vertices(self) -> List[Vertex]:
         """
@@ -62,6 +333,134 @@ class Graph:
         """
         return self.vertices
 
+    def get_vertex(self, name: str) -> Optional[Vertex]:
+        """
+        Looks up a vertex by name through a name index, which is kept up to
+        date by the mutation methods and rebuilt if the vertex list was
+        edited by hand.
+
+        Args:
+            name (str): The name of the vertex.
+
+        Returns:
+            Optional[Vertex]: The vertex, or None if there is no such vertex.
+        """
+        if self._index is None or self._index_size != len(self.vertices):
+            self._index = {}
+            for vertex in self.vertices:
+                # first one wins, like the linear scans did
+                self._index.setdefault(vertex.name, vertex)
+            self._index_size = len(self.vertices)
+        vertex = self._index.get(name)
+        if vertex is not None and vertex.name != name:
+            # renamed behind our back
+            self._index = None
+            return self.get_vertex(name)
+        return vertex
+
+    def add_vertex(self, name: str) -> Vertex:
+        """
+        Adds a vertex with no edges, unless one with that name already exists.
+
+        Args:
+            name (str): The name of the vertex.
+
+        Returns:
+            Vertex: The new or existing vertex.
+        """
+        vertex = self.get_vertex(name)
+        if vertex is not None:
+            return vertex
+        vertex = Vertex(name)
+        self.vertices.append(vertex)
+        self._index[name] = vertex
+        self._index_size = len(self.vertices)
+        self._record("add_vertex", name)
+        return vertex
+
+    def remove_vertex(self, name: str) -> bool:
+        """
+        Removes a vertex and every edge into or out of it.
+
+        Args:
+            name (str): The name of the vertex.
+
+        Returns:
+            bool: True if the vertex existed.
+        """
+        vertex = self.get_vertex(name)
+        if vertex is None:
+            return False
+        self.vertices.remove(vertex)
+        del self._index[name]
+        self._index_size = len(self.vertices)
+        # edges into the vertex aren't indexed, so every vertex is checked
+        for other in self.vertices:
+            other.children.pop(name, None)
+        self._record("remove_vertex", name)
+        return True
+
+    def add_edge(self, u_name: str, v_name: str, weight: float, directed: bool = False) -> None:
+        """
+        Adds the edge u-v (creating either vertex if needed), replacing any
+        edge already there.
+
+        Args:
+            u_name (str): The name of the parent vertex.
+            v_name (str): The name of the child vertex.
+            weight (float): The weight of the edge.
+            directed (bool): If False, the edge v-u is added as well.
+        """
+        u = self.add_vertex(u_name)
+        v = self.add_vertex(v_name)
+        u.children[v_name] = (u_name, v_name, weight)
+        if not directed:
+            v.children[u_name] = (v_name, u_name, weight)
+        self._record("add_edge", u_name, v_name, weight, directed)
+
+    def remove_edge(self, u_name: str, v_name: str, directed: bool = False) -> bool:
+        """
+        Removes the edge u-v.
+
+        Args:
+            u_name (str): The name of the parent vertex.
+            v_name (str): The name of the child vertex.
+            directed (bool): If False, the edge v-u is removed as well.
+
+        Returns:
+            bool: True if anything was removed.
+        """
+        u = self.get_vertex(u_name)
+        v = self.get_vertex(v_name)
+        removed = u is not None and u.children.pop(v_name, None) is not None
+        if not directed and v is not None:
+            removed = v.children.pop(u_name, None) is not None or removed
+        if removed:
+            self._record("remove_edge", u_name, v_name, directed)
+        return removed
+
+    def set_weight(self, u_name: str, v_name: str, weight: float, directed: bool = False) -> None:
+        """
+        Changes the weight of the existing edge u-v.
+
+        Args:
+            u_name (str): The name of the parent vertex.
+            v_name (str): The name of the child vertex.
+            weight (float): The new weight.
+            directed (bool): If False, the edge v-u (if present) is changed as well.
+
+        Raises:
+            KeyError: If there is no edge u-v, or (unless directed) no vertex v.
+        """
+        u = self.get_vertex(u_name)
+        v = self.get_vertex(v_name)
+        if u is None or v_name not in u.children or (not directed and v is None):
+            raise KeyError((u_name, v_name))
+        u.children[v_name] = (u_name, v_name, weight)
+        if not directed and u_name in v.children:
+            v.children[u_name] = (v_name, u_name, weight)
+        self._record("set_weight", u_name, v_name, weight, directed)
+
     def is_child(self, u_name: str, v_name: str) -> bool:
         """
         Checks if vertex v_name is a child of vertex u_name.
@@ -73,14 +472,7 @@ class Graph:
         Returns:
             bool: True if the vertex v_name is a child of the vertex u_name, False otherwise.
         """
-        u = None
-        vertices = self.get_vertices()
-
-        # traverse through the vertices to find the vertex object u
-        for vertex in vertices:
-            if vertex.name == u_name:
-                u = vertex
-                break
+        u = self.get_vertex(u_name)
         if u is None:
             return False
 
@@ -99,15 +491,7 @@ class Graph:
             Optional[Tuple[str, str, float]]: The edge if it exists, 
             or None if no such edge is found.
         """
-        u = None
-        vertices = self.get_vertices()
-
-        # traverse through the vertices to find the vertex object u
-        for vertex in vertices:
-            if vertex.name == u_name:
-                u = vertex
-                break
-        
+        u = self.get_vertex(u_name)
         if u is None:
             return None
         
@@ -117,7 +501,7 @@ class Graph:
 
 # Union-Find (Disjoint Set) data structure
 class UnionFind:
-    def __init__(self, elements: List[str]):
+    def __init__(self, elements: List[str], counters: Optional[OpCounters] = None):
         """
         Initializes the Union-Find data structure for n elements.
         Initially, each element is in its own set (its parent is itself).
@@ -125,9 +509,11 @@ class UnionFind:
 
         Parameters:
         elements (List[str]): The list of elements in the Union-Find data structure.
+        counters (Optional[OpCounters]): Counts union/find calls and find path lengths.
         """
         self.parent = {elem: elem for elem in elements}  
         self.rank = {elem: 0 for elem in elements}       
+        self.counters = counters
     
     def find(self, x: str) -> str:
         """
@@ -139,12 +525,25 @@ class UnionFind:
         Returns:
         str: The root of the set that contains x.
         """
-        if self.parent[x] == x:
-            return x
-        else:
-            # recurses up the parent tree until we locate the elem whose parent is itself
-            self.parent[x] = self.find(self.parent[x])
-            return self.parent[x]        
+        parent = self.parent
+        if self.counters is not None:
+            hops = 0
+            root = x
+            while parent[root] != root:
+                root = parent[root]
+                hops += 1
+            self.counters.add("union_find.find")
+            self.counters.observe("union_find.find_path_length", hops)
+        # walk up the parent tree until we locate the elem whose parent is itself
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # second pass: point everything on the path straight at the root
+        while parent[x] != root:
+            next_x = parent[x]
+            parent[x] = root
+            x = next_x
+        return root
     
     def union(self, x: int, y: int) -> bool:
         """Union (or merge) the sets containing elements x and y. 
@@ -161,6 +560,8 @@ class UnionFind:
         """
         root_x = self.find(x)
         root_y = self.find(y)
+        if self.counters is not None:
+            self.counters.add("union_find.union")
 
         # case 1: x and y are already int he same set
         if root_x == root_y:
@@ -178,84 +579,2077 @@ class UnionFind:
             self.rank[root_x] += 1
         return True
 
-        
-# Function to implement Kruskal's algorithm
-def kruskal_mst(graph: Graph) -> List[Tuple[str, str, float]]:
+
+
+class ArrayUnionFind:
     """
-    Kruskal's Algorithm for Minimum Spanning Tree (MST).
+    Union-Find over the integer ids 0..n-1, stored in flat arrays.
 
-    Args:
-        graph (Graph): The graph for which we compute the MST.
+    Unlike UnionFind, no element is hashed: parent and size are C int arrays
+    (4 bytes per element each), find is iterative with path halving, and
+    union is by size. 100M elements take about 800MB.
 
-    Returns:
-        List[Tuple[str, str, float]]: A list of edges in the MST. 
-        Each edge is represented as a tuple (source vertex, destination vertex, weight).
+    Attributes:
+        parent (array): parent[x] is the parent id of x (x itself for a root).
+        size (array): size[r] is the number of elements in the set rooted at r.
+        count (int): The number of disjoint sets.
     """
-    
-    result = []  # The final MST
 
-    # Suggested steps 
-    # Step 1: Get edge list
-    edges = set()
-    vertices = graph.get_vertices()
-    for vertex in vertices:
-        for u, v, weight in vertex.get_children():
-            edge = (min(u, v), max(u, v), weight)
-            edges.add(edge)
-    edges = list(edges)
-    # Step 2: Sort edges by weight
-    edges.sort(key=lambda edge: edge[2])
-    # Step 3: Initialize Union-Find data structures
-    vertex_names = [v.name if hasattr(v, 'name') else v for v in vertices]
-    uf = UnionFind(vertex_names)
-    # (to track the connected sets of vertices as we add edges to the MST)
-    # Step 4: Iterate over the sorted edges to build MST 
-    for u, v, weight in edges:
-        if uf.find(u) != uf.find(v):
-            result.append((u, v, weight))
-            uf.union(u, v)
-    return result  
+    def __init__(self, n: int):
+        """
+        Initializes the structure with n singleton sets.
+
+        Args:
+            n (int): The number of elements.
+        """
+        self.parent = array('i', range(n))
+        self.size = array('i', [1]) * n
+        self.count = n
 
+    def __len__(self) -> int:
+        return len(self.parent)
 
-# Function to implement Prim's algorithm
-def prim_mst(graph: Graph) -> List[Tuple[str, str, float]]:
+    def add(self) -> int:
+        """
+        Adds a new singleton set.
+
+        Returns:
+            int: The id of the new element.
+        """
+        x = len(self.parent)
+        self.parent.append(x)
+        self.size.append(1)
+        self.count += 1
+        return x
+
+    def find(self, x: int) -> int:
+        """
+        Finds the root of the set containing x, halving the path on the way.
+
+        Args:
+            x (int): The element whose root we want to find.
+
+        Returns:
+            int: The root of the set that contains x.
+        """
+        parent = self.parent
+        while parent[x] != x:
+            # point x at its grandparent and jump there
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, x: int, y: int) -> bool:
+        """
+        Merges the sets containing x and y, attaching the smaller set under the larger.
+
+        Args:
+            x (int): The first element.
+            y (int): The second element.
+
+        Returns:
+            bool: True if the sets were merged, False if x and y were already together.
+        """
+        root_x = self.find(x)
+        root_y = self.find(y)
+        if root_x == root_y:
+            return False
+        if self.size[root_x] < self.size[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        self.size[root_x] += self.size[root_y]
+        self.count -= 1
+        return True
+
+    def connected(self, x: int, y: int) -> bool:
+        """Returns True if x and y are in the same set."""
+        return self.find(x) == self.find(y)
+
+    def component_size(self, x: int) -> int:
+        """Returns the number of elements in the set containing x."""
+        return self.size[self.find(x)]
+
+    def union_many(self, pairs: Iterable[Tuple[int, int]]) -> int:
+        """
+        Unions every (x, y) pair, with find and union inlined into one loop.
+
+        Args:
+            pairs (Iterable[Tuple[int, int]]): The pairs to merge.
+
+        Returns:
+            int: The number of pairs that merged two different sets.
+        """
+        parent = self.parent
+        size = self.size
+        merged = 0
+        for x, y in pairs:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            while parent[y] != y:
+                parent[y] = parent[parent[y]]
+                y = parent[y]
+            if x == y:
+                continue
+            if size[x] < size[y]:
+                x, y = y, x
+            parent[y] = x
+            size[x] += size[y]
+            merged += 1
+        self.count -= merged
+        return merged
+
+    def find_many(self, xs: Iterable[int]) -> array:
+        """
+        Finds the root of every element in xs.
+
+        Args:
+            xs (Iterable[int]): The elements to look up.
+
+        Returns:
+            array: The roots, in the same order as xs.
+        """
+        parent = self.parent
+        roots = array('i')
+        for x in xs:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            roots.append(x)
+        return roots
+
+    def union_arrays(self, u, v) -> int:
+        """
+        Unions every pair (u[i], v[i]) with vectorized NumPy passes instead
+        of a Python loop per edge.
+
+        Each pass looks up the roots of both endpoints, drops edges whose
+        endpoints already share a root, hooks every remaining larger root
+        under the smallest root it is joined to, and then pointer-jumps
+        (parent = parent[parent]) until every element points at a root.
+        Afterwards every element points straight at its root and size holds
+        the set sizes. A merged set is rooted at the smallest of the roots it
+        was merged from, so when every union went through union_arrays (as
+        in label_components) the root is the set's smallest id; a set joined
+        earlier by union() may keep a larger root.
+
+        Args:
+            u (array-like): Integer ids of one endpoint of each edge.
+            v (array-like): Integer ids of the other endpoint of each edge.
+
+        Returns:
+            int: The number of sets that were merged away.
+        """
+        _require_numpy()
+        n = len(self.parent)
+        u = np.asarray(u, dtype=np.int64)
+        v = np.asarray(v, dtype=np.int64)
+        parent = _np_flatten(np.array(self.parent, dtype=np.int64))
+
+        while u.size:
+            pu = parent[u]
+            pv = parent[v]
+            keep = pu != pv
+            if not keep.all():
+                # an edge inside one set stays inside it, drop it for good
+                u, v, pu, pv = u[keep], v[keep], pu[keep], pv[keep]
+                if not u.size:
+                    break
+            # hook: each root points at the smallest root it shares an edge with
+            np.minimum.at(parent, np.maximum(pu, pv), np.minimum(pu, pv))
+            parent = _np_flatten(parent)
+
+        before = self.count
+        sizes = np.bincount(parent, minlength=n)
+        np.frombuffer(self.parent, dtype=np.int32)[:] = parent
+        np.frombuffer(self.size, dtype=np.int32)[:] = sizes
+        self.count = int(np.count_nonzero(sizes))
+        return before - self.count
+
+    def labels(self):
+        """
+        Returns the root of every element as a NumPy array, compressing
+        every path along the way.
+
+        Returns:
+            numpy.ndarray: labels[x] is the root of x.
+        """
+        _require_numpy()
+        view = np.frombuffer(self.parent, dtype=np.int32)
+        view[:] = _np_flatten(view.astype(np.int64))
+        return view.copy()
+
+    def component_sizes(self):
+        """
+        Returns the root and size of every set.
+
+        Returns:
+            Tuple[numpy.ndarray, numpy.ndarray]: The roots and the matching set sizes.
+        """
+        _require_numpy()
+        roots = np.flatnonzero(self.labels() == np.arange(len(self.parent)))
+        return roots, np.frombuffer(self.size, dtype=np.int32)[roots].copy()
+
+
+def _np_flatten(parent):
+    """Pointer-jump parent = parent[parent] until every element points at a root."""
+    while True:
+        grand = parent[parent]
+        if np.array_equal(grand, parent):
+            return parent
+        parent = grand
+
+
+def label_components(u, v, n: int):
     """
-    Prim's Algorithm for Minimum Spanning Tree (MST).
+    Computes connected component labels for a graph given as edge arrays.
 
     Args:
-        graph (Graph): The graph for which we compute the MST.
+        u (array-like): Integer ids (0..n-1) of one endpoint of each edge.
+        v (array-like): Integer ids of the other endpoint of each edge.
+        n (int): The number of vertices.
 
     Returns:
-        List[Tuple[str, str, float]]: A list of edges in the MST. 
-            Each edge is represented as a tuple (source vertex, destination vertex, weight).
+        Tuple[numpy.ndarray, int, numpy.ndarray]: The label of every vertex
+        (the smallest id in its component), the number of components, and
+        the size of each component indexed by label.
     """
-    
-    result = []  # The final MST
+    uf = ArrayUnionFind(n)
+    uf.union_arrays(u, v)
+    labels = uf.labels()
+    sizes = np.bincount(labels, minlength=n)
+    return labels, uf.count, sizes
 
-    # Handle empty graph
-    vertices = graph.get_vertices()
-    if len(vertices) == 0:
-        return result
 
-    # Pick starting vertex (chosen to match the test cases)
-    start_vertex = vertices[0]
+class NamedUnionFind:
+    """
+    A drop-in replacement for UnionFind that maps element names to integer
+    ids once and does all the work in an ArrayUnionFind.
 
-    # Get starting node edges 
-    visited = {start_vertex.name}
+    Attributes:
+        ids (Dict[str, int]): The id of every element name.
+        names (List[str]): The name of every id.
+        uf (ArrayUnionFind): The underlying integer Union-Find.
+    """
 
-    while len(visited) < len(graph.get_vertices()):
-        outer_edges = []
+    def __init__(self, elements: Iterable[str] = ()):
+        """
+        Initializes the structure with every element in its own set.
 
-        # Loop over edges in the graph 
-        for vertex in graph.get_vertices():
-            if vertex.name in visited:
-                for edge in vertex.get_children():
-                    if edge[1] not in visited:
-                        outer_edges.append(edge)
+        Args:
+            elements (Iterable[str]): The elements in the Union-Find data structure.
+        """
+        self.names = list(elements)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.uf = ArrayUnionFind(len(self.names))
 
-        # Pick the vertex with the minimum weight edge (and add it to MST)
-        min_edge = min(outer_edges, key=lambda edge: edge[2])
-        result.append(min_edge)
-        visited.add(min_edge[1])
-    
-    return result  
\ No newline at end of file
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.ids
+
+    @property
+    def count(self) -> int:
+        """The number of disjoint sets."""
+        return self.uf.count
+
+    def add(self, name: str) -> int:
+        """
+        Adds name as a new singleton set, if it is not already present.
+
+        Args:
+            name (str): The element to add.
+
+        Returns:
+            int: The id of the element.
+        """
+        i = self.ids.get(name)
+        if i is None:
+            i = self.uf.add()
+            self.ids[name] = i
+            self.names.append(name)
+        return i
+
+    def find(self, x: str) -> str:
+        """Returns the name of the root of the set containing x."""
+        return self.names[self.uf.find(self.ids[x])]
+
+    def union(self, x: str, y: str) -> bool:
+        """Merges the sets containing x and y. Returns False if they were already together."""
+        return self.uf.union(self.ids[x], self.ids[y])
+
+    def connected(self, x: str, y: str) -> bool:
+        """Returns True if x and y are in the same set."""
+        return self.uf.connected(self.ids[x], self.ids[y])
+
+    def union_many(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """Unions every (x, y) pair of names. Returns the number of merges."""
+        ids = self.ids
+        return self.uf.union_many((ids[x], ids[y]) for x, y in pairs)
+
+    def find_many(self, xs: Iterable[str]) -> List[str]:
+        """Returns the root name of every element in xs."""
+        ids = self.ids
+        names = self.names
+        return [names[r] for r in self.uf.find_many(ids[x] for x in xs)]
+
+
+class RollbackUnionFind:
+    """
+    Union-Find that can undo its unions in LIFO order.
+
+    Union is by rank and there is no path compression, so every union
+    changes exactly one parent pointer (and maybe one rank) and can be
+    recorded and reverted in O(1). find is O(log n) without compression.
+
+    Attributes:
+        parent (Dict[str, str]): The parent of every element.
+        rank (Dict[str, int]): The rank of every root.
+        count (int): The number of disjoint sets.
+        history (List[Tuple[str, str, bool]]): The unions performed so far,
+            as (attached root, new parent, whether the parent's rank grew).
+    """
+
+    def __init__(self, elements: Iterable[str]):
+        """
+        Args:
+            elements (Iterable[str]): The elements, each starting in its own set.
+        """
+        self.parent = {elem: elem for elem in elements}
+        self.rank = {elem: 0 for elem in self.parent}
+        self.count = len(self.parent)
+        self.history: List[Tuple[str, str, bool]] = []
+
+    def find(self, x: str) -> str:
+        """Returns the root of the set containing x (without changing the structure)."""
+        parent = self.parent
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    def connected(self, x: str, y: str) -> bool:
+        """Returns True if x and y are in the same set."""
+        return self.find(x) == self.find(y)
+
+    def union(self, x: str, y: str) -> bool:
+        """
+        Merges the sets containing x and y and records the change.
+
+        Returns:
+            bool: True if the sets were merged, False if they were already the same set.
+        """
+        root_x = self.find(x)
+        root_y = self.find(y)
+        if root_x == root_y:
+            return False
+        if self.rank[root_x] < self.rank[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parent[root_y] = root_x
+        grew = self.rank[root_x] == self.rank[root_y]
+        if grew:
+            self.rank[root_x] += 1
+        self.history.append((root_y, root_x, grew))
+        self.count -= 1
+        return True
+
+    def snapshot(self) -> int:
+        """Returns a token that rollback() can later return the structure to."""
+        return len(self.history)
+
+    def rollback(self, snapshot: int) -> None:
+        """
+        Undoes every union made after snapshot() returned the given token.
+
+        Args:
+            snapshot (int): A token from snapshot().
+        """
+        history = self.history
+        while len(history) > snapshot:
+            root_y, root_x, grew = history.pop()
+            self.parent[root_y] = root_y
+            if grew:
+                self.rank[root_x] -= 1
+            self.count += 1
+
+
+def offline_connectivity(vertices: Iterable[str],
+                         events: Iterable[Tuple[float, str, str, str]],
+                         queries: List[Tuple[float, str, str]]) -> List[bool]:
+    """
+    Answers "were u and v connected at time t?" for a batch of queries over a
+    log of link ups and downs.
+
+    Every edge is alive over a set of time intervals. Each interval is
+    mapped to the range of (time-sorted) queries it covers and stored in the
+    O(log Q) nodes of a segment tree over the queries that exactly cover
+    that range. A depth-first walk of the tree unions a node's edges on the
+    way down, answers the query at each leaf, and rolls the unions back on
+    the way up, which takes O((E + Q) log Q log V) overall.
+
+    Args:
+        vertices (Iterable[str]): Every vertex name.
+        events (Iterable[Tuple[float, str, str, str]]): (time, op, u, v)
+            entries where op is "up" or "down". An event applies to queries
+            at the same time or later. Repeated ups (or downs) of an edge
+            that is already up (or down) are ignored.
+        queries (List[Tuple[float, str, str]]): (time, u, v) questions.
+
+    Returns:
+        List[bool]: The answer to each query, in the order given.
+    """
+    order = sorted(range(len(queries)), key=lambda i: queries[i][0])
+    times = [queries[i][0] for i in order]
+    size = len(order)
+    answers = [False] * len(queries)
+    if size == 0:
+        return answers
+
+    # Step 1: turn the event log into alive intervals over query positions
+    intervals = []
+    up_since = {}
+    for t, op, u, v in sorted(events, key=lambda event: event[0]):
+        key = (min(u, v), max(u, v))
+        if op == "up":
+            up_since.setdefault(key, t)
+        elif op == "down":
+            start = up_since.pop(key, None)
+            if start is not None:
+                intervals.append((bisect_left(times, start), bisect_left(times, t), key))
+        else:
+            raise ValueError(f"unknown event type {op!r}, expected 'up' or 'down'")
+    for key, start in up_since.items():
+        intervals.append((bisect_left(times, start), size, key))
+
+    # Step 2: store each interval in the segment tree nodes covering it
+    node_edges: Dict[int, List[Tuple[str, str]]] = {}
+    for lo, hi, key in intervals:
+        if lo >= hi:
+            continue
+        stack = [(1, 0, size)]
+        while stack:
+            node, node_lo, node_hi = stack.pop()
+            if hi <= node_lo or node_hi <= lo:
+                continue
+            if lo <= node_lo and node_hi <= hi:
+                node_edges.setdefault(node, []).append(key)
+                continue
+            mid = (node_lo + node_hi) // 2
+            stack.append((2 * node, node_lo, mid))
+            stack.append((2 * node + 1, mid, node_hi))
+
+    # Step 3: walk the tree, union on the way down and roll back on the way up
+    uf = RollbackUnionFind(vertices)
+    stack = [(1, 0, size, None)]
+    while stack:
+        node, node_lo, node_hi, token = stack.pop()
+        if token is not None:
+            uf.rollback(token)
+            continue
+        token = uf.snapshot()
+        for u, v in node_edges.get(node, ()):
+            uf.union(u, v)
+        if node_hi - node_lo == 1:
+            _, u, v = queries[order[node_lo]]
+            answers[order[node_lo]] = uf.connected(u, v)
+            uf.rollback(token)
+            continue
+        mid = (node_lo + node_hi) // 2
+        stack.append((node, node_lo, node_hi, token))
+        stack.append((2 * node + 1, mid, node_hi, None))
+        stack.append((2 * node, node_lo, mid, None))
+
+    return answers
+
+
+# Function to implement Kruskal's algorithm
+def kruskal_mst(graph: Graph, counters: Optional[OpCounters] = None) -> List[Tuple[str, str, float]]:
+    """
+    Kruskal's Algorithm for Minimum Spanning Tree (MST).
+
+    Args:
+        graph (Graph): The graph for which we compute the MST.
+        counters (Optional[OpCounters]): Counts edges scanned and union/find work.
+
+    Returns:
+        List[Tuple[str, str, float]]: A list of edges in the MST. 
+        Each edge is represented as a tuple (source vertex, destination vertex, weight).
+    """
+    
+    result = []  # The final MST
+
+    # Suggested steps 
+    # Step 1 + 2: Get the edge list, sorted by weight
+    # (cached on the graph, so repeated MST passes do not rebuild it)
+    edges = graph.get_edge_list()
+    vertices = graph.get_vertices()
+    # Step 3 + 4: Union-Find over the vertices, then take edges in order
+    vertex_names = [v.name if hasattr(v, 'name') else v for v in vertices]
+    result = kruskal_mst_sorted(edges, vertex_names, counters)
+    return result  
+
+
+def kruskal_mst_sorted(edges: Iterable[Tuple[str, str, float]], vertex_names: List[str],
+                       counters: Optional[OpCounters] = None) -> List[Tuple[str, str, float]]:
+    """
+    Kruskal's Algorithm over an edge stream that is already sorted by weight.
+
+    The stream is consumed lazily and abandoned as soon as the tree has
+    len(vertex_names) - 1 edges, so a generator reading pre-sorted edges
+    from disk is never read further than needed.
+
+    Args:
+        edges (Iterable[Tuple[str, str, float]]): Edges (u, v, weight) in
+            non-decreasing order of weight.
+        vertex_names (List[str]): The names of all vertices in the graph.
+        counters (Optional[OpCounters]): Counts edges scanned and union/find work.
+
+    Returns:
+        List[Tuple[str, str, float]]: A list of edges in the MST (a forest if
+        the graph is disconnected), in the order they were accepted.
+    """
+    result = []
+    target = len(vertex_names) - 1
+    if target <= 0:
+        return result
+
+    # to track the connected sets of vertices as we add edges to the MST
+    uf = UnionFind(vertex_names, counters)
+    scanned = 0
+    for u, v, weight in edges:
+        scanned += 1
+        if uf.union(u, v):
+            result.append((u, v, weight))
+            # a spanning tree is complete, the remaining edges can only close cycles
+            if len(result) == target:
+                break
+    if counters is not None:
+        counters.add("kruskal.edges_scanned", scanned)
+    return result
+
+
+def filter_kruskal_mst(graph: Graph, base_size: int = 64, seed: Optional[int] = None) -> List[Tuple[str, str, float]]:
+    """
+    Filter-Kruskal Algorithm for Minimum Spanning Tree (MST).
+
+    Instead of sorting every edge up front, the edges are partitioned around
+    a sampled pivot weight (one quickselect step). The light side is handled
+    first; by the time the heavy side is reached, every heavy edge whose
+    endpoints are already connected is filtered out before it is partitioned
+    or sorted. Only partitions of at most base_size edges are ever sorted,
+    and the whole run stops once the tree has V - 1 edges. On dense graphs
+    most heavy edges are filtered away and never sorted.
+
+    Args:
+        graph (Graph): The graph for which we compute the MST.
+        base_size (int): Partitions this small are sorted and scanned directly.
+        seed (Optional[int]): Seed for the pivot sampling.
+
+    Returns:
+        List[Tuple[str, str, float]]: A list of edges in the MST (a forest if
+        the graph is disconnected).
+    """
+    result = []
+
+    vertices = graph.get_vertices()
+    vertex_names = [v.name for v in vertices]
+    target = len(vertex_names) - 1
+    if target <= 0:
+        return result
+
+    edges = set()
+    for vertex in vertices:
+        for u, v, weight in vertex.iter_edges():
+            edges.add((min(u, v), max(u, v), weight))
+
+    uf = UnionFind(vertex_names)
+    rng = random.Random(seed)
+
+    # explicit stack of (edges, needs_filter) instead of recursion;
+    # the light partition is pushed last so it is handled first
+    stack = [(list(edges), False)]
+    while stack and len(result) < target:
+        part, needs_filter = stack.pop()
+        if needs_filter:
+            find = uf.find
+            part = [edge for edge in part if find(edge[0]) != find(edge[1])]
+
+        if len(part) <= base_size:
+            part.sort(key=lambda edge: edge[2])
+            for u, v, weight in part:
+                if uf.union(u, v):
+                    result.append((u, v, weight))
+                    if len(result) == target:
+                        break
+            continue
+
+        # median of three sampled weights as the pivot
+        pivot = sorted(part[rng.randrange(len(part))][2] for _ in range(3))[1]
+        light = []
+        equal = []
+        heavy = []
+        for edge in part:
+            if edge[2] < pivot:
+                light.append(edge)
+            elif edge[2] > pivot:
+                heavy.append(edge)
+            else:
+                equal.append(edge)
+
+        if heavy:
+            stack.append((heavy, True))
+        if equal:
+            # all the same weight, so they are already in sorted order;
+            # chunk them so the early exit and filtering still apply
+            for i in range(len(equal) - base_size, -base_size, -base_size):
+                stack.append((equal[max(0, i):i + base_size], True))
+        if light:
+            stack.append((light, False))
+
+    return result
+
+
+def _tree_path(tree: Dict[str, Dict[str, float]], u: str, v: str) -> Optional[List[str]]:
+    """
+    Returns the vertices on the unique path from u to v in a forest, or None
+    if they are in different trees. Only the part of u's tree reached before
+    v is found gets explored.
+    """
+    if u == v:
+        return [u]
+    parents = {u: None}
+    frontier = [u]
+    while frontier:
+        next_frontier = []
+        for x in frontier:
+            for y in tree.get(x, ()):
+                if y in parents:
+                    continue
+                parents[y] = x
+                if y == v:
+                    path = [v]
+                    while parents[path[-1]] is not None:
+                        path.append(parents[path[-1]])
+                    return path[::-1]
+                next_frontier.append(y)
+        frontier = next_frontier
+    return None
+
+
+def _path_max_edge(tree: Dict[str, Dict[str, float]], path: List[str]) -> Tuple[str, str, float]:
+    """Returns the heaviest edge (a, b, weight) along a path of tree vertices."""
+    best = None
+    for a, b in zip(path, path[1:]):
+        w = tree[a][b]
+        if best is None or w > best[2]:
+            best = (a, b, w)
+    return best
+
+
+class DynamicMST:
+    """
+    A minimum spanning forest that is kept up to date as edges are inserted,
+    deleted or re-weighted, instead of being recomputed from scratch.
+
+    Inserting an edge (or making a non-tree edge cheaper) uses the cycle
+    property: the new edge closes exactly one cycle in the tree, and the
+    heaviest edge on that cycle is the one to drop. Deleting a tree edge
+    (or making it heavier) splits its tree in two; the two sides are explored
+    in lockstep so only the smaller side is fully walked, and the cheapest
+    non-tree edge leaving that side reconnects the tree. Every update
+    therefore touches one tree path or one side of a cut, not the whole graph.
+
+    Changes made through the Graph mutation methods can be pulled in with
+    refresh(), which replays the graph's change log.
+
+    Attributes:
+        tree (Dict[str, Dict[str, float]]): Adjacency of the tree edges.
+        non_tree (Dict[str, Dict[str, float]]): Adjacency of every other edge.
+        total_weight (float): The total weight of the spanning forest.
+        graph (Graph): The graph the forest was built from.
+        generation (int): The generation of graph the forest is up to date with.
+    """
+
+    def __init__(self, graph: Graph):
+        """
+        Builds the initial spanning forest of graph with Kruskal's algorithm.
+        If a pair of vertices has several edges, the cheapest one is kept.
+
+        Args:
+            graph (Graph): The graph to maintain a spanning forest of.
+        """
+        self.tree: Dict[str, Dict[str, float]] = {}
+        self.non_tree: Dict[str, Dict[str, float]] = {}
+        self.total_weight = 0.0
+        self.graph = graph
+        self.generation = graph.generation
+
+        for vertex in graph.get_vertices():
+            self.tree[vertex.name] = {}
+            self.non_tree[vertex.name] = {}
+        # the cached edge list is sorted by weight, so the first weight seen
+        # for a pair is the cheapest one
+        edges = []
+        for u, v, weight in graph.get_edge_list():
+            self._ensure_vertex(u)
+            self._ensure_vertex(v)
+            if v not in self.non_tree[u]:
+                self.non_tree[u][v] = weight
+                self.non_tree[v][u] = weight
+                edges.append((u, v, weight))
+
+        for u, v, weight in kruskal_mst_sorted(edges, list(self.tree)):
+            self._move(self.non_tree, self.tree, u, v, weight)
+
+    def _ensure_vertex(self, name: str) -> None:
+        if name not in self.tree:
+            self.tree[name] = {}
+            self.non_tree[name] = {}
+
+    def _move(self, source: Dict[str, Dict[str, float]], target: Dict[str, Dict[str, float]],
+              u: str, v: str, weight: float) -> None:
+        """Moves the edge u-v from one adjacency to the other, keeping total_weight in step."""
+        source[u].pop(v, None)
+        source[v].pop(u, None)
+        target[u][v] = weight
+        target[v][u] = weight
+        if target is self.tree:
+            self.total_weight += weight
+        elif source is self.tree:
+            self.total_weight -= weight
+
+    def _smaller_side(self, u: str, v: str) -> set:
+        """
+        With the tree edge u-v already removed, walks the trees of u and v one
+        vertex at a time each and returns the vertex set of whichever side
+        runs out first.
+        """
+        sides = [({u}, [u]), ({v}, [v])]
+        while True:
+            for seen, stack in sides:
+                if not stack:
+                    return seen
+                x = stack.pop()
+                for y in self.tree[x]:
+                    if y not in seen:
+                        seen.add(y)
+                        stack.append(y)
+
+    def _reconnect(self, u: str, v: str, limit: Optional[float] = None) -> Optional[Tuple[str, str, float]]:
+        """
+        Finds the cheapest non-tree edge joining the two trees that u and v
+        fell into after their tree edge was removed, and makes it a tree edge
+        if it is cheaper than limit (or if no limit is given).
+
+        Returns:
+            Optional[Tuple[str, str, float]]: The replacement edge, or None.
+        """
+        side = self._smaller_side(u, v)
+        best = None
+        for x in side:
+            for y, w in self.non_tree[x].items():
+                if y not in side and (best is None or w < best[2]):
+                    best = (x, y, w)
+        if best is None or (limit is not None and best[2] >= limit):
+            return None
+        self._move(self.non_tree, self.tree, *best)
+        return best
+
+    def insert_edge(self, u: str, v: str, weight: float) -> bool:
+        """
+        Adds the edge u-v, or changes its weight if it already exists.
+
+        Args:
+            u (str): One endpoint (added as a new vertex if unknown).
+            v (str): The other endpoint.
+            weight (float): The weight of the edge.
+
+        Returns:
+            bool: True if the edge is in the spanning forest afterwards.
+        """
+        if u == v:
+            return False
+        self._ensure_vertex(u)
+        self._ensure_vertex(v)
+        if v in self.tree[u] or v in self.non_tree[u]:
+            return self.set_weight(u, v, weight)
+
+        path = _tree_path(self.tree, u, v)
+        if path is None:
+            # joins two trees, nothing to replace
+            self._move(self.non_tree, self.tree, u, v, weight)
+            return True
+        a, b, heaviest = _path_max_edge(self.tree, path)
+        if weight < heaviest:
+            self._move(self.tree, self.non_tree, a, b, heaviest)
+            self._move(self.non_tree, self.tree, u, v, weight)
+            return True
+        self.non_tree[u][v] = weight
+        self.non_tree[v][u] = weight
+        return False
+
+    def delete_edge(self, u: str, v: str) -> bool:
+        """
+        Removes the edge u-v. If it was a tree edge, the cheapest edge that
+        reconnects the two halves (if any) takes its place.
+
+        Args:
+            u (str): One endpoint.
+            v (str): The other endpoint.
+
+        Returns:
+            bool: True if the edge existed.
+        """
+        if u not in self.tree:
+            return False
+        if v in self.non_tree[u]:
+            del self.non_tree[u][v]
+            del self.non_tree[v][u]
+            return True
+        if v not in self.tree[u]:
+            return False
+        weight = self.tree[u].pop(v)
+        del self.tree[v][u]
+        self.total_weight -= weight
+        self._reconnect(u, v)
+        return True
+
+    def set_weight(self, u: str, v: str, weight: float) -> bool:
+        """
+        Changes the weight of the existing edge u-v.
+
+        Args:
+            u (str): One endpoint.
+            v (str): The other endpoint.
+            weight (float): The new weight.
+
+        Returns:
+            bool: True if the edge is in the spanning forest afterwards.
+
+        Raises:
+            KeyError: If there is no edge u-v.
+        """
+        if u in self.tree and v in self.tree[u]:
+            old = self.tree[u][v]
+            self.tree[u][v] = weight
+            self.tree[v][u] = weight
+            self.total_weight += weight - old
+            if weight <= old:
+                # a tree edge that got cheaper is still the best across its cut
+                return True
+            # heavier: some non-tree edge across the same cut may now beat it
+            del self.tree[u][v]
+            del self.tree[v][u]
+            self.total_weight -= weight
+            if self._reconnect(u, v, limit=weight) is None:
+                self._move(self.non_tree, self.tree, u, v, weight)
+                return True
+            self.non_tree[u][v] = weight
+            self.non_tree[v][u] = weight
+            return False
+
+        if u not in self.non_tree or v not in self.non_tree[u]:
+            raise KeyError((u, v))
+        old = self.non_tree[u][v]
+        self.non_tree[u][v] = weight
+        self.non_tree[v][u] = weight
+        if weight >= old:
+            return False
+        # cheaper: it may now beat the heaviest edge on the cycle it closes
+        del self.non_tree[u][v]
+        del self.non_tree[v][u]
+        return self.insert_edge(u, v, weight)
+
+    def refresh(self) -> int:
+        """
+        Brings the forest up to date with the changes made to graph since it
+        was built or last refreshed. If the change log can't cover them (it
+        overflowed, or the graph was edited by hand and touch()ed) the forest
+        is rebuilt from scratch.
+
+        Returns:
+            int: The number of changes replayed, or -1 if the forest was rebuilt.
+        """
+        changes = self.graph.changes_since(self.generation)
+        if changes is None:
+            self.__init__(self.graph)
+            return -1
+        for change in changes:
+            op = change[1]
+            if op == "add_vertex":
+                self._ensure_vertex(change[2])
+            elif op == "remove_vertex":
+                name = change[2]
+                if name in self.tree:
+                    for other in list(self.non_tree[name]) + list(self.tree[name]):
+                        self.delete_edge(name, other)
+                    del self.tree[name]
+                    del self.non_tree[name]
+            else:
+                # the forest is undirected, so re-read whatever the graph now
+                # holds between u and v in either direction, cheapest wins
+                u, v = change[2], change[3]
+                if u == v:
+                    continue
+                weights = [edge[2] for edge in (self.graph.get_edge(u, v), self.graph.get_edge(v, u)) if edge is not None]
+                if weights:
+                    self.insert_edge(u, v, min(weights))
+                else:
+                    self.delete_edge(u, v)
+        self.generation = self.graph.generation
+        return len(changes)
+
+    def connected(self, u: str, v: str) -> bool:
+        """Returns True if u and v are in the same tree."""
+        return _tree_path(self.tree, u, v) is not None
+
+    def path_max(self, u: str, v: str) -> Optional[Tuple[str, str, float]]:
+        """Returns the heaviest tree edge between u and v, or None if they are not connected."""
+        path = _tree_path(self.tree, u, v)
+        if path is None or len(path) < 2:
+            return None
+        return _path_max_edge(self.tree, path)
+
+    def is_tree_edge(self, u: str, v: str) -> bool:
+        """Returns True if u-v is an edge of the spanning forest."""
+        return u in self.tree and v in self.tree[u]
+
+    def edges(self) -> List[Tuple[str, str, float]]:
+        """
+        Returns:
+            List[Tuple[str, str, float]]: The edges of the spanning forest as
+            (u, v, weight) tuples with u < v.
+        """
+        return [(u, v, w) for u, children in self.tree.items() for v, w in children.items() if u < v]
+
+    def as_graph(self) -> Graph:
+        """Returns the spanning forest as a Graph (edges stored in both directions)."""
+        return Graph([Vertex(u, {v: (u, v, w) for v, w in children.items()}) for u, children in self.tree.items()])
+
+
+class StreamingMST:
+    """
+    A minimum spanning forest built from a stream of edges, one edge or one
+    chunk at a time, without ever holding the full graph.
+
+    A NamedUnionFind answers "does this edge join two trees?" in near
+    constant time, and those edges are always kept. An edge inside one tree
+    closes exactly one cycle; the tree path between its endpoints is walked,
+    and the new edge replaces the heaviest edge on that path if it is
+    lighter, or is discarded otherwise. Replacing an edge on a cycle never
+    changes which vertices are connected, so the Union-Find never needs to
+    split. Only the forest (at most V - 1 edges) is stored.
+
+    Attributes:
+        uf (NamedUnionFind): The components seen so far.
+        forest (Dict[str, Dict[str, float]]): Adjacency of the current forest edges.
+        total_weight (float): The total weight of the current forest.
+    """
+
+    def __init__(self, edges: Iterable[Tuple[str, str, float]] = ()):
+        """
+        Args:
+            edges (Iterable[Tuple[str, str, float]]): Optional initial edges.
+        """
+        self.uf = NamedUnionFind()
+        self.forest: Dict[str, Dict[str, float]] = {}
+        self.total_weight = 0.0
+        self.add_edges(edges)
+
+    def add_vertex(self, name: str) -> None:
+        """Adds an isolated vertex (a no-op if it is already known)."""
+        if name not in self.forest:
+            self.uf.add(name)
+            self.forest[name] = {}
+
+    def add_edge(self, u: str, v: str, weight: float) -> bool:
+        """
+        Feeds one edge into the forest.
+
+        Args:
+            u (str): One endpoint.
+            v (str): The other endpoint.
+            weight (float): The weight of the edge.
+
+        Returns:
+            bool: True if the edge became part of the forest.
+        """
+        if u == v:
+            return False
+        self.add_vertex(u)
+        self.add_vertex(v)
+
+        if not self.uf.union(u, v):
+            # same tree: the edge closes a cycle, keep the lighter of it and
+            # the heaviest edge already on that cycle
+            a, b, heaviest = _path_max_edge(self.forest, _tree_path(self.forest, u, v))
+            if weight >= heaviest:
+                return False
+            del self.forest[a][b]
+            del self.forest[b][a]
+            self.total_weight -= heaviest
+
+        self.forest[u][v] = weight
+        self.forest[v][u] = weight
+        self.total_weight += weight
+        return True
+
+    def add_edges(self, edges: Iterable[Tuple[str, str, float]]) -> int:
+        """
+        Feeds a chunk of edges into the forest.
+
+        Args:
+            edges (Iterable[Tuple[str, str, float]]): The (u, v, weight) edges.
+
+        Returns:
+            int: The number of edges that became part of the forest.
+        """
+        added = 0
+        for u, v, weight in edges:
+            if self.add_edge(u, v, weight):
+                added += 1
+        return added
+
+    @property
+    def component_count(self) -> int:
+        """The number of trees in the forest (isolated vertices included)."""
+        return self.uf.count
+
+    def edges(self) -> List[Tuple[str, str, float]]:
+        """
+        Returns:
+            List[Tuple[str, str, float]]: The current forest edges as
+            (u, v, weight) tuples with u < v.
+        """
+        return [(u, v, w) for u, children in self.forest.items() for v, w in children.items() if u < v]
+
+
+# Function to implement Prim's algorithm
+def prim_mst(graph: Graph, counters: Optional[OpCounters] = None) -> List[Tuple[str, str, float]]:
+    """
+    Prim's Algorithm for Minimum Spanning Tree (MST).
+
+    Args:
+        graph (Graph): The graph for which we compute the MST.
+        counters (Optional[OpCounters]): Counts heap pushes, pops and stale pops.
+
+    Returns:
+        List[Tuple[str, str, float]]: A list of edges in the MST. 
+            Each edge is represented as a tuple (source vertex, destination vertex, weight).
+    """
+    
+    result = []  # The final MST
+
+    # Handle empty graph
+    vertices = graph.get_vertices()
+    if len(vertices) == 0:
+        return result
+
+    # Pick starting vertex (chosen to match the test cases)
+    start_vertex = vertices[0]
+
+    # Look vertices up by name instead of rescanning the vertex list
+    by_name = {vertex.name: vertex for vertex in vertices}
+
+    # Get starting node edges 
+    visited = {start_vertex.name}
+    # heap of (weight, insertion order, edge) for every edge leaving the tree;
+    # entries whose far end joined the tree later are skipped when popped
+    outer_edges = []
+    order = 0
+    for edge in start_vertex.iter_edges():
+        if edge[1] not in visited:
+            heappush(outer_edges, (edge[2], order, edge))
+            order += 1
+
+    while outer_edges and len(visited) < len(vertices):
+        # Pick the vertex with the minimum weight edge (and add it to MST)
+        _, _, min_edge = heappop(outer_edges)
+        child = min_edge[1]
+        if child in visited:
+            continue
+        result.append(min_edge)
+        visited.add(child)
+
+        child_vertex = by_name.get(child)
+        if child_vertex is None:
+            continue
+        for edge in child_vertex.iter_edges():
+            if edge[1] not in visited:
+                heappush(outer_edges, (edge[2], order, edge))
+                order += 1
+
+    if counters is not None:
+        # order counts every push, so the rest follows without touching the loop
+        pops = order - len(outer_edges)
+        counters.add("prim.pushes", order)
+        counters.add("prim.pops", pops)
+        counters.add("prim.stale_pops", pops - len(result))
+    
+    return result  
+
+
+# ----------------------------------------------------------------------
+# Parallel Boruvka
+# ----------------------------------------------------------------------
+
+# (src, dst, weight, component) arrays read by _boruvka_cheapest_edges.
+# In pool workers these are views onto shared memory set up by _boruvka_attach.
+_boruvka_arrays = None
+_boruvka_segments = []
+
+
+def _boruvka_attach(segment_names: List[Tuple[str, str]]) -> None:
+    """Pool initializer: map the shared edge and component arrays into this worker."""
+    global _boruvka_arrays
+    views = []
+    for name, fmt in segment_names:
+        segment = shared_memory.SharedMemory(name=name)
+        # keep the segment object alive for as long as its view is used
+        _boruvka_segments.append(segment)
+        views.append(segment.buf.cast(fmt))
+    _boruvka_arrays = tuple(views)
+
+
+def _boruvka_cheapest_edges(lo: int, hi: int) -> Dict[int, int]:
+    """
+    Find the cheapest outgoing edge of every component among edges lo..hi-1.
+
+    Ties are broken by edge index, so every partition (and the merge of
+    their results) agrees on a single total order of the edges. This is
+    what keeps Boruvka from closing a cycle out of equal-weight edges.
+
+    Returns:
+        Dict[int, int]: A mapping from component id to the index of its cheapest edge.
+    """
+    src, dst, weights, comp = _boruvka_arrays
+    best = {}
+    for i in range(lo, hi):
+        cu = comp[src[i]]
+        cv = comp[dst[i]]
+        if cu == cv:
+            continue
+        w = weights[i]
+        j = best.get(cu)
+        if j is None or w < weights[j]:
+            best[cu] = i
+        j = best.get(cv)
+        if j is None or w < weights[j]:
+            best[cv] = i
+    return best
+
+
+def _boruvka_share(values: array) -> Tuple[shared_memory.SharedMemory, memoryview]:
+    """Copy an array into a new shared memory segment and return (segment, view)."""
+    segment = shared_memory.SharedMemory(create=True, size=max(1, len(values) * values.itemsize))
+    view = segment.buf.cast(values.typecode)
+    view[:len(values)] = values
+    return segment, view
+
+
+def boruvka_mst(graph: Graph, workers: Optional[int] = None, partitions: Optional[int] = None) -> List[Tuple[str, str, float]]:
+    """
+    Boruvka's Algorithm for Minimum Spanning Tree (MST), with each round's
+    cheapest-edge-per-component pass spread over a process pool.
+
+    The edge list is stored once in shared memory as three flat arrays
+    (source ids, destination ids, weights) next to a component-id array.
+    Every round, each worker scans a slice of the edges and reports the
+    cheapest edge leaving each component it sees; the parent process merges
+    those reports, unions the chosen edges, and rewrites the component array
+    in place for the next round. There are at most log2(V) rounds.
+
+    Args:
+        graph (Graph): The graph for which we compute the MST.
+        workers (Optional[int]): The number of worker processes. Defaults to
+            the number of CPUs; 1 runs everything in this process.
+        partitions (Optional[int]): The number of edge slices per round.
+            Defaults to 4 per worker.
+
+    Returns:
+        List[Tuple[str, str, float]]: A list of edges in the MST (a forest if
+        the graph is disconnected). Each edge is represented as a tuple
+        (source vertex, destination vertex, weight) with source < destination.
+    """
+    result = []
+
+    vertices = graph.get_vertices()
+    names = [v.name for v in vertices]
+    ids = {name: i for i, name in enumerate(names)}
+
+    # Step 1: the graph's cached undirected edge list
+    edges = graph.get_edge_list()
+    if not edges:
+        return result
+
+    src = array('i', (ids[u] for u, _, _ in edges))
+    dst = array('i', (ids[v] for _, v, _ in edges))
+    weights = array('d', (w for _, _, w in edges))
+    comp = array('i', range(len(names)))
+
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if partitions is None:
+        partitions = 4 * workers
+    step = max(1, -(-len(edges) // partitions))
+    ranges = [(lo, min(lo + step, len(edges))) for lo in range(0, len(edges), step)]
+
+    global _boruvka_arrays
+    shared = []
+    pool = None
+    try:
+        if workers > 1:
+            shared = [_boruvka_share(values) for values in (src, dst, weights, comp)]
+            # from here on the component array lives in shared memory
+            comp = shared[3][1]
+            pool = multiprocessing.Pool(workers, _boruvka_attach,
+                                        ([(segment.name, view.format) for segment, view in shared],))
+        else:
+            _boruvka_arrays = (src, dst, weights, comp)
+
+        uf = ArrayUnionFind(len(names))
+        while True:
+            # Step 2: cheapest edge leaving each component, one slice per task
+            if pool is not None:
+                partials = pool.starmap(_boruvka_cheapest_edges, ranges)
+            else:
+                partials = [_boruvka_cheapest_edges(lo, hi) for lo, hi in ranges]
+
+            # Step 3: merge the per-slice winners, breaking ties by edge index
+            best = {}
+            for partial in partials:
+                for c, i in partial.items():
+                    j = best.get(c)
+                    if j is None or (weights[i], i) < (weights[j], j):
+                        best[c] = i
+            if not best:
+                break
+
+            # Step 4: add the chosen edges and relabel the components
+            for i in sorted(set(best.values())):
+                if uf.union(src[i], dst[i]):
+                    result.append(edges[i])
+            for x in range(len(names)):
+                comp[x] = uf.find(x)
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        _boruvka_arrays = None
+        comp = None
+        for segment, view in shared:
+            view.release()
+            segment.close()
+            segment.unlink()
+
+    return result
+
+
+# ----------------------------------------------------------------------
+# Binary CSR snapshots
+# ----------------------------------------------------------------------
+#
+# File layout (little-endian, every section starts on an 8-byte boundary):
+#
+#   header        magic b"CSRG", format version (u32), n (u64), m (u64),
+#                 name blob length in bytes (u64)
+#   name offsets  n + 1 u64, name i is blob[offsets[i]:offsets[i + 1]]
+#   name blob     the UTF-8 names, sorted, so ids follow name order
+#   indptr        n + 1 u64, the edges of vertex i are indptr[i]:indptr[i + 1]
+#   indices       m u32, the destination id of each edge
+#   weights       m f64, the weight of each edge
+
+_CSR_MAGIC = b"CSRG"
+_CSR_VERSION = 1
+_CSR_HEADER = struct.Struct("<4sIQQQ")
+_CSR_CHUNK = 1 << 16
+
+
+def _pad8(f, written: int) -> None:
+    """Writes zero bytes until `written` bytes end on an 8-byte boundary."""
+    if written % 8:
+        f.write(bytes(8 - written % 8))
+
+
+def save_graph(graph: Graph, path: str) -> None:
+    """
+    Writes graph to path in the binary CSR snapshot format.
+
+    Names are written in sorted order, so a vertex's id is its position in
+    that order. Edges are streamed out in fixed-size chunks, so apart from
+    the name table no copy of the edge list is built in memory.
+
+    Args:
+        graph (Graph): The graph to save. Children that are not in the
+            vertex list are saved as vertices without edges.
+        path (str): The file to write.
+    """
+    vertices = graph.get_vertices()
+    names = set()
+    for vertex in vertices:
+        names.add(vertex.name)
+        names.update(vertex.iter_neighbors())
+    # str order is code point order, which is also UTF-8 byte order
+    names = sorted(names)
+    ids = {name: i for i, name in enumerate(names)}
+    n = len(names)
+
+    by_id = [None] * n
+    for vertex in vertices:
+        by_id[ids[vertex.name]] = vertex
+
+    indptr = array('Q', [0]) * (n + 1)
+    for i, vertex in enumerate(by_id):
+        indptr[i + 1] = indptr[i] + (len(vertex.children) if vertex is not None else 0)
+    m = indptr[n]
+
+    encoded_length = 0
+    offsets = array('Q', [0]) * (n + 1)
+    for i, name in enumerate(names):
+        encoded_length += len(name.encode("utf-8"))
+        offsets[i + 1] = encoded_length
+
+    with open(path, "wb") as f:
+        f.write(_CSR_HEADER.pack(_CSR_MAGIC, _CSR_VERSION, n, m, encoded_length))
+        offsets.tofile(f)
+        for start in range(0, n, _CSR_CHUNK):
+            f.write(b"".join(name.encode("utf-8") for name in names[start:start + _CSR_CHUNK]))
+        _pad8(f, encoded_length)
+        indptr.tofile(f)
+
+        # indices then weights, each streamed in chunks
+        lookup = ids.__getitem__
+        chunk = array('I')
+        for vertex in by_id:
+            if vertex is None:
+                continue
+            chunk.extend(map(lookup, vertex.iter_neighbors()))
+            if len(chunk) >= _CSR_CHUNK:
+                chunk.tofile(f)
+                chunk = array('I')
+        chunk.tofile(f)
+        _pad8(f, 4 * m)
+
+        chunk = array('d')
+        for vertex in by_id:
+            if vertex is None:
+                continue
+            chunk.extend([edge[2] for edge in vertex.iter_edges()])
+            if len(chunk) >= _CSR_CHUNK:
+                chunk.tofile(f)
+                chunk = array('d')
+        chunk.tofile(f)
+
+
+def load_graph(path: str) -> "CSRGraph":
+    """
+    Opens a binary CSR snapshot by memory-mapping it.
+
+    Args:
+        path (str): A file written by save_graph.
+
+    Returns:
+        CSRGraph: A read-only graph whose arrays are views onto the file.
+    """
+    return CSRGraph.load(path)
+
+
+class CSRGraph:
+    """
+    A read-only graph in compressed sparse row (CSR) form.
+
+    Vertices are the integer ids 0..n-1. The out-edges of vertex i are
+    positions indptr[i] to indptr[i + 1] - 1 of the indices (destination
+    ids) and weights arrays. The arrays can be memoryviews onto a
+    memory-mapped snapshot file, so opening a graph reads no edges and
+    creates no per-vertex objects. Names are decoded only when asked for,
+    and looked up by binary search over the sorted name table.
+
+    Attributes:
+        n (int): The number of vertices.
+        m (int): The number of (directed) edges.
+        indptr: n + 1 edge offsets.
+        indices: m destination ids.
+        weights: m edge weights.
+    """
+
+    def __init__(self, indptr, indices, weights, name_offsets, name_blob, mapping: Optional[mmap.mmap] = None):
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.n = len(indptr) - 1
+        self.m = len(indices)
+        self._name_offsets = name_offsets
+        self._name_blob = name_blob
+        self._mmap = mapping
+
+    @classmethod
+    def load(cls, path: str) -> "CSRGraph":
+        """
+        Memory-maps a snapshot written by save_graph.
+
+        Args:
+            path (str): The snapshot file.
+
+        Returns:
+            CSRGraph: The graph, backed by the mapped file.
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version.
+        """
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapping)
+        magic, version, n, m, blob_length = _CSR_HEADER.unpack_from(view, 0)
+        if magic != _CSR_MAGIC or version != _CSR_VERSION:
+            view.release()
+            mapping.close()
+            raise ValueError(f"{path} is not a version {_CSR_VERSION} graph snapshot")
+
+        pos = _CSR_HEADER.size
+        name_offsets = view[pos:pos + 8 * (n + 1)].cast('Q')
+        pos += 8 * (n + 1)
+        name_blob = view[pos:pos + blob_length]
+        pos += -(-blob_length // 8) * 8
+        indptr = view[pos:pos + 8 * (n + 1)].cast('Q')
+        pos += 8 * (n + 1)
+        indices = view[pos:pos + 4 * m].cast('I')
+        pos += -(-4 * m // 8) * 8
+        weights = view[pos:pos + 8 * m].cast('d')
+        view.release()
+        return cls(indptr, indices, weights, name_offsets, name_blob, mapping)
+
+    @classmethod
+    def from_graph(cls, graph: Graph) -> "CSRGraph":
+        """
+        Builds an in-memory CSRGraph with the same layout as a snapshot.
+
+        Args:
+            graph (Graph): The graph to convert.
+
+        Returns:
+            CSRGraph: The converted graph.
+        """
+        vertices = graph.get_vertices()
+        names = set()
+        for vertex in vertices:
+            names.add(vertex.name)
+            names.update(vertex.iter_neighbors())
+        names = sorted(names)
+        ids = {name: i for i, name in enumerate(names)}
+        by_id = [None] * len(names)
+        for vertex in vertices:
+            by_id[ids[vertex.name]] = vertex
+
+        indptr = array('Q', [0])
+        indices = array('I')
+        weights = array('d')
+        lookup = ids.__getitem__
+        for vertex in by_id:
+            if vertex is not None:
+                indices.extend(map(lookup, vertex.iter_neighbors()))
+                weights.extend([edge[2] for edge in vertex.iter_edges()])
+            indptr.append(len(indices))
+
+        blob = bytearray()
+        name_offsets = array('Q', [0])
+        for name in names:
+            blob += name.encode("utf-8")
+            name_offsets.append(len(blob))
+        return cls(indptr, indices, weights, name_offsets, bytes(blob))
+
+    def close(self) -> None:
+        """Releases the memory-mapped file (if any). The graph is unusable afterwards."""
+        if self._mmap is not None:
+            for view in (self.indptr, self.indices, self.weights, self._name_offsets, self._name_blob):
+                view.release()
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> "CSRGraph":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def name(self, i: int) -> str:
+        """Returns the name of vertex i."""
+        return bytes(self._name_blob[self._name_offsets[i]:self._name_offsets[i + 1]]).decode("utf-8")
+
+    def id_of(self, name: str) -> Optional[int]:
+        """
+        Returns the id of the vertex called name, by binary search over the
+        sorted name table, or None if there is no such vertex.
+        """
+        key = name.encode("utf-8")
+        offsets = self._name_offsets
+        blob = self._name_blob
+        lo = 0
+        hi = self.n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(blob[offsets[mid]:offsets[mid + 1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n and bytes(blob[offsets[lo]:offsets[lo + 1]]) == key:
+            return lo
+        return None
+
+    def neighbors(self, i: int) -> Iterator[Tuple[int, float]]:
+        """Yields (destination id, weight) for every out-edge of vertex i."""
+        indices = self.indices
+        weights = self.weights
+        for k in range(self.indptr[i], self.indptr[i + 1]):
+            yield indices[k], weights[k]
+
+    def find_path(self, source: str, target: str) -> Optional[List[str]]:
+        """
+        Finds the cheapest path between two vertices with Dijkstra's algorithm.
+
+        Args:
+            source (str): The name of the start vertex.
+            target (str): The name of the destination vertex.
+
+        Returns:
+            Optional[List[str]]: The names along the cheapest path, or None
+            if there is no path (or either vertex is unknown).
+        """
+        s = self.id_of(source)
+        t = self.id_of(target)
+        if s is None or t is None:
+            return None
+        indptr = self.indptr
+        indices = self.indices
+        weights = self.weights
+        dist = {s: 0.0}
+        parent = {s: -1}
+        heap = [(0.0, s)]
+        while heap:
+            d, x = heappop(heap)
+            if d > dist[x]:
+                continue  # stale entry
+            if x == t:
+                path = []
+                while x != -1:
+                    path.append(self.name(x))
+                    x = parent[x]
+                return path[::-1]
+            for k in range(indptr[x], indptr[x + 1]):
+                y = indices[k]
+                nd = d + weights[k]
+                if y not in dist or nd < dist[y]:
+                    dist[y] = nd
+                    parent[y] = x
+                    heappush(heap, (nd, y))
+        return None
+
+    def mst(self) -> List[Tuple[str, str, float]]:
+        """
+        Prim's Algorithm over the CSR arrays, restarted in every component so
+        the result is a minimum spanning forest.
+
+        Returns:
+            List[Tuple[str, str, float]]: The forest edges (source name,
+            destination name, weight).
+        """
+        indptr = self.indptr
+        indices = self.indices
+        weights = self.weights
+        in_tree = bytearray(self.n)
+        result = []
+        for start in range(self.n):
+            if in_tree[start]:
+                continue
+            in_tree[start] = 1
+            heap = [(weights[k], indices[k], start) for k in range(indptr[start], indptr[start + 1])]
+            heap.sort()
+            while heap:
+                w, y, x = heappop(heap)
+                if in_tree[y]:
+                    continue
+                in_tree[y] = 1
+                result.append((self.name(x), self.name(y), w))
+                for k in range(indptr[y], indptr[y + 1]):
+                    if not in_tree[indices[k]]:
+                        heappush(heap, (weights[k], indices[k], y))
+        return result
+
+    def to_graph(self) -> Graph:
+        """Materializes the snapshot as a Graph of Vertex objects."""
+        names = [self.name(i) for i in range(self.n)]
+        vertices = []
+        for i, name in enumerate(names):
+            children = {}
+            for k in range(self.indptr[i], self.indptr[i + 1]):
+                children[names[self.indices[k]]] = (name, names[self.indices[k]], self.weights[k])
+            vertices.append(Vertex(name, children))
+        return Graph(vertices)
+
+    def component_labels(self) -> array:
+        """
+        Labels every vertex with its connected component, numbering the
+        components from 0 in order of their smallest id. Edges are followed
+        in their stored direction, so the graph should hold both directions
+        of every edge.
+
+        Returns:
+            array: n component labels.
+        """
+        indptr = self.indptr
+        indices = self.indices
+        label = array('i', [-1]) * self.n
+        count = 0
+        for start in range(self.n):
+            if label[start] != -1:
+                continue
+            label[start] = count
+            stack = [start]
+            while stack:
+                x = stack.pop()
+                for y in indices[indptr[x]:indptr[x + 1]]:
+                    if label[y] == -1:
+                        label[y] = count
+                        stack.append(y)
+            count += 1
+        return label
+
+    def components(self) -> List[List[str]]:
+        """
+        Returns:
+            List[List[str]]: The vertex names of each connected component.
+        """
+        groups = {}
+        for i, c in enumerate(self.component_labels()):
+            groups.setdefault(c, []).append(self.name(i))
+        return list(groups.values())
+
+    def _biconnectivity(self) -> Tuple[bytearray, List[Tuple[int, int]], List[List[int]]]:
+        """
+        Hopcroft and Tarjan's depth-first search for cut vertices, with an
+        explicit stack so deep graphs don't hit the recursion limit.
+
+        low[x] is the smallest discovery time reachable from x's subtree by
+        one back edge. When a child x finishes with low[x] >= disc[p], the
+        vertices discovered since x (plus p) form a biconnected component,
+        p separates it from the rest (unless p is a root with one child),
+        and if low[x] > disc[p] the tree edge p - x is a bridge. Only the
+        first copy of the edge back to a vertex's parent is skipped, so
+        parallel edges are never bridges. O(V + E).
+
+        Returns:
+            Tuple[bytearray, List[Tuple[int, int]], List[List[int]]]: A
+            cut-vertex flag per id, the bridges as (parent, child) ids, and
+            the ids of each biconnected component.
+        """
+        n = self.n
+        indptr = self.indptr
+        indices = self.indices
+        disc = [-1] * n
+        low = [0] * n
+        parent = [-1] * n
+        next_edge = list(indptr[:n])
+        skipped = bytearray(n)
+        is_cut = bytearray(n)
+        bridges = []
+        blocks = []
+        unassigned = []  # discovered vertices not yet in a component, in discovery order
+        clock = 0
+
+        for root in range(n):
+            if disc[root] != -1:
+                continue
+            disc[root] = low[root] = clock
+            clock += 1
+            root_children = 0
+            stack = [root]
+            unassigned.append(root)
+            while stack:
+                x = stack[-1]
+                k = next_edge[x]
+                if k < indptr[x + 1]:
+                    next_edge[x] = k + 1
+                    y = indices[k]
+                    if disc[y] == -1:
+                        parent[y] = x
+                        disc[y] = low[y] = clock
+                        clock += 1
+                        stack.append(y)
+                        unassigned.append(y)
+                    elif y == parent[x] and not skipped[x]:
+                        skipped[x] = 1
+                    elif disc[y] < low[x]:
+                        low[x] = disc[y]
+                    continue
+
+                # x is finished, report back to its parent
+                stack.pop()
+                p = parent[x]
+                if p == -1:
+                    continue
+                if low[x] < low[p]:
+                    low[p] = low[x]
+                if low[x] >= disc[p]:
+                    if p == root:
+                        root_children += 1
+                    else:
+                        is_cut[p] = 1
+                    if low[x] > disc[p]:
+                        bridges.append((p, x))
+                    block = [p]
+                    while True:
+                        z = unassigned.pop()
+                        block.append(z)
+                        if z == x:
+                            break
+                    blocks.append(block)
+
+            unassigned.pop()  # the root
+            if root_children > 1:
+                is_cut[root] = 1
+        return is_cut, bridges, blocks
+
+    def articulation_points(self) -> List[str]:
+        """
+        Returns:
+            List[str]: The vertices whose removal disconnects their component, in name order.
+        """
+        is_cut, _, _ = self._biconnectivity()
+        return [self.name(i) for i in range(self.n) if is_cut[i]]
+
+    def bridges(self) -> List[Tuple[str, str]]:
+        """
+        Returns:
+            List[Tuple[str, str]]: The edges whose removal disconnects their
+            component, as (u, v) with u < v, in name order.
+        """
+        _, bridges, _ = self._biconnectivity()
+        return [(self.name(u), self.name(v)) for u, v in sorted((min(e), max(e)) for e in bridges)]
+
+    def biconnected_components(self) -> List[List[str]]:
+        """
+        Returns:
+            List[List[str]]: The vertex names of each biconnected component,
+            sorted. Components share their cut vertices, and isolated
+            vertices belong to none.
+        """
+        _, _, blocks = self._biconnectivity()
+        return [[self.name(i) for i in sorted(block)] for block in blocks]
+
+
+# ----------------------------------------------------------------------
+# Graph analytics
+# ----------------------------------------------------------------------
+
+def _as_csr(graph: Union[Graph, CSRGraph]) -> CSRGraph:
+    return graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+
+
+def connected_components(graph: Union[Graph, CSRGraph]) -> List[List[str]]:
+    """
+    Finds the connected components of an undirected graph (every edge
+    stored in both directions) in O(V + E), without recursion.
+
+    Args:
+        graph (Union[Graph, CSRGraph]): The graph. A Graph is converted with
+            CSRGraph.from_graph first.
+
+    Returns:
+        List[List[str]]: The vertex names of each component.
+    """
+    return _as_csr(graph).components()
+
+
+def articulation_points(graph: Union[Graph, CSRGraph]) -> List[str]:
+    """
+    Finds the articulation points (cut vertices) of an undirected graph:
+    the vertices whose removal disconnects their component, i.e. single
+    points of failure. O(V + E), without recursion.
+
+    Args:
+        graph (Union[Graph, CSRGraph]): The graph.
+
+    Returns:
+        List[str]: The articulation points, in name order.
+    """
+    return _as_csr(graph).articulation_points()
+
+
+def bridges(graph: Union[Graph, CSRGraph]) -> List[Tuple[str, str]]:
+    """
+    Finds the bridges of an undirected graph: the edges whose removal
+    disconnects their component. O(V + E), without recursion.
+
+    Args:
+        graph (Union[Graph, CSRGraph]): The graph.
+
+    Returns:
+        List[Tuple[str, str]]: The bridges as (u, v) with u < v, in name order.
+    """
+    return _as_csr(graph).bridges()
+
+
+def biconnected_components(graph: Union[Graph, CSRGraph]) -> List[List[str]]:
+    """
+    Splits an undirected graph into biconnected components: maximal groups
+    of vertices that stay connected after removing any one vertex. A bridge
+    is a component of its own two endpoints. O(V + E), without recursion.
+
+    Args:
+        graph (Union[Graph, CSRGraph]): The graph.
+
+    Returns:
+        List[List[str]]: The sorted vertex names of each component.
+    """
+    return _as_csr(graph).biconnected_components()
+
+
+# ----------------------------------------------------------------------
+# Streaming edge-list import
+# ----------------------------------------------------------------------
+
+# column names that mark the first line of an edge list as a header
+_EDGE_LIST_COLUMNS = {"source", "target", "src", "dst", "from", "to", "node1", "node2"}
+
+
+def _read_edge_rows(path: str, delimiter: Optional[str], chunk_size: int, default_weight: float,
+                    header: Optional[bool] = None):
+    """
+    Yields lists of (u, v, weight) rows read from a CSV/TSV edge list,
+    chunk_size rows at a time. Blank lines and lines starting with '#' are
+    skipped. The first remaining line is a header if header is True; if
+    header is None, it is taken as one when its first two columns are
+    known column names (source,target; src,dst; ...), or when none of its
+    three columns is a number.
+
+    Raises:
+        ValueError: If a data line has fewer than two columns or a weight
+            that is not a number. The message gives the line number.
+    """
+    if delimiter is None:
+        delimiter = "\t" if path.endswith((".tsv", ".tab")) else ","
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        first = True
+        while True:
+            rows = [(reader.line_num, row) for row in itertools.islice(reader, chunk_size)]
+            if not rows:
+                return
+            chunk = []
+            for line, row in rows:
+                if not row or row[0].startswith("#"):
+                    continue
+                if first:
+                    first = False
+                    if header or (header is None and _is_header(row)):
+                        continue
+                if len(row) < 2:
+                    raise ValueError(f"{path}:{line}: expected 'u{delimiter}v[{delimiter}weight]', got {row!r}")
+                if len(row) > 2 and row[2] != "":
+                    try:
+                        weight = float(row[2])
+                    except ValueError:
+                        raise ValueError(f"{path}:{line}: weight {row[2]!r} is not a number") from None
+                else:
+                    weight = default_weight
+                chunk.append((row[0].strip(), row[1].strip(), weight))
+            yield chunk
+
+
+def _is_number(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_header(row: List[str]) -> bool:
+    if len(row) < 2:
+        return False
+    if row[0].strip().lower() in _EDGE_LIST_COLUMNS and row[1].strip().lower() in _EDGE_LIST_COLUMNS:
+        return True
+    # a word in the weight column only means a header if the endpoints are
+    # words too; "1,2,x" is a data line with a bad weight
+    return len(row) > 2 and row[2] != "" and not _is_number(row[2]) \
+        and not _is_number(row[0]) and not _is_number(row[1])
+
+
+def _merge_edges(n: int, indptr: array, indices: array, weights: array,
+                 src: array, dst: array, raw_weights: array) -> Tuple[array, array, array]:
+    """
+    Merges raw (src, dst, weight) edges into deduplicated CSR arrays over
+    vertices 0..n-1 (which may cover fewer vertices) and returns new ones.
+    A row keeps its stored edges first and then the raw ones in order, and
+    only the first edge to each neighbour survives, so the earliest weight
+    in the file wins.
+    """
+    stored_n = len(indptr) - 1
+    merged = array('Q', [0]) * (n + 1)
+    for i in range(stored_n):
+        merged[i + 1] = indptr[i + 1] - indptr[i]
+    for i in src:
+        merged[i + 1] += 1
+    for i in range(n):
+        merged[i + 1] += merged[i]
+    fill = array('Q', merged[:n])
+    merged_indices = array('I', [0]) * merged[n]
+    merged_weights = array('d', [0.0]) * merged[n]
+    for i in range(stored_n):
+        start, end, to = indptr[i], indptr[i + 1], fill[i]
+        merged_indices[to:to + end - start] = indices[start:end]
+        merged_weights[to:to + end - start] = weights[start:end]
+        fill[i] = to + end - start
+    # a stable scatter of the raw edges by source
+    for k in range(len(src)):
+        i = src[k]
+        pos = fill[i]
+        merged_indices[pos] = dst[k]
+        merged_weights[pos] = raw_weights[k]
+        fill[i] = pos + 1
+    del fill
+
+    # drop repeated edges row by row, compacting the arrays in place
+    write = 0
+    start = 0
+    for i in range(n):
+        end = merged[i + 1]
+        seen = set()
+        for k in range(start, end):
+            j = merged_indices[k]
+            if j not in seen:
+                seen.add(j)
+                merged_indices[write] = j
+                merged_weights[write] = merged_weights[k]
+                write += 1
+        start = end
+        merged[i + 1] = write
+    del merged_indices[write:]
+    del merged_weights[write:]
+    return merged, merged_indices, merged_weights
+
+
+def import_edge_list(path: str, delimiter: Optional[str] = None, directed: bool = False,
+                     compact: bool = False, chunk_size: int = 65536, default_weight: float = 1.0,
+                     header: Optional[bool] = None):
+    """
+    Builds a graph from a CSV or TSV edge list in a single streaming pass.
+
+    Each line is "u,v" or "u,v,weight". The file is read chunk_size lines
+    at a time, vertex names are interned so every occurrence shares one
+    string, self-loops are dropped (their vertex is kept), and repeated
+    edges keep the first weight seen. Unless directed is set, every edge is
+    stored in both directions, as discover_network and the test graphs do.
+
+    With compact=False the result is a Graph of Vertex objects. With
+    compact=True no Vertex or edge tuple is ever created: edges go
+    straight into flat arrays (about 12 bytes per stored edge) and the
+    result is an in-memory CSRGraph. Repeated edges are merged away while
+    the file is read, so peak memory grows with the distinct edges plus
+    one chunk, not with the number of lines.
+
+    Args:
+        path (str): The file to read.
+        delimiter (Optional[str]): The column separator. Defaults to a tab
+            for .tsv/.tab files and a comma otherwise.
+        directed (bool): Store each edge only in the u -> v direction.
+        compact (bool): Return a CSRGraph instead of a Graph.
+        chunk_size (int): The number of lines parsed per batch.
+        default_weight (float): The weight of lines without a weight column.
+        header (Optional[bool]): Whether the first line is a header. None
+            detects one by known column names (e.g. "source,target"), or by
+            a weight column that is not a number when the two endpoint
+            columns aren't numbers either.
+
+    Returns:
+        Graph or CSRGraph: The imported graph.
+
+    Raises:
+        ValueError: If a line has fewer than two columns or a weight that is
+            not a number. The message gives the line number.
+    """
+    chunks = _read_edge_rows(path, delimiter, chunk_size, default_weight, header)
+    if not compact:
+        vertices: Dict[str, Vertex] = {}
+        for chunk in chunks:
+            for u, v, weight in chunk:
+                vertex_u = vertices.get(u)
+                if vertex_u is None:
+                    vertex_u = vertices[u] = Vertex(u)
+                vertex_v = vertices.get(v)
+                if vertex_v is None:
+                    vertex_v = vertices[v] = Vertex(v)
+                if vertex_u is vertex_v:
+                    continue
+                # reuse the first copy of each name (the interned one)
+                u = vertex_u.name
+                v = vertex_v.name
+                if v not in vertex_u.children:
+                    vertex_u.children[v] = (u, v, weight)
+                if not directed and u not in vertex_v.children:
+                    vertex_v.children[u] = (v, u, weight)
+        return Graph(list(vertices.values()))
+
+    # edges are kept as CSR arrays over ids in order of first appearance,
+    # deduplicated; raw edges are buffered and merged in once there are as
+    # many of them as stored edges, so memory stays proportional to the
+    # distinct edges (plus a chunk) however many repeats the file has
+    ids: Dict[str, int] = {}
+    indptr = array('Q', [0])
+    indices = array('I')
+    weights = array('d')
+    src = array('I')
+    dst = array('I')
+    raw_weights = array('d')
+    for chunk in chunks:
+        for u, v, weight in chunk:
+            i = ids.get(u)
+            if i is None:
+                i = ids[u] = len(ids)
+            j = ids.get(v)
+            if j is None:
+                j = ids[v] = len(ids)
+            if i == j:
+                continue
+            src.append(i)
+            dst.append(j)
+            raw_weights.append(weight)
+            if not directed:
+                src.append(j)
+                dst.append(i)
+                raw_weights.append(weight)
+        if len(src) >= max(chunk_size, len(indices)):
+            indptr, indices, weights = _merge_edges(len(ids), indptr, indices, weights, src, dst, raw_weights)
+            src, dst, raw_weights = array('I'), array('I'), array('d')
+    indptr, indices, weights = _merge_edges(len(ids), indptr, indices, weights, src, dst, raw_weights)
+    del src, dst, raw_weights
+
+    # renumber so ids follow sorted name order, as in a snapshot file
+    names = sorted(ids)
+    n = len(names)
+    new_id = array('I', [0]) * n
+    for rank, name in enumerate(names):
+        new_id[ids[name]] = rank
+    del ids
+    old_indptr = indptr
+    indptr = array('Q', [0]) * (n + 1)
+    for i in range(n):
+        indptr[new_id[i] + 1] = old_indptr[i + 1] - old_indptr[i]
+    for i in range(n):
+        indptr[i + 1] += indptr[i]
+    sorted_indices = array('I', [0]) * len(indices)
+    sorted_weights = array('d', [0.0]) * len(indices)
+    for i in range(n):
+        start, end, to = old_indptr[i], old_indptr[i + 1], indptr[new_id[i]]
+        sorted_indices[to:to + end - start] = indices[start:end]
+        sorted_weights[to:to + end - start] = weights[start:end]
+    del indices, weights, old_indptr
+    for k in range(len(sorted_indices)):
+        sorted_indices[k] = new_id[sorted_indices[k]]
+
+    name_offsets = array('Q', [0])
+    blob = bytearray()
+    for name in names:
+        blob += name.encode("utf-8")
+        name_offsets.append(len(blob))
+    return CSRGraph(indptr, sorted_indices, sorted_weights, name_offsets, bytes(blob))
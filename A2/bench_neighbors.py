@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Vertex.get_children() (copies into a new list) vs
+Vertex.iter_edges() (live view of the children dict).
+
+A traversal visits every vertex and reads every edge once, which is what
+prim_mst, kruskal_mst and find_path do per pass. For each style we report
+the traversal time, how many objects one traversal allocates and how many
+bytes those objects take, and the peak traced memory while it runs.
+
+Usage:
+    python bench_neighbors.py [--n N] [--degree D] [--repeat R] [--seed S]
+"""
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from a2_submission import Vertex, Graph, prim_mst
+
+
+def random_graph(n, degree, seed):
+    """An undirected graph with n vertices and about n * degree / 2 edges."""
+    rng = random.Random(seed)
+    names = [f"V{i}" for i in range(n)]
+    vertices = [Vertex(name) for name in names]
+    for i in range(n):
+        for _ in range(degree // 2):
+            j = rng.randrange(n)
+            if i == j:
+                continue
+            weight = float(rng.randint(1, 100))
+            vertices[i].children[names[j]] = (names[i], names[j], weight)
+            vertices[j].children[names[i]] = (names[j], names[i], weight)
+    return Graph(vertices)
+
+
+def traverse_copy(graph):
+    total = 0.0
+    for vertex in graph.get_vertices():
+        for edge in vertex.get_children():
+            total += edge[2]
+    return total
+
+
+def traverse_view(graph):
+    total = 0.0
+    for vertex in graph.get_vertices():
+        for edge in vertex.iter_edges():
+            total += edge[2]
+    return total
+
+
+def allocations(graph, method):
+    """Count and size the container objects one traversal creates."""
+    count = 0
+    size = 0
+    for vertex in graph.get_vertices():
+        obj = getattr(vertex, method)()
+        count += 1
+        size += sys.getsizeof(obj)
+    return count, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=50000)
+    parser.add_argument("--degree", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=263)
+    args = parser.parse_args()
+
+    graph = random_graph(args.n, args.degree, args.seed)
+    edges = sum(len(v.children) for v in graph.get_vertices())
+    print(f"vertices={args.n} directed edges={edges}")
+    print(f"{'method':<14} {'time s':>8} {'objects':>8} {'bytes':>11} {'peak KB':>8}")
+
+    for label, traverse, method in (("get_children", traverse_copy, "get_children"),
+                                    ("iter_edges", traverse_view, "iter_edges")):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            traverse(graph)
+            best = min(best, time.perf_counter() - start)
+        count, size = allocations(graph, method)
+        tracemalloc.start()
+        traverse(graph)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{label:<14} {best:>8.4f} {count:>8} {size:>11} {peak / 1024:>8.1f}")
+
+    start = time.perf_counter()
+    prim_mst(graph)
+    print(f"prim_mst on the same graph: {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dict-based UnionFind vs NamedUnionFind vs ArrayUnionFind.
+
+Each structure gets the same seeded random unions followed by finds on
+every element, plus one find from the end of an n-long parent chain (the
+case that used to hit the recursion limit). Time, and the peak traced memory of
+building the structure, are reported.
+
+Usage:
+    python bench_union_find.py [--n N] [--ops M] [--seed S]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from a2_submission import UnionFind, NamedUnionFind, ArrayUnionFind
+
+
+def run(make, keys, pairs, set_parent):
+    """Return (build seconds, union seconds, find seconds, chain find seconds, peak MB)."""
+    start = time.perf_counter()
+    uf = make(keys)
+    built = time.perf_counter()
+    for x, y in pairs:
+        uf.union(x, y)
+    unioned = time.perf_counter()
+    for x in keys:
+        uf.find(x)
+    found = time.perf_counter()
+    del uf
+
+    # memory is measured on a separate build, since tracing slows every allocation
+    tracemalloc.start()
+    uf = make(keys)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # union by rank/size never builds a deep tree, so wire a raw parent
+    # chain keys[0] -> keys[1] -> ... -> keys[-1] and find from its far end
+    uf = make(keys)
+    for i in range(len(keys) - 1):
+        set_parent(uf, keys[i], keys[i + 1])
+    chain_start = time.perf_counter()
+    uf.find(keys[0])
+    chain_end = time.perf_counter()
+    return built - start, unioned - built, found - unioned, chain_end - chain_start, peak / 2 ** 20
+
+
+def set_dict_parent(uf, child, parent):
+    uf.parent[child] = parent
+
+
+def set_named_parent(uf, child, parent):
+    uf.uf.parent[uf.ids[child]] = uf.ids[parent]
+
+
+def set_array_parent(uf, child, parent):
+    uf.parent[child] = parent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=200000)
+    parser.add_argument("--ops", type=int, default=400000)
+    parser.add_argument("--seed", type=int, default=263)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    n = args.n
+    int_pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(args.ops)]
+    names = [f"N{i}" for i in range(n)]
+    name_pairs = [(names[x], names[y]) for x, y in int_pairs]
+
+    contenders = [
+        ("UnionFind (dict)", UnionFind, names, name_pairs, set_dict_parent),
+        ("NamedUnionFind", NamedUnionFind, names, name_pairs, set_named_parent),
+        ("ArrayUnionFind", lambda keys: ArrayUnionFind(len(keys)), range(n), int_pairs, set_array_parent),
+    ]
+
+    print(f"n={n} unions={args.ops}")
+    print(f"{'structure':<18} {'build s':>8} {'union s':>8} {'find s':>8} {'chain s':>8} {'peak MB':>8}")
+    for label, make, keys, pairs, set_parent in contenders:
+        build, union, find, chain_find, peak = run(make, keys, pairs, set_parent)
+        print(f"{label:<18} {build:>8.3f} {union:>8.3f} {find:>8.3f} {chain_find:>8.4f} {peak:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
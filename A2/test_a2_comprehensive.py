@@ -3,9 +3,18 @@ COMPREHENSIVE TEST SUITE for A2: Union-Find, Kruskal's, and Prim's algorithms
 Tests edge cases, stress tests, and advanced scenarios
 """
 
-from a2_submission import Vertex, Graph, UnionFind, kruskal_mst, prim_mst
+from a2_submission import (Vertex, Graph, UnionFind, kruskal_mst, prim_mst, boruvka_mst,
+                           filter_kruskal_mst, kruskal_mst_sorted, ArrayUnionFind, NamedUnionFind,
+                           label_components, DynamicMST, StreamingMST, RollbackUnionFind,
+                           offline_connectivity, save_graph, load_graph, CSRGraph, import_edge_list,
+                           OpCounters, connected_components, articulation_points, bridges,
+                           biconnected_components)
 from typing import List, Tuple
+import a2_submission
+import ast
+import os
 import random
+import tempfile
 
 
 # ============================================================================
@@ -208,6 +217,163 @@ def test_unionfind_star_pattern():
     print("✓ Star pattern test passed")
 
 
+def test_unionfind_deep_chain():
+    """Test that find on a very long parent chain does not recurse"""
+    print("Testing Union-Find find on a 100000 long parent chain...")
+    n = 100000
+    elements = [f"E{i}" for i in range(n)]
+    uf = UnionFind(elements)
+
+    # wire the chain by hand, union by rank would never build it
+    for i in range(n - 1):
+        uf.parent[elements[i]] = elements[i + 1]
+
+    assert uf.find("E0") == elements[-1]
+    # path compression flattened the chain
+    assert uf.parent["E0"] == elements[-1]
+
+    print("✓ Deep chain test passed")
+
+
+def test_array_unionfind():
+    """Test the integer Union-Find and its bulk operations"""
+    print("Testing ArrayUnionFind...")
+    uf = ArrayUnionFind(10)
+
+    assert uf.union(0, 1) == True
+    assert uf.union(1, 0) == False
+    assert uf.union_many([(2, 3), (3, 4), (0, 4), (1, 2)]) == 3
+    assert uf.count == 6
+    assert uf.component_size(3) == 5
+    assert uf.connected(0, 4) and not uf.connected(0, 5)
+
+    roots = uf.find_many([0, 1, 2, 3, 4, 5])
+    assert len(set(roots[:5])) == 1 and roots[5] == 5
+
+    new_id = uf.add()
+    assert new_id == 10 and uf.count == 7 and uf.find(10) == 10
+
+    print("✓ ArrayUnionFind test passed")
+
+
+def test_named_unionfind_matches_unionfind():
+    """Test that NamedUnionFind agrees with UnionFind on random unions"""
+    print("Testing NamedUnionFind against UnionFind...")
+    elements = [f"E{i}" for i in range(300)]
+    uf = UnionFind(elements)
+    named = NamedUnionFind(elements)
+
+    rng = random.Random(3)
+    for _ in range(250):
+        x = rng.choice(elements)
+        y = rng.choice(elements)
+        assert uf.union(x, y) == named.union(x, y)
+
+    for x in elements:
+        for y in elements[:20]:
+            assert (uf.find(x) == uf.find(y)) == named.connected(x, y)
+
+    named.add("extra")
+    assert "extra" in named and named.find("extra") == "extra"
+
+    print("✓ NamedUnionFind equivalence test passed")
+
+
+def test_vectorized_components():
+    """Test the NumPy batched union against the edge-by-edge union"""
+    print("Testing vectorized connected components...")
+    # without NumPy, every NumPy method explains what is missing
+    saved, a2_submission.np = a2_submission.np, None
+    try:
+        for method in ("union_arrays", "labels", "component_sizes"):
+            try:
+                getattr(ArrayUnionFind(2), method)(*([[0], [1]] if method == "union_arrays" else []))
+                assert False, f"{method} should need numpy"
+            except ImportError:
+                pass
+    finally:
+        a2_submission.np = saved
+
+    try:
+        import numpy
+    except ImportError:
+        print("numpy not installed, skipping")
+        return
+
+    rng = random.Random(5)
+    n = 500
+    u = [rng.randrange(n) for _ in range(400)]
+    v = [rng.randrange(n) for _ in range(400)]
+
+    expected = ArrayUnionFind(n)
+    expected.union_many(zip(u, v))
+
+    labels, count, sizes = label_components(numpy.array(u), numpy.array(v), n)
+    assert count == expected.count, f"Expected {expected.count} components, got {count}"
+    assert sizes.sum() == n
+    for x in range(n):
+        assert labels[x] <= x, "Labels should be the smallest id in the component"
+        assert (labels[x] == labels[u[x % 400]]) == expected.connected(x, u[x % 400])
+
+    # batched unions on top of earlier single unions
+    uf = ArrayUnionFind(n)
+    uf.union_many(zip(u[:200], v[:200]))
+    uf.union_arrays(u[200:], v[200:])
+    roots, root_sizes = uf.component_sizes()
+    assert uf.count == count and len(roots) == count and root_sizes.sum() == n
+    labels = uf.labels()
+    assert [int((labels == root).sum()) for root in roots] == root_sizes.tolist()
+
+    print("✓ Vectorized components test passed")
+
+
+def test_rollback_unionfind():
+    """Test snapshot and rollback of unions"""
+    print("Testing RollbackUnionFind...")
+    uf = RollbackUnionFind(['A', 'B', 'C', 'D'])
+    uf.union('A', 'B')
+    token = uf.snapshot()
+    uf.union('C', 'D')
+    uf.union('A', 'D')
+    assert uf.connected('B', 'C') and uf.count == 1
+
+    uf.rollback(token)
+    assert uf.connected('A', 'B')
+    assert not uf.connected('A', 'C') and not uf.connected('C', 'D')
+    assert uf.count == 3
+
+    uf.rollback(0)
+    assert uf.count == 4 and all(uf.rank[x] == 0 for x in 'ABCD')
+
+    print("✓ RollbackUnionFind test passed")
+
+
+def test_offline_connectivity():
+    """Test offline connectivity queries over a log of link ups and downs"""
+    print("Testing offline dynamic connectivity...")
+    events = [
+        (1, "up", 'A', 'B'),
+        (2, "up", 'B', 'C'),
+        (4, "down", 'A', 'B'),
+        (5, "up", 'C', 'A'),
+        (7, "down", 'B', 'C'),
+    ]
+    queries = [
+        (0, 'A', 'B'),   # nothing is up yet
+        (1, 'A', 'B'),   # events apply at their own time
+        (3, 'A', 'C'),   # A - B - C
+        (4, 'A', 'C'),   # A - B went down
+        (6, 'A', 'B'),   # A - C - B
+        (8, 'A', 'B'),   # B - C went down
+        (8, 'A', 'C'),   # A - C is still up
+        (3, 'D', 'D'),   # a vertex is always connected to itself
+    ]
+    answers = offline_connectivity(['A', 'B', 'C', 'D'], events, queries)
+    assert answers == [False, True, True, False, True, False, True, True], f"Got {answers}"
+
+    print("✓ Offline dynamic connectivity test passed")
+
+
 # ============================================================================
 # KRUSKAL'S ADVANCED TESTS
 # ============================================================================
@@ -561,6 +727,606 @@ def test_stress_prim():
     print("✓ Prim stress test passed")
 
 
+def test_edge_list_cache():
+    """Test that the edge list is reused until the graph changes, hand edits included"""
+    print("Testing edge list cache...")
+    # an in-place weight edit is seen without touch()
+    v_a = Vertex('a', {'b': ('a', 'b', 1.0), 'c': ('a', 'c', 3.0)})
+    v_b = Vertex('b', {'a': ('b', 'a', 1.0), 'c': ('b', 'c', 2.0)})
+    v_c = Vertex('c', {'a': ('c', 'a', 3.0), 'b': ('c', 'b', 2.0)})
+    triangle = Graph([v_a, v_b, v_c])
+    assert kruskal_mst(triangle) == [('a', 'b', 1.0), ('b', 'c', 2.0)]
+    v_a.children['c'] = ('a', 'c', 0.5)
+    v_c.children['a'] = ('c', 'a', 0.5)
+    assert kruskal_mst(triangle) == [('a', 'c', 0.5), ('a', 'b', 1.0)]
+    assert sorted(kruskal_mst(triangle)) == sorted(prim_mst(triangle))
+
+    graph = create_complete_graph(6)
+    edges = graph.get_edge_list()
+    assert len(edges) == 15, f"Expected 15 edges, got {len(edges)}"
+    assert all(u < v for u, v, _ in edges)
+    assert [e[2] for e in edges] == sorted(e[2] for e in edges)
+    assert graph.get_edge_list() is edges, "Unchanged graph should reuse the edge list"
+    kruskal_mst(graph)
+    prim_mst(graph)
+    assert graph.get_edge_list() is edges, "MST passes should not invalidate the edge list"
+
+    # the mutation API, hand edits and every dict method on children invalidate it
+    a, b = graph.get_vertices()[0], graph.get_vertices()[1]
+    graph.set_weight(a.name, b.name, 0.5)
+    assert graph.get_edge_list()[0] == (a.name, b.name, 0.5)
+    a.children[b.name] = (a.name, b.name, 0.25)
+    b.children[a.name] = (b.name, a.name, 0.25)
+    assert graph.get_edge_list()[0] == (a.name, b.name, 0.25)
+    a.children.update({b.name: (a.name, b.name, 0.125)})
+    b.children |= {a.name: (b.name, a.name, 0.125)}
+    assert graph.get_edge_list()[0] == (a.name, b.name, 0.125)
+    a.children.pop(b.name)
+    del b.children[a.name]
+    assert len(graph.get_edge_list()) == 14
+
+    # so do replacing children, and adding or swapping vertices
+    swapped = Vertex('Z', {a.name: ('Z', a.name, 0.0)})
+    a.children = dict(a.children, Z=(a.name, 'Z', 9.0))
+    graph.get_vertices().append(Vertex('Z', {a.name: ('Z', a.name, 9.0)}))
+    assert len(graph.get_edge_list()) == 15
+    graph.get_vertices()[-1] = swapped
+    assert graph.get_edge_list()[0] == (a.name, 'Z', 0.0)
+
+    print("✓ Edge list cache test passed")
+
+
+def test_vertex_iteration_views():
+    """Test the non-copying neighbour iteration on Vertex"""
+    print("Testing Vertex neighbour views...")
+    vertex = Vertex('A', {'B': ('A', 'B', 1.0), 'C': ('A', 'C', 2.0)})
+
+    assert list(vertex.iter_edges()) == vertex.get_children()
+    assert list(vertex.iter_neighbors()) == ['B', 'C']
+    assert list(vertex.iter_neighbor_ids({'A': 0, 'B': 1, 'C': 2})) == [1, 2]
+
+    # views are live, not copies
+    edges = vertex.iter_edges()
+    vertex.children['D'] = ('A', 'D', 3.0)
+    assert len(edges) == 3
+
+    print("✓ Vertex neighbour views test passed")
+
+
+# ============================================================================
+# BORUVKA TESTS
+# ============================================================================
+
+def create_random_graph(n: int, m: int, seed: int) -> Graph:
+    """Creates a random undirected graph with n vertices and up to m edges"""
+    rng = random.Random(seed)
+    names = [f"V{i}" for i in range(n)]
+    vertices = [Vertex(name) for name in names]
+    for _ in range(m):
+        i = rng.randrange(n)
+        j = rng.randrange(n)
+        if i == j:
+            continue
+        weight = float(rng.randint(1, 10))
+        vertices[i].children[names[j]] = (names[i], names[j], weight)
+        vertices[j].children[names[i]] = (names[j], names[i], weight)
+    return Graph(vertices)
+
+
+def test_boruvka_matches_kruskal():
+    """Test that Boruvka's produces the same total weight as Kruskal's"""
+    print("Testing Boruvka's against Kruskal's (serial and process pool)...")
+
+    test_graphs = [
+        ("Complete 8", create_complete_graph(8)),
+        ("Equal weights", create_equal_weight_graph()),
+        ("Disconnected", create_disconnected_graph()),
+        ("Random 200", create_random_graph(200, 600, seed=7)),
+        ("Empty", Graph([])),
+    ]
+
+    for name, graph in test_graphs:
+        kruskal_edges = kruskal_mst(graph)
+        kruskal_weight = sum(e[2] for e in kruskal_edges)
+        for workers in (1, 2):
+            boruvka_edges = boruvka_mst(graph, workers=workers)
+            boruvka_weight = sum(e[2] for e in boruvka_edges)
+            assert abs(kruskal_weight - boruvka_weight) < 0.001, \
+                f"{name}: Kruskal {kruskal_weight} != Boruvka {boruvka_weight} ({workers} workers)"
+            assert len(boruvka_edges) == len(kruskal_edges), f"{name}: Different edge counts"
+
+    print("✓ Boruvka weight equivalence test passed")
+
+
+# ============================================================================
+# FILTER-KRUSKAL TESTS
+# ============================================================================
+
+def test_filter_kruskal_matches_kruskal():
+    """Test that Filter-Kruskal produces the same total weight as Kruskal's"""
+    print("Testing Filter-Kruskal against Kruskal's...")
+
+    test_graphs = [
+        ("Complete 20", create_complete_graph(20)),
+        ("Equal weights", create_equal_weight_graph()),
+        ("Disconnected", create_disconnected_graph()),
+        ("Star 30", create_star_graph(30)),
+        ("Random 300", create_random_graph(300, 3000, seed=11)),
+        ("Empty", Graph([])),
+    ]
+
+    for name, graph in test_graphs:
+        kruskal_edges = kruskal_mst(graph)
+        kruskal_weight = sum(e[2] for e in kruskal_edges)
+        for base_size in (1, 8, 64):
+            filter_edges = filter_kruskal_mst(graph, base_size=base_size, seed=1)
+            filter_weight = sum(e[2] for e in filter_edges)
+            assert abs(kruskal_weight - filter_weight) < 0.001, \
+                f"{name}: Kruskal {kruskal_weight} != Filter-Kruskal {filter_weight}"
+            assert len(filter_edges) == len(kruskal_edges), f"{name}: Different edge counts"
+
+    print("✓ Filter-Kruskal weight equivalence test passed")
+
+
+def test_kruskal_sorted_stream_stops_early():
+    """Test that the presorted Kruskal's stops reading once the tree is complete"""
+    print("Testing presorted Kruskal's early exit...")
+
+    consumed = []
+
+    def edge_stream():
+        edges = [('A', 'B', 1.0), ('B', 'C', 2.0), ('A', 'C', 3.0), ('C', 'D', 4.0),
+                 ('A', 'D', 5.0), ('B', 'D', 6.0)]
+        for edge in edges:
+            consumed.append(edge)
+            yield edge
+
+    mst = kruskal_mst_sorted(edge_stream(), ['A', 'B', 'C', 'D'])
+    assert mst == [('A', 'B', 1.0), ('B', 'C', 2.0), ('C', 'D', 4.0)]
+    assert len(consumed) == 4, f"Expected 4 edges read, got {len(consumed)}"
+
+    print("✓ Presorted Kruskal's early exit test passed")
+
+
+# ============================================================================
+# DYNAMIC MST TESTS
+# ============================================================================
+
+def graph_from_edges(names: List[str], edges: dict) -> Graph:
+    """Builds an undirected Graph from a {(u, v): weight} mapping"""
+    vertices = {name: Vertex(name) for name in names}
+    for (u, v), weight in edges.items():
+        vertices[u].children[v] = (u, v, weight)
+        vertices[v].children[u] = (v, u, weight)
+    return Graph(list(vertices.values()))
+
+
+def test_dynamic_mst_matches_recompute():
+    """Test that DynamicMST tracks Kruskal's through random updates"""
+    print("Testing DynamicMST against recomputing Kruskal's after every update...")
+
+    rng = random.Random(263)
+    names = [f"V{i}" for i in range(15)]
+    graph = create_random_graph(15, 30, seed=263)
+    edges = {}
+    for vertex in graph.get_vertices():
+        for u, v, weight in vertex.get_children():
+            edges[(min(u, v), max(u, v))] = weight
+
+    dynamic = DynamicMST(graph)
+    for step in range(300):
+        op = rng.random()
+        if op < 0.4 or not edges:
+            u, v = rng.sample(names, 2)
+            weight = float(rng.randint(1, 10))
+            dynamic.insert_edge(u, v, weight)
+            edges[(min(u, v), max(u, v))] = weight
+        elif op < 0.7:
+            u, v = rng.choice(sorted(edges))
+            assert dynamic.delete_edge(u, v)
+            del edges[(u, v)]
+        else:
+            u, v = rng.choice(sorted(edges))
+            weight = float(rng.randint(1, 10))
+            dynamic.set_weight(v, u, weight)
+            edges[(u, v)] = weight
+
+        expected = kruskal_mst(graph_from_edges(names, edges))
+        expected_weight = sum(e[2] for e in expected)
+        assert abs(dynamic.total_weight - expected_weight) < 0.001, \
+            f"Step {step}: expected {expected_weight}, got {dynamic.total_weight}"
+        assert len(dynamic.edges()) == len(expected), f"Step {step}: different edge counts"
+
+    print("✓ DynamicMST test passed")
+
+
+def test_dynamic_mst_cycle_replacement():
+    """Test that inserting a cheap edge replaces the heaviest edge on its cycle"""
+    print("Testing DynamicMST cycle replacement and delete reconnection...")
+    graph = create_linear_chain(4)  # A - B - C - D, all weight 1.0
+    dynamic = DynamicMST(graph)
+    dynamic.set_weight('B', 'C', 5.0)
+    assert dynamic.total_weight == 7.0
+
+    assert dynamic.insert_edge('A', 'D', 2.0) == True
+    assert not dynamic.is_tree_edge('B', 'C')
+    assert dynamic.total_weight == 4.0
+    assert dynamic.path_max('B', 'C')[2] == 2.0
+
+    assert dynamic.delete_edge('A', 'D')
+    assert dynamic.is_tree_edge('B', 'C'), "B-C should reconnect the tree"
+    assert dynamic.total_weight == 7.0
+
+    print("✓ DynamicMST cycle replacement test passed")
+
+
+def test_streaming_mst_matches_kruskal():
+    """Test that StreamingMST matches Kruskal's at every point of an edge stream"""
+    print("Testing StreamingMST against Kruskal's on every prefix of a stream...")
+
+    rng = random.Random(34)
+    names = [f"V{i}" for i in range(20)]
+    stream = []
+    for _ in range(120):
+        u, v = rng.sample(names, 2)
+        stream.append((u, v, float(rng.randint(1, 20))))
+
+    streaming = StreamingMST()
+    seen = {}
+    for i in range(0, len(stream), 10):
+        chunk = stream[i:i + 10]
+        streaming.add_edges(chunk)
+        for u, v, weight in chunk:
+            key = (min(u, v), max(u, v))
+            seen[key] = min(weight, seen.get(key, weight))
+
+        expected = kruskal_mst(graph_from_edges(sorted({x for key in seen for x in key}), seen))
+        expected_weight = sum(e[2] for e in expected)
+        assert abs(streaming.total_weight - expected_weight) < 0.001, \
+            f"After {i + 10} edges: expected {expected_weight}, got {streaming.total_weight}"
+        assert len(streaming.edges()) == len(expected)
+
+    print("✓ StreamingMST test passed")
+
+
+# ============================================================================
+# BINARY SNAPSHOT TESTS
+# ============================================================================
+
+def test_snapshot_round_trip():
+    """Test saving a graph to a binary snapshot and memory-mapping it back"""
+    print("Testing binary graph snapshot round trip...")
+    graph = create_random_graph(200, 800, seed=38)
+    graph.get_vertices().append(Vertex('Ünïcode', {}))
+
+    fd, path = tempfile.mkstemp(suffix=".csrg")
+    os.close(fd)
+    try:
+        save_graph(graph, path)
+        with load_graph(path) as snapshot:
+            assert snapshot.n == 201
+            assert snapshot.m == sum(len(v.children) for v in graph.get_vertices())
+            for vertex in graph.get_vertices():
+                i = snapshot.id_of(vertex.name)
+                assert i is not None and snapshot.name(i) == vertex.name
+                assert dict((snapshot.name(j), w) for j, w in snapshot.neighbors(i)) == \
+                    {child: edge[2] for child, edge in vertex.children.items()}
+            assert snapshot.id_of('missing') is None
+
+            kruskal_weight = sum(e[2] for e in kruskal_mst(graph))
+            snapshot_weight = sum(e[2] for e in snapshot.mst())
+            assert abs(kruskal_weight - snapshot_weight) < 0.001
+
+            in_memory = CSRGraph.from_graph(graph)
+            assert snapshot.find_path('V0', 'V1') == in_memory.find_path('V0', 'V1')
+            assert snapshot.find_path('V0', 'Ünïcode') is None
+
+            restored = snapshot.to_graph()
+            assert len(restored.get_edge_list()) == len(graph.get_edge_list())
+    finally:
+        os.remove(path)
+
+    print("✓ Snapshot round trip test passed")
+
+
+def test_snapshot_find_path():
+    """Test cheapest path search on a CSR graph"""
+    print("Testing CSR cheapest path...")
+    v_a = Vertex('A', {'B': ('A', 'B', 1.0), 'C': ('A', 'C', 5.0)})
+    v_b = Vertex('B', {'A': ('B', 'A', 1.0), 'C': ('B', 'C', 1.0)})
+    v_c = Vertex('C', {'A': ('C', 'A', 5.0), 'B': ('C', 'B', 1.0)})
+    csr = CSRGraph.from_graph(Graph([v_a, v_b, v_c]))
+
+    assert csr.find_path('A', 'C') == ['A', 'B', 'C']
+    assert csr.find_path('A', 'A') == ['A']
+
+    print("✓ CSR cheapest path test passed")
+
+
+def test_import_edge_list():
+    """Test building graphs from CSV and TSV edge lists"""
+    print("Testing streaming edge-list import...")
+    directory = tempfile.mkdtemp()
+    csv_path = os.path.join(directory, "edges.csv")
+    tsv_path = os.path.join(directory, "edges.tsv")
+    with open(csv_path, "w") as f:
+        f.write("source,target,weight\n# a comment\nA,B,1\nB,C,2\n\nB,A,7\nC,A,3\nD,D,1\nE,F\n")
+    with open(tsv_path, "w") as f:
+        f.write("A\tB\t1\nB\tC\t2\nB\tA\t7\nC\tA\t3\nD\tD\t1\nE\tF\n")
+
+    try:
+        for path in (csv_path, tsv_path):
+            graph = import_edge_list(path, chunk_size=2)
+            children = {v.name: v.children for v in graph.get_vertices()}
+            assert set(children) == {'A', 'B', 'C', 'D', 'E', 'F'}
+            assert children['A']['B'] == ('A', 'B', 1.0), "The first weight seen should win"
+            assert children['B']['A'] == ('B', 'A', 1.0)
+            assert children['D'] == {}, "Self-loops should be dropped"
+            assert children['E']['F'] == ('E', 'F', 1.0), "Missing weights default to 1.0"
+
+            compact = import_edge_list(path, compact=True, chunk_size=2)
+            assert compact.n == 6 and compact.m == 8
+            restored = {v.name: v.children for v in compact.to_graph().get_vertices()}
+            assert restored == children
+
+        directed = import_edge_list(csv_path, directed=True)
+        assert sum(len(v.children) for v in directed.get_vertices()) == 5
+    finally:
+        os.remove(csv_path)
+        os.remove(tsv_path)
+        os.rmdir(directory)
+
+    print("✓ Edge-list import test passed")
+
+
+def test_import_edge_list_headers():
+    """Test header detection and line-numbered weight errors in the edge-list import"""
+    print("Testing edge-list header handling...")
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "edges.csv")
+
+    def names(text, **kwargs):
+        with open(path, "w") as f:
+            f.write(text)
+        return sorted(v.name for v in import_edge_list(path, **kwargs).get_vertices())
+
+    try:
+        assert names("a,b\nx,y\n") == ['a', 'b', 'x', 'y'], "unknown names are data, not a header"
+        assert names("source,target\nx,y\n") == ['x', 'y']
+        assert names("# comment\nSrc,Dst,weight\nx,y,2\n") == ['x', 'y']
+        assert names("u,v,w\n1,2,3\n") == ['1', '2'], "a header with no numbers in it is detected"
+        assert names("a,b\nx,y\n", header=True) == ['x', 'y']
+        assert names("source,target\nx,y\n", header=False) == ['source', 'target', 'x', 'y']
+
+        for text, kwargs, line in (("x,y,oops\nb,c,1\n", {"header": False}, 1),
+                                   ("u,v,weight\nx,y,1\n\n# c\nb,c,bad\n", {}, 5),
+                                   ("x,y,1\nb,c,bad\n", {}, 2),
+                                   ("1,2,oops\n3,4,1\n", {}, 1)):
+            try:
+                names(text, **kwargs)
+                assert False, "a bad weight should raise ValueError"
+            except ValueError as exc:
+                assert f"{path}:{line}:" in str(exc), str(exc)
+    finally:
+        os.remove(path)
+        os.rmdir(directory)
+
+    print("✓ Edge-list header test passed")
+
+
+# ============================================================================
+# GRAPH MUTATION TESTS
+# ============================================================================
+
+def test_graph_mutation_api():
+    """Test the Graph mutation methods, the name index and the change log"""
+    print("Testing Graph mutations and changes_since...")
+    graph = Graph([Vertex('A')], log_size=4)
+    start = graph.generation
+
+    graph.add_edge('A', 'B', 2.0)
+    graph.add_edge('B', 'C', 3.0, directed=True)
+    assert graph.get_edge('B', 'A') == ('B', 'A', 2.0)
+    assert graph.get_edge('C', 'B') is None
+    assert graph.get_vertex('C').name == 'C'
+    assert graph.add_vertex('A') is graph.get_vertex('A'), "existing vertex should be returned"
+
+    graph.set_weight('A', 'B', 5.0)
+    assert graph.get_edge('B', 'A')[2] == 5.0
+    assert graph.get_edge_list() == (('B', 'C', 3.0), ('A', 'B', 5.0))
+    try:
+        graph.set_weight('C', 'A', 1.0)
+        assert False, "set_weight on a missing edge should raise"
+    except KeyError:
+        pass
+
+    # an edge to a name with no vertex: the reverse side can't be updated
+    dangling = Graph([Vertex('A', {'Ghost': ('A', 'Ghost', 1.0)})])
+    try:
+        dangling.set_weight('A', 'Ghost', 2.0)
+        assert False, "set_weight should check both endpoints"
+    except KeyError:
+        pass
+    assert dangling.get_edge('A', 'Ghost')[2] == 1.0 and dangling.generation == 0
+    dangling.set_weight('A', 'Ghost', 2.0, directed=True)
+    assert dangling.get_edge('A', 'Ghost')[2] == 2.0
+
+    # five changes so far but the log only holds four, so the first is gone
+    assert graph.generation == start + 5
+    assert graph.changes_since(start) is None
+    ops = [change[1] for change in graph.changes_since(start + 1)]
+    assert ops == ['add_edge', 'add_vertex', 'add_edge', 'set_weight']
+    assert graph.changes_since(graph.generation) == []
+
+    gen = graph.generation
+    assert graph.remove_edge('A', 'B')
+    assert not graph.remove_edge('A', 'B')
+    assert graph.remove_vertex('C')
+    assert graph.get_vertex('C') is None and graph.get_edge('B', 'C') is None
+    assert [change[1] for change in graph.changes_since(gen)] == ['remove_edge', 'remove_vertex']
+
+    graph.touch()
+    assert graph.changes_since(gen) is None, "touch() can't be replayed"
+
+    # direct edits to the vertex list are picked up by the index
+    graph.vertices.append(Vertex('Z'))
+    assert graph.get_vertex('Z') is graph.vertices[-1]
+
+    print("✓ Graph mutation test passed")
+
+
+def test_dynamic_mst_refresh():
+    """Test that DynamicMST.refresh replays Graph mutations"""
+    print("Testing DynamicMST.refresh against recomputing Kruskal's...")
+    rng = random.Random(40)
+    graph = create_random_graph(12, 25, seed=40)
+    dynamic = DynamicMST(graph)
+
+    for step in range(200):
+        names = [v.name for v in graph.get_vertices()]
+        edges = graph.get_edge_list()
+        op = rng.random()
+        if op < 0.4 or not edges:
+            u, v = rng.sample(names, 2) if len(names) > 1 else (names[0], f"N{step}")
+            graph.add_edge(u, v, float(rng.randint(1, 10)))
+        elif op < 0.7:
+            u, v, _ = rng.choice(edges)
+            graph.remove_edge(u, v)
+        elif op < 0.9:
+            u, v, _ = rng.choice(edges)
+            graph.set_weight(v, u, float(rng.randint(1, 10)))
+        elif op < 0.95:
+            graph.add_vertex(f"N{step}")
+        else:
+            graph.remove_vertex(rng.choice(names))
+
+        if step % 3 == 0:
+            assert dynamic.refresh() >= 0
+            expected = sum(e[2] for e in kruskal_mst(graph))
+            assert abs(dynamic.total_weight - expected) < 0.001, \
+                f"Step {step}: expected {expected}, got {dynamic.total_weight}"
+            assert set(dynamic.tree) == {v.name for v in graph.get_vertices()}
+
+    graph.touch()
+    assert dynamic.refresh() == -1
+    assert abs(dynamic.total_weight - sum(e[2] for e in kruskal_mst(graph))) < 0.001
+
+    print("✓ DynamicMST refresh test passed")
+
+
+# ============================================================================
+# PROFILING COUNTER TESTS
+# ============================================================================
+
+def test_op_counters():
+    """Test the opt-in operation counters in UnionFind, Kruskal's and Prim's"""
+    print("Testing OpCounters...")
+    graph = create_random_graph(30, 80, seed=42)
+    flushed = []
+    counters = OpCounters(sinks=[flushed.append])
+
+    mst = prim_mst(graph, counters)
+    counts = counters.snapshot()["counts"]
+    assert counts["prim.pops"] - counts["prim.stale_pops"] == len(mst)
+    assert counts["prim.pushes"] >= counts["prim.pops"]
+    assert prim_mst(graph) == mst, "counting should not change the result"
+
+    snap = counters.flush()
+    assert flushed == [snap] and counters.counts == {}
+
+    assert kruskal_mst(graph, counters) == kruskal_mst(graph)
+    counts = counters.counts
+    # one union per edge scanned, and two finds per union
+    assert counts["union_find.union"] == counts["kruskal.edges_scanned"]
+    assert counts["union_find.find"] == 2 * counts["union_find.union"]
+    lengths = counters.snapshot()["samples"]["union_find.find_path_length"]
+    assert lengths["count"] == counts["union_find.find"] and lengths["max"] >= 1
+
+    uf = UnionFind(['A', 'B', 'C'])
+    assert uf.counters is None
+    print("✓ OpCounters test passed")
+
+
+def test_code_from_a1_is_identical():
+    """Test that the classes copied from A1 (OpCounters, Vertex, Graph) haven't drifted from A1's"""
+    print("Testing the CODE FROM A1 copies...")
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def top_level(path):
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+        return {node.name: ast.get_source_segment(source, node)
+                for node in ast.parse(source).body if isinstance(node, ast.ClassDef)}
+
+    a1 = top_level(os.path.join(here, "..", "A1", "a1_submission.py"))
+    a2 = top_level(os.path.join(here, "a2_submission.py"))
+    for name in ("OpCounters", "_EdgeDict", "Vertex", "Graph"):
+        assert a2[name] == a1[name], f"{name} differs between A1 and A2"
+
+    print("✓ CODE FROM A1 copy test passed")
+
+
+# ============================================================================
+# GRAPH ANALYTICS TESTS
+# ============================================================================
+
+def make_undirected(edges, isolated=()):
+    """Builds a Graph from (u, v) pairs, storing each edge both ways with weight 1"""
+    children = {name: {} for name in isolated}
+    for u, v in edges:
+        children.setdefault(u, {})[v] = (u, v, 1.0)
+        children.setdefault(v, {})[u] = (v, u, 1.0)
+    return Graph([Vertex(name, kids) for name, kids in children.items()])
+
+
+def test_articulation_points_and_bridges():
+    """Test cut vertices and bridges on a bowtie with a tail, for Graph and CSRGraph"""
+    print("Testing articulation points and bridges...")
+    # triangles A-B-C and C-D-E share C, the tail E-F-G hangs off E
+    graph = make_undirected([('A', 'B'), ('B', 'C'), ('C', 'A'), ('C', 'D'), ('D', 'E'),
+                             ('E', 'C'), ('E', 'F'), ('F', 'G')], isolated=['H'])
+
+    for g in (graph, CSRGraph.from_graph(graph)):
+        assert articulation_points(g) == ['C', 'E', 'F']
+        assert bridges(g) == [('E', 'F'), ('F', 'G')]
+        assert sorted(map(sorted, connected_components(g))) == \
+            [['A', 'B', 'C', 'D', 'E', 'F', 'G'], ['H']]
+
+    # a cycle has neither
+    cycle = make_undirected([('A', 'B'), ('B', 'C'), ('C', 'D'), ('D', 'A')])
+    assert articulation_points(cycle) == [] and bridges(cycle) == []
+
+    # removing a reported cut vertex really splits the component
+    graph = create_random_graph(60, 75, seed=50)
+    base = len(connected_components(graph))
+    for name in articulation_points(graph):
+        rest = [Vertex(v.name, {c: e for c, e in v.children.items() if c != name})
+                for v in graph.get_vertices() if v.name != name]
+        assert len(connected_components(Graph(rest))) > base
+
+    print("✓ Articulation points and bridges test passed")
+
+
+def test_biconnected_components():
+    """Test biconnected components, including a path too deep for recursion"""
+    print("Testing biconnected components...")
+    graph = make_undirected([('A', 'B'), ('B', 'C'), ('C', 'A'), ('C', 'D'), ('D', 'E'),
+                             ('E', 'C'), ('E', 'F'), ('F', 'G')], isolated=['H'])
+    blocks = sorted(biconnected_components(graph))
+    assert blocks == [['A', 'B', 'C'], ['C', 'D', 'E'], ['E', 'F'], ['F', 'G']]
+
+    # 20000 vertices in a line would overflow a recursive DFS
+    n = 20000
+    names = [f"P{i:05d}" for i in range(n)]
+    path = CSRGraph.from_graph(make_undirected(zip(names, names[1:])))
+    assert path.articulation_points() == names[1:-1]
+    assert len(path.bridges()) == n - 1
+    assert len(path.biconnected_components()) == n - 1
+    assert path.components() == [names]
+
+    print("✓ Biconnected components test passed")
+
+
 # ============================================================================
 # RUN ALL TESTS
 # ============================================================================
@@ -579,6 +1345,12 @@ def run_all_comprehensive_tests():
     test_unionfind_reverse_order()
     test_unionfind_single_element()
     test_unionfind_star_pattern()
+    test_unionfind_deep_chain()
+    test_array_unionfind()
+    test_named_unionfind_matches_unionfind()
+    test_vectorized_components()
+    test_rollback_unionfind()
+    test_offline_connectivity()
     print()
     
     # Kruskal's advanced tests
@@ -612,6 +1384,8 @@ def run_all_comprehensive_tests():
     test_single_vertex_no_edges()
     test_very_large_weights()
     test_fractional_weights()
+    test_edge_list_cache()
+    test_vertex_iteration_views()
     print()
     
     # Stress tests
@@ -620,10 +1394,54 @@ def run_all_comprehensive_tests():
     test_stress_kruskal()
     test_stress_prim()
     print()
+
+    # Boruvka
+    print("--- BORUVKA TESTS ---")
+    test_boruvka_matches_kruskal()
+    print()
+
+    # Filter-Kruskal
+    print("--- FILTER-KRUSKAL TESTS ---")
+    test_filter_kruskal_matches_kruskal()
+    test_kruskal_sorted_stream_stops_early()
+    print()
+
+    # Dynamic MST
+    print("--- DYNAMIC MST TESTS ---")
+    test_dynamic_mst_matches_recompute()
+    test_dynamic_mst_cycle_replacement()
+    test_streaming_mst_matches_kruskal()
+    print()
+
+    # Binary snapshots
+    print("--- BINARY SNAPSHOT TESTS ---")
+    test_snapshot_round_trip()
+    test_snapshot_find_path()
+    test_import_edge_list()
+    test_import_edge_list_headers()
+    print()
+
+    # Graph mutations
+    print("--- GRAPH MUTATION TESTS ---")
+    test_graph_mutation_api()
+    test_dynamic_mst_refresh()
+    print()
+
+    # Profiling counters
+    print("--- PROFILING COUNTER TESTS ---")
+    test_op_counters()
+    test_code_from_a1_is_identical()
+    print()
+
+    # Graph analytics
+    print("--- GRAPH ANALYTICS TESTS ---")
+    test_articulation_points_and_bridges()
+    test_biconnected_components()
+    print()
     
     print("=" * 80)
     print("ALL COMPREHENSIVE TESTS PASSED! ✓")
-    print("Total: 29 additional tests")
+    print("Total: 53 additional tests")
     print("=" * 80)
 
 
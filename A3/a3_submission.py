@@ -1,3 +1,7 @@
+import time
+from bisect import bisect_left, bisect_right
+
+
 class Queue:
     """
     A priority-based queue implemented using a binary min-heap.
@@ -28,13 +32,15 @@ class Queue:
 
     Args:
     cap (int): The initial capacity of the queue.
+    metrics (TowerMetrics): Optional, counts heap pushes, pops and swaps.
 
     Returns:
     None
     """
-    def __init__(self, cap):
+    def __init__(self, cap, metrics=None):
         self.cap = cap
         self.heap = []
+        self.metrics = metrics
 
     def add(self, obj, pri):
         """
@@ -62,6 +68,11 @@ class Queue:
             # print(currentIndex)
             self.heap[(currentIndex-1)//2], self.heap[currentIndex] = self.heap[currentIndex], self.heap[(currentIndex-1)//2]
             currentIndex = (currentIndex-1)//2
+
+        if self.metrics is not None:
+            # every swap moves the node up one level, so count levels instead of swaps
+            self.metrics.heap_pushes += 1
+            self.metrics.heap_swaps += len(self.heap).bit_length() - (currentIndex+1).bit_length()
         
 
     def pop(self):
@@ -83,6 +94,9 @@ class Queue:
         if len(self.heap) == 0:
             return None
 
+        if self.metrics is not None:
+            self.metrics.heap_pops += 1
+
         # swap the last and root node
         self.heap[-1], self.heap[0] = self.heap[0], self.heap[-1]
         root = self.heap.pop()
@@ -120,15 +134,507 @@ class Queue:
                 # rightChild = None
                 break
 
+        if self.metrics is not None:
+            # the node sank from the root to the depth it stopped at
+            self.metrics.heap_swaps += (currentIndex+1).bit_length() - 1
+
         return root
 
 
-class Tower:
+class LatencyHistogram:
+    """
+    A log-linear (HDR-style) histogram of non-negative integer values.
+
+    Values below 2**precision are counted exactly. Larger values share a
+    bucket with every value that agrees on their top `precision` bits, so
+    the relative error of any reported value is below 2**(1 - precision)
+    while the number of buckets only grows with log(max value).
+
+    Args:
+    precision (int): The number of significant bits kept per value.
+    """
+    def __init__(self, precision=5):
+        self.precision = precision
+        self.sub_count = 1 << precision
+        self.half_count = self.sub_count >> 1
+        self.counts = {}  # keyed by bucket index, value is the number of samples
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def bucket_index(self, value):
+        """
+        Return the bucket index holding value.
+
+        Args:
+        value (int): A non-negative sample.
+
+        Returns:
+        int: The bucket index.
+        """
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.precision
+        return self.sub_count + (shift - 1) * self.half_count + (value >> shift) - self.half_count
+
+    def bucket_upper(self, index):
+        """
+        Return the largest value that maps to the bucket at index.
+
+        Args:
+        index (int): A bucket index.
+
+        Returns:
+        int: The highest value equivalent to the bucket.
+        """
+        if index < self.sub_count:
+            return index
+        shift = (index - self.sub_count) // self.half_count + 1
+        mantissa = (index - self.sub_count) % self.half_count + self.half_count
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        """
+        Record one sample.
+
+        Args:
+        value (int): The sample to record. Negative values are clamped to 0.
+        """
+        if value < 0:
+            value = 0
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, pct):
+        """
+        Return the value at the given percentile.
+
+        Args:
+        pct (float): A percentile between 0 and 100.
+
+        Returns:
+        int: The highest value equivalent to the bucket containing the
+            percentile (or None if nothing was recorded).
+        """
+        if self.count == 0:
+            return None
+        # rank of the sample we are looking for, counting from 1
+        rank = max(1, int(pct / 100 * self.count + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_upper(index), self.max)
+        return self.max
+
+    def snapshot(self):
+        """
+        Return a summary of the histogram as plain data.
+
+        Returns:
+        dict: count, min, max, mean and the p50/p90/p99/p999 values.
+        """
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p999": self.percentile(99.9),
+        }
+
+
+class TowerMetrics:
+    """
+    Telemetry collected by a Tower while it processes packets.
+
+    A Tower only touches its metrics object when one was given to it, so a
+    Tower created without metrics pays nothing but a None check per tick.
+
+    Args:
+    precision (int): The number of significant bits kept by the histograms.
+    sinks (list): Callables that flush() hands the snapshot to, e.g. print or
+        a function that forwards it to a monitoring system.
+    """
+    def __init__(self, precision=5, sinks=()):
+        self.precision = precision
+        self.sinks = list(sinks)
+        self.reset()
+
+    def reset(self):
+        """
+        Clear every counter, gauge and histogram.
+        """
+        self.ticks = 0
+        self.packets_received = 0
+        self.acks_received = 0
+        self.packets_sent = 0
+        self.packets_acked = 0
+        self.retransmissions = 0
+        self.packets_dropped = 0
+        self.retransmissions_last_tick = 0
+        self.max_retransmissions_per_tick = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        # operation counts, for finding where process() spends its time
+        self.heap_pushes = 0
+        self.heap_pops = 0
+        self.heap_swaps = 0
+        self.timeout_checks = 0
+        self.first_seen = {}  # keyed by packet_id, value is the tick the packet reached the tower
+        self.end_to_end_latency = LatencyHistogram(self.precision)
+        self.ack_latency = LatencyHistogram(self.precision)
+        self.retransmissions_per_tick = LatencyHistogram(self.precision)
+        self.process_time_ns = LatencyHistogram(self.precision)
+
+    def packet_arrived(self, packet_id, now):
+        """
+        Record that a data packet reached the tower.
+
+        Args:
+        packet_id (object): The id of the packet.
+        now (int): The tick the packet arrived on.
+        """
+        self.packets_received += 1
+        # a resent copy of a packet keeps its original arrival time
+        if packet_id not in self.first_seen:
+            self.first_seen[packet_id] = now
+
+    def packet_acked(self, packet_id, sent_time, now):
+        """
+        Record that an in-flight packet was acknowledged.
+
+        Args:
+        packet_id (object): The id of the packet.
+        sent_time (int): The tick the packet was last sent on.
+        now (int): The tick the ack arrived on.
+        """
+        self.packets_acked += 1
+        self.ack_latency.record(now - sent_time)
+        arrived = self.first_seen.pop(packet_id, None)
+        if arrived is not None:
+            self.end_to_end_latency.record(now - arrived)
+
+    def end_tick(self, queue_depth, in_flight, sent, retransmitted, elapsed_ns):
+        """
+        Record the gauges and per-tick counters at the end of a process() call.
+
+        Args:
+        queue_depth (int): The number of packets waiting in the queue.
+        in_flight (int): The number of sent packets waiting for an ack.
+        sent (int): The number of packets sent this tick.
+        retransmitted (int): The number of packets re-queued this tick.
+        elapsed_ns (int): The wall time of the process() call in nanoseconds.
+        """
+        self.ticks += 1
+        self.packets_sent += sent
+        self.retransmissions += retransmitted
+        self.retransmissions_last_tick = retransmitted
+        self.max_retransmissions_per_tick = max(self.max_retransmissions_per_tick, retransmitted)
+        self.retransmissions_per_tick.record(retransmitted)
+        self.queue_depth = queue_depth
+        self.max_queue_depth = max(self.max_queue_depth, queue_depth)
+        self.in_flight = in_flight
+        self.max_in_flight = max(self.max_in_flight, in_flight)
+        self.process_time_ns.record(elapsed_ns)
+
+    def snapshot(self):
+        """
+        Export the current metrics as plain, JSON-serialisable data.
+
+        Returns:
+        dict: The counters, gauges and histogram summaries.
+        """
+        return {
+            "ticks": self.ticks,
+            "counters": {
+                "packets_received": self.packets_received,
+                "acks_received": self.acks_received,
+                "packets_sent": self.packets_sent,
+                "packets_acked": self.packets_acked,
+                "retransmissions": self.retransmissions,
+                "packets_dropped": self.packets_dropped,
+            },
+            "operations": {
+                "heap_pushes": self.heap_pushes,
+                "heap_pops": self.heap_pops,
+                "heap_swaps": self.heap_swaps,
+                "timeout_checks": self.timeout_checks,
+            },
+            "gauges": {
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "retransmissions_last_tick": self.retransmissions_last_tick,
+                "max_retransmissions_per_tick": self.max_retransmissions_per_tick,
+            },
+            "histograms": {
+                "end_to_end_latency": self.end_to_end_latency.snapshot(),
+                "ack_latency": self.ack_latency.snapshot(),
+                "retransmissions_per_tick": self.retransmissions_per_tick.snapshot(),
+                "process_time_ns": self.process_time_ns.snapshot(),
+            },
+        }
+
+    def flush(self):
+        """
+        Hand a snapshot to every sink, then reset.
+
+        Returns:
+        dict: The snapshot that was sent.
+        """
+        snap = self.snapshot()
+        for sink in self.sinks:
+            sink(snap)
+        # first_seen tracks packets still in flight, so it survives the reset
+        first_seen = self.first_seen
+        self.reset()
+        self.first_seen = first_seen
+        return snap
+
+
+class RetransmissionTimer:
+    """
+    An adaptive retransmission timeout (RTO) estimator in the style of
+    RFC 6298.
+
+    The timer keeps a smoothed round trip time (srtt) and its variance
+    (rttvar) from acks of packets that were only sent once (Karn's rule),
+    and derives rto = srtt + k * rttvar. Each retransmission of the same
+    packet doubles its timeout, and a packet is given up on once it has
+    been retransmitted max_retries times.
+
+    Args:
+    alpha (float): The gain used to update srtt.
+    beta (float): The gain used to update rttvar.
+    k (float): The weight of rttvar in the timeout.
+    min_rto (int): The smallest timeout ever used.
+    max_rto (int): The largest timeout ever used, including backoff.
+    max_retries (int): The number of retransmissions before a packet is dropped.
+    initial_rto (int): The timeout before any RTT sample exists. If None,
+        the packet's own ack_time_tolerance is used.
+    """
+    def __init__(self, alpha=0.125, beta=0.25, k=4, min_rto=1, max_rto=64, max_retries=5, initial_rto=None):
+        self.alpha = alpha
+        self.beta = beta
+        self.k = k
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.max_retries = max_retries
+        self.srtt = None
+        self.rttvar = None
+        self.rto = initial_rto
+
+    def observe(self, rtt):
+        """
+        Update the estimator with a new round trip time sample.
+
+        Args:
+        rtt (int): The number of ticks between sending a packet and its ack.
+        """
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - self.beta) * self.rttvar + self.beta * abs(self.srtt - rtt)
+            self.srtt = (1 - self.alpha) * self.srtt + self.alpha * rtt
+        self.rto = min(self.max_rto, max(self.min_rto, self.srtt + self.k * self.rttvar))
+
+    def on_timeout(self, timeout):
+        """
+        Back off the base timeout after an expiry that happened before any
+        RTT sample was taken, so later packets get a chance to produce one.
+
+        Args:
+        timeout (float): The timeout that just expired.
+        """
+        if self.srtt is None:
+            self.rto = min(self.max_rto, 2 * max(self.min_rto, timeout))
+
+    def timeout(self, packet, retries):
+        """
+        Return the timeout for a packet that has been retransmitted retries times.
+
+        Args:
+        packet (object): The in-flight packet.
+        retries (int): The number of times the packet has already been retransmitted.
+
+        Returns:
+        float: The number of ticks to wait for an ack before retransmitting.
+        """
+        base = self.rto if self.rto is not None else packet.ack_time_tolerance
+        return min(self.max_rto, max(self.min_rto, base) * (1 << retries))
+
+
+class AckIndex:
+    """
+    An ordered index of in-flight packets by (flow_id, seq), so that
+    cumulative acks and SACK ranges can be applied with a bisect and a
+    slice instead of one lookup per acknowledged packet.
+
+    Each flow keeps two parallel lists sorted by sequence number: the
+    sequence numbers themselves and the matching packet ids.
+    """
     def __init__(self):
+        self.flows = {}  # keyed by flow_id, value is (seqs, packet_ids)
+
+    def add(self, flow_id, seq, packet_id):
+        """
+        Index an in-flight packet.
+
+        Args:
+        flow_id (object): The flow the packet belongs to.
+        seq (int): The packet's sequence number within its flow.
+        packet_id (object): The id of the packet.
+        """
+        flow = self.flows.get(flow_id)
+        if flow is None:
+            self.flows[flow_id] = ([seq], [packet_id])
+            return
+        seqs, packet_ids = flow
+        if not seqs or seq > seqs[-1]:
+            # packets are usually sent in order, so appending is the common case
+            seqs.append(seq)
+            packet_ids.append(packet_id)
+        else:
+            i = bisect_right(seqs, seq)
+            seqs.insert(i, seq)
+            packet_ids.insert(i, packet_id)
+
+    def remove(self, flow_id, seq):
+        """
+        Remove one packet from the index, if it is there.
+
+        Args:
+        flow_id (object): The flow the packet belongs to.
+        seq (int): The packet's sequence number within its flow.
+        """
+        flow = self.flows.get(flow_id)
+        if flow is None:
+            return
+        seqs, packet_ids = flow
+        i = bisect_left(seqs, seq)
+        if i < len(seqs) and seqs[i] == seq:
+            del seqs[i]
+            del packet_ids[i]
+        if not seqs:
+            del self.flows[flow_id]
+
+    def pop_range(self, flow_id, lo, hi):
+        """
+        Remove and return every indexed packet with lo <= seq <= hi.
+
+        Args:
+        flow_id (object): The flow to search.
+        lo (int): The first sequence number in the range (None for no lower bound).
+        hi (int): The last sequence number in the range.
+
+        Returns:
+        List[object]: The ids of the removed packets, in sequence order.
+        """
+        flow = self.flows.get(flow_id)
+        if flow is None:
+            return []
+        seqs, packet_ids = flow
+        i = 0 if lo is None else bisect_left(seqs, lo)
+        j = bisect_right(seqs, hi, i)
+        if i == j:
+            return []
+        popped = packet_ids[i:j]
+        del seqs[i:j]
+        del packet_ids[i:j]
+        if not seqs:
+            del self.flows[flow_id]
+        return popped
+
+
+class Tower:
+    def __init__(self, metrics=None, rto=None):
         # Initialize any internal state here
         self.in_flight = {}  # keyed by packet_id, value is (sent_time, packet)
         self.time = 0
-        self.queue = Queue(10)
+        # optional TowerMetrics, None disables instrumentation entirely
+        self.metrics = metrics
+        self.queue = Queue(10, metrics)
+        # optional RetransmissionTimer, None keeps the fixed ack_time_tolerance timeout
+        self.rto = rto
+        self.retries = {}  # keyed by packet_id, value is the number of retransmissions so far
+        # in-flight packets that carry a flow_id and seq, ordered for range acks
+        self.ack_index = AckIndex()
+
+    def acknowledge(self, packet_id):
+        """
+        Mark one in-flight packet as acknowledged.
+
+        Args:
+        packet_id (object): The id of the acknowledged packet.
+
+        Returns:
+        bool: True if the packet was in flight, False otherwise.
+        """
+        entry = self.in_flight.pop(packet_id, None)
+        if entry is None:
+            return False
+        sent_time, packet = entry
+        seq = getattr(packet, "seq", None)
+        if seq is not None:
+            self.ack_index.remove(getattr(packet, "flow_id", None), seq)
+        if self.rto is not None:
+            # Karn's rule: only packets sent exactly once give an unambiguous RTT
+            if self.retries.pop(packet_id, 0) == 0:
+                self.rto.observe(self.time - sent_time)
+        if self.metrics is not None:
+            self.metrics.packet_acked(packet_id, sent_time, self.time)
+        return True
+
+    def acknowledge_ranges(self, flow_id, cumulative_ack=None, sack_ranges=()):
+        """
+        Acknowledge every in-flight packet of a flow covered by a cumulative
+        ack and/or a list of selective (SACK) ranges.
+
+        Args:
+        flow_id (object): The flow the ack refers to.
+        cumulative_ack (int): Every packet with seq <= cumulative_ack is
+            acknowledged (None for no cumulative part).
+        sack_ranges (Iterable[Tuple[int, int]]): Inclusive (first, last)
+            sequence number ranges that were received.
+
+        Returns:
+        int: The number of in-flight packets that were acknowledged.
+        """
+        packet_ids = []
+        if cumulative_ack is not None:
+            packet_ids.extend(self.ack_index.pop_range(flow_id, None, cumulative_ack))
+        for lo, hi in sack_ranges:
+            packet_ids.extend(self.ack_index.pop_range(flow_id, lo, hi))
+
+        in_flight = self.in_flight
+        rto = self.rto
+        metrics = self.metrics
+        now = self.time
+        acked = 0
+        for packet_id in packet_ids:
+            entry = in_flight.pop(packet_id, None)
+            if entry is None:
+                continue
+            acked += 1
+            if rto is not None and self.retries.pop(packet_id, 0) == 0:
+                rto.observe(now - entry[0])
+            if metrics is not None:
+                metrics.packet_acked(packet_id, entry[0], now)
+        return acked
 
     def process(self, new_packets):
         """
@@ -152,6 +658,11 @@ class Tower:
         }
 
 
+        metrics = self.metrics
+        if metrics is not None:
+            start_ns = time.perf_counter_ns()
+            retransmitted = 0
+
         # Step 1: advance time
         self.time += 1
 
@@ -169,24 +680,64 @@ class Tower:
             if packet.packet_type != "ack":
                 priority = packet_type_processing_times[packet.packet_type] + packet.ack_time_tolerance
                 self.queue.add(packet, -1 * priority)
+                if metrics is not None:
+                    metrics.packet_arrived(packet.packet_id, self.time)
             else:
                 acked_packets.append(packet)
-                self.in_flight.pop(packet.packet_id, None)
-        
+                if metrics is not None:
+                    metrics.acks_received += 1
+                cumulative_ack = getattr(packet, "cumulative_ack", None)
+                sack_ranges = getattr(packet, "sack_ranges", None)
+                if cumulative_ack is not None or sack_ranges:
+                    # one ack covering many packets of a flow
+                    self.acknowledge_ranges(getattr(packet, "flow_id", None), cumulative_ack, sack_ranges or ())
+                else:
+                    self.acknowledge(packet.packet_id)
+
         # send the packet
         popped_packet = self.queue.pop()
         if popped_packet is not None:
             sent_packets.append(popped_packet.obj)
             self.in_flight[popped_packet.obj.packet_id] = (self.time, popped_packet.obj)
+            seq = getattr(popped_packet.obj, "seq", None)
+            if seq is not None:
+                self.ack_index.add(getattr(popped_packet.obj, "flow_id", None), seq, popped_packet.obj.packet_id)
 
         # check for expired packets and resend them
+        if metrics is not None:
+            metrics.timeout_checks += len(self.in_flight)
         for packet_id in list(self.in_flight.keys()):
             sent_time, packet = self.in_flight[packet_id]
 
+            if self.rto is None:
+                timeout = packet.ack_time_tolerance
+            else:
+                timeout = self.rto.timeout(packet, self.retries.get(packet_id, 0))
+
             # if expired we resend it
-            if self.time - sent_time > packet.ack_time_tolerance:
+            if self.time - sent_time > timeout:
                 self.in_flight.pop(packet_id)
+                seq = getattr(packet, "seq", None)
+                if seq is not None:
+                    self.ack_index.remove(getattr(packet, "flow_id", None), seq)
+                if self.rto is not None:
+                    self.rto.on_timeout(timeout)
+                    retries = self.retries.get(packet_id, 0) + 1
+                    if retries > self.rto.max_retries:
+                        # give up on the packet instead of flooding the queue with it
+                        self.retries.pop(packet_id, None)
+                        if metrics is not None:
+                            metrics.packets_dropped += 1
+                            metrics.first_seen.pop(packet_id, None)
+                        continue
+                    self.retries[packet_id] = retries
                 priority = packet_type_processing_times[packet.packet_type] + packet.ack_time_tolerance
                 self.queue.add(packet, -1 * priority)
+                if metrics is not None:
+                    retransmitted += 1
+
+        if metrics is not None:
+            metrics.end_tick(len(self.queue.heap), len(self.in_flight), len(sent_packets),
+                             retransmitted, time.perf_counter_ns() - start_ns)
 
         return read_packets, sent_packets, acked_packets
\ No newline at end of file
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Goodput benchmark: fixed ack_time_tolerance timeouts vs RetransmissionTimer.
+
+A Tower sends at most one packet per tick over a simulated link that drops
+packets and acks with probability `loss` and delays each direction by
+`delay` plus up to `jitter` ticks. Goodput is the number of distinct packets
+that reached the receiver per tick.
+
+Usage:
+    python bench_tower.py [--ticks N] [--rate R] [--seed S]
+"""
+import argparse
+import random
+
+from a3_submission import Tower, TowerMetrics, RetransmissionTimer
+
+
+PACKET_TYPES = ["text", "picture", "audio", "video"]
+
+
+class Packet:
+    def __init__(self, packet_id, packet_type, ack_time_tolerance):
+        self.packet_id = packet_id
+        self.packet_type = packet_type
+        self.ack_time_tolerance = ack_time_tolerance
+
+
+def simulate(tower, ticks, rate, loss, delay, jitter, tolerance, seed):
+    """
+    Run one simulation and return (goodput, transmissions per delivered packet, metrics snapshot).
+    """
+    rng = random.Random(seed)
+    next_id = 0
+    arrivals = {}  # keyed by tick, value is the list of packets reaching the tower that tick
+    delivered = set()
+    transmissions = 0
+
+    for tick in range(1, ticks + 1):
+        new_packets = arrivals.pop(tick, [])
+        # offered load from the application
+        if rng.random() < rate:
+            new_packets.append(Packet(next_id, rng.choice(PACKET_TYPES), tolerance))
+            next_id += 1
+
+        _, sent_packets, _ = tower.process(new_packets)
+
+        for packet in sent_packets:
+            transmissions += 1
+            if rng.random() < loss:
+                continue
+            delivered.add(packet.packet_id)
+            # the receiver acks every copy it sees
+            if rng.random() < loss:
+                continue
+            rtt = 2 * delay + rng.randint(0, jitter) + rng.randint(0, jitter)
+            arrivals.setdefault(tick + rtt, []).append(Packet(packet.packet_id, "ack", 0))
+
+    goodput = len(delivered) / ticks
+    cost = transmissions / len(delivered) if delivered else float("inf")
+    return goodput, cost, tower.metrics.snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=20000)
+    parser.add_argument("--rate", type=float, default=0.7, help="new packets offered per tick")
+    parser.add_argument("--delay", type=int, default=3, help="one-way link delay in ticks")
+    parser.add_argument("--jitter", type=int, default=2, help="extra random delay per direction")
+    parser.add_argument("--tolerance", type=int, default=4, help="ack_time_tolerance of every packet")
+    parser.add_argument("--seed", type=int, default=263)
+    args = parser.parse_args()
+
+    print(f"{'loss':>6} {'mode':>9} {'goodput':>8} {'tx/pkt':>7} {'retx':>7} {'dropped':>8} {'e2e p50':>8} {'e2e p99':>8} {'max queue':>9}")
+    for loss in (0.0, 0.05, 0.1, 0.2, 0.3):
+        for mode in ("fixed", "adaptive"):
+            rto = RetransmissionTimer() if mode == "adaptive" else None
+            tower = Tower(metrics=TowerMetrics(), rto=rto)
+            goodput, cost, snap = simulate(tower, args.ticks, args.rate, loss, args.delay,
+                                           args.jitter, args.tolerance, args.seed)
+            e2e = snap["histograms"]["end_to_end_latency"]
+            print(f"{loss:>6.2f} {mode:>9} {goodput:>8.3f} {cost:>7.2f} "
+                  f"{snap['counters']['retransmissions']:>7} {snap['counters']['packets_dropped']:>8} "
+                  f"{e2e['p50']!s:>8} {e2e['p99']!s:>8} {snap['gauges']['max_queue_depth']:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from a3_submission import Queue, Tower
+from a3_submission import Queue, Tower, TowerMetrics, LatencyHistogram, RetransmissionTimer
 
 print("=== COMPLEX QUEUE STRESS TEST ===")
 q = Queue(20)
@@ -51,4 +51,135 @@ while True:
         print("Queue empty.")
         break
     print(f"Removed: ({removed.obj}, {removed.pri}) | New heap: {[(n.obj, n.pri) for n in q.heap]}")
-    
\ No newline at end of file
+    
+
+
+class Packet:
+    def __init__(self, packet_id, packet_type, ack_time_tolerance):
+        self.packet_id = packet_id
+        self.packet_type = packet_type
+        self.ack_time_tolerance = ack_time_tolerance
+
+
+print("\n=== Testing Latency Histogram ===")
+h = LatencyHistogram(precision=5)
+for value in range(1, 1001):
+    h.record(value)
+summary = h.snapshot()
+print(f"Histogram summary: {summary}")
+assert summary["count"] == 1000 and summary["min"] == 1 and summary["max"] == 1000
+# relative error is bounded by the precision
+assert abs(summary["p50"] - 500) <= 500 / 16
+assert abs(summary["p99"] - 990) <= 990 / 16
+
+print("\n=== Testing Tower Metrics ===")
+metrics = TowerMetrics()
+tower = Tower(metrics=metrics)
+tower.process([Packet(1, "text", 5), Packet(2, "video", 5)])   # tick 1: sends 1
+tower.process([])                                               # tick 2: sends 2
+tower.process([Packet(1, "ack", 0)])                            # tick 3: ack for 1
+for _ in range(6):
+    tower.process([])                                           # packet 2 times out
+snap = metrics.snapshot()
+print(f"Metrics snapshot: {snap}")
+assert snap["ticks"] == 9
+assert snap["counters"]["packets_received"] == 2
+assert snap["counters"]["packets_acked"] == 1
+assert snap["counters"]["retransmissions"] >= 1
+assert snap["histograms"]["ack_latency"]["max"] == 2
+assert snap["histograms"]["end_to_end_latency"]["max"] == 2
+assert Tower().metrics is None
+print("Tower metrics OK.")
+
+print("\n=== Testing Adaptive Retransmission ===")
+timer = RetransmissionTimer(max_retries=2)
+for rtt in (4, 4, 5, 4):
+    timer.observe(rtt)
+print(f"srtt={timer.srtt:.2f} rttvar={timer.rttvar:.2f} rto={timer.rto:.2f}")
+assert 4 <= timer.srtt <= 5
+assert timer.timeout(Packet(0, "text", 1), 1) == min(timer.max_rto, 2 * timer.rto)
+
+metrics = TowerMetrics()
+tower = Tower(metrics=metrics, rto=RetransmissionTimer(max_retries=2, max_rto=8))
+tower.process([Packet(7, "text", 1)])
+for _ in range(40):
+    tower.process([])                                           # never acked
+snap = metrics.snapshot()
+print(f"Retransmissions: {snap['counters']['retransmissions']}, dropped: {snap['counters']['packets_dropped']}")
+assert snap["counters"]["retransmissions"] == 2
+assert snap["counters"]["packets_dropped"] == 1
+assert len(tower.in_flight) == 0 and len(tower.queue.heap) == 0
+print("Adaptive retransmission OK.")
+
+print("\n=== Testing Cumulative and Selective Acks ===")
+
+
+class FlowPacket(Packet):
+    def __init__(self, packet_id, flow_id, seq, packet_type="text", ack_time_tolerance=50):
+        super().__init__(packet_id, packet_type, ack_time_tolerance)
+        self.flow_id = flow_id
+        self.seq = seq
+
+
+class RangeAck(Packet):
+    def __init__(self, flow_id, cumulative_ack=None, sack_ranges=()):
+        super().__init__(None, "ack", 0)
+        self.flow_id = flow_id
+        self.cumulative_ack = cumulative_ack
+        self.sack_ranges = sack_ranges
+
+
+metrics = TowerMetrics()
+tower = Tower(metrics=metrics)
+tower.process([FlowPacket(f"a{seq}", "a", seq) for seq in range(10)] + [FlowPacket("b0", "b", 0)])
+for _ in range(10):
+    tower.process([])
+print(f"In flight before acks: {sorted(tower.in_flight)}")
+assert len(tower.in_flight) == 11
+
+tower.process([RangeAck("a", cumulative_ack=3, sack_ranges=[(6, 7)])])
+print(f"In flight after cumulative 3 + SACK 6-7: {sorted(tower.in_flight)}")
+assert sorted(tower.in_flight) == ["a4", "a5", "a8", "a9", "b0"]
+
+tower.process([Packet("a8", "ack", 0), RangeAck("a", cumulative_ack=9)])
+assert sorted(tower.in_flight) == ["b0"]
+assert "a" not in tower.ack_index.flows
+assert metrics.snapshot()["counters"]["packets_acked"] == 10
+assert metrics.snapshot()["counters"]["acks_received"] == 3
+
+# packets and acks without a flow_id all belong to one unnamed flow
+tower = Tower()
+unnamed = [FlowPacket(f"n{seq}", None, seq) for seq in range(3)]
+for packet in unnamed:
+    del packet.flow_id
+tower.process(unnamed)
+for _ in range(5):
+    tower.process([])
+ack = RangeAck(None, cumulative_ack=1)
+del ack.flow_id
+tower.process([ack])
+assert sorted(tower.in_flight) == ["n2"]
+print("Range acks OK.")
+
+print("\n=== Testing Operation Counters ===")
+flushed = []
+metrics = TowerMetrics(sinks=[flushed.append])
+q = Queue(10, metrics)
+for pri in range(1, 8):
+    q.add(pri, pri)                                             # every add bubbles to the root
+assert metrics.heap_pushes == 7
+assert metrics.heap_swaps == sum(k.bit_length() - 1 for k in range(1, 8))
+while q.pop() is not None:
+    pass
+assert metrics.heap_pops == 7
+
+tower = Tower(metrics=metrics)
+tower.process([Packet(1, "text", 5), Packet(2, "text", 5)])
+tower.process([])
+snap = metrics.flush()
+print(f"Operations: {snap['operations']}")
+assert flushed == [snap]
+assert snap["operations"]["heap_pushes"] == 9 and snap["operations"]["timeout_checks"] == 3
+assert metrics.heap_pushes == 0 and metrics.ticks == 0, "flush() should reset the counters"
+assert Queue(10).metrics is None
+print("Operation counters OK.")
@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Graph, MST and Queue hot paths of A1, A2 and A3.
+
+Every benchmark runs on seeded, generated inputs, so two runs with the same
+--seed and --sizes time exactly the same work. A size is the target number
+of undirected edges; each graph family picks its vertex count from it:
+
+    sparse    random graph with n = m / 4 (average degree about 8)
+    grid      square grid with about m edges
+    powerlaw  preferential attachment, 3 edges per new vertex
+    complete  the complete graph with about m edges
+
+The graph benchmarks are find_path (5 queries), find_paths (500 targets),
+k_paths (k=10),
+route_index_build and route_index_query (100 queries on a contraction
+hierarchy) and discover_network (A1), and
+kruskal_mst, prim_mst, UnionFind, and connected components and
+articulation points on a CSRGraph (A2), on each family. queue (A3's Queue)
+and tower (Tower.process over a simulated link) take m operations or ticks.
+Some of the A1 code is quadratic, so benchmarks have a largest size they
+run at (see MAX_SIZE); bigger sizes are reported as skipped.
+
+Results are printed as a table and can be written as JSON with --json. With
+--baseline, the run is compared against an earlier JSON file and the exit
+status is 1 if any benchmark got slower by more than --threshold.
+benchmarks/baseline.json is a reference run at the default sizes; timings
+only compare meaningfully on the machine that recorded them, so re-record it
+with --json when switching machines.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--sizes 1000,10000] [--only NAME,...]
+        [--families sparse,grid,...] [--repeat R] [--seed S]
+        [--json PATH] [--baseline PATH] [--threshold 0.2]
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+for folder in ("A1", "A2", "A3"):
+    sys.path.insert(0, os.path.join(ROOT, folder))
+
+import a1_submission as a1
+import a2_submission as a2
+import a3_submission as a3
+
+
+FAMILIES = ("sparse", "grid", "powerlaw", "complete")
+
+# largest size (in edges) each benchmark is run at
+MAX_SIZE = {
+    "find_path": 10 ** 6,
+    "find_paths": 10 ** 6,
+    "k_paths": 10 ** 5,
+    "route_index_build": 10 ** 3,
+    "route_index_query": 10 ** 4,
+    "discover_network": 10 ** 6,
+    "kruskal_mst": 10 ** 6,
+    "prim_mst": 10 ** 6,
+    "union_find": 10 ** 6,
+    "components": 10 ** 6,
+    "articulation": 10 ** 6,
+    "queue": 10 ** 6,
+    "tower": 10 ** 6,
+}
+
+
+# ----------------------------------------------------------------------
+# Seeded generators, all returning (n, [(u, v, weight), ...]) with int ids
+# ----------------------------------------------------------------------
+def gen_sparse(m, rng):
+    n = max(2, m // 4)
+    edges = set()
+    while len(edges) < m:
+        u, v = rng.randrange(n), rng.randrange(n)
+        if u != v:
+            edges.add((min(u, v), max(u, v)))
+    return n, [(u, v, float(rng.randint(1, 100))) for u, v in sorted(edges)]
+
+
+def gen_grid(m, rng):
+    side = max(2, math.isqrt(m // 2) + 1)
+    edges = []
+    for r in range(side):
+        for c in range(side):
+            x = r * side + c
+            if c + 1 < side:
+                edges.append((x, x + 1, float(rng.randint(1, 100))))
+            if r + 1 < side:
+                edges.append((x, x + side, float(rng.randint(1, 100))))
+    return side * side, edges
+
+
+def gen_powerlaw(m, rng, k=3):
+    # Barabasi-Albert: each new vertex attaches to k distinct vertices picked
+    # with probability proportional to their degree
+    n = max(k + 1, m // k)
+    edges = [(u, v, float(rng.randint(1, 100))) for u in range(k + 1) for v in range(u + 1, k + 1)]
+    ends = [x for u, v, _ in edges for x in (u, v)]
+    for x in range(k + 1, n):
+        targets = set()
+        while len(targets) < k:
+            targets.add(rng.choice(ends))
+        for t in targets:
+            edges.append((t, x, float(rng.randint(1, 100))))
+            ends.append(t)
+            ends.append(x)
+    return n, edges
+
+
+def gen_complete(m, rng):
+    n = max(2, math.isqrt(2 * m) + 1)
+    return n, [(u, v, float(rng.randint(1, 100))) for u in range(n) for v in range(u + 1, n)]
+
+
+GENERATORS = {"sparse": gen_sparse, "grid": gen_grid, "powerlaw": gen_powerlaw, "complete": gen_complete}
+
+
+def generate(family, size, seed):
+    # str seeds hash deterministically, unlike tuples
+    return GENERATORS[family](size, random.Random(f"{family}-{size}-{seed}"))
+
+
+def build_graph(module, n, edges):
+    """Builds module.Graph with every edge stored in both directions."""
+    names = [f"v{i}" for i in range(n)]
+    vertices = [module.Vertex(name) for name in names]
+    for u, v, weight in edges:
+        vertices[u].children[names[v]] = (names[u], names[v], weight)
+        vertices[v].children[names[u]] = (names[v], names[u], weight)
+    return module.Graph(vertices)
+
+
+# ----------------------------------------------------------------------
+# Benchmarks: setup(n, edges, rng) builds the input untimed and returns
+# the zero-argument callable that gets timed
+# ----------------------------------------------------------------------
+def setup_find_path(n, edges, rng):
+    graph = build_graph(a1, n, edges)
+    device = a1.Device("v0")
+    device.network = graph
+    targets = [f"v{rng.randrange(n)}" for _ in range(5)]
+
+    def run():
+        for target in targets:
+            device.find_path(target)
+    return run
+
+
+def setup_find_paths(n, edges, rng, targets=500):
+    graph = build_graph(a1, n, edges)
+    device = a1.Device("v0")
+    device.network = graph
+    names = [f"v{rng.randrange(n)}" for _ in range(targets)]
+
+    def run():
+        # start from scratch each time instead of reusing the last search
+        device.frontier = None
+        device.find_paths(names)
+    return run
+
+
+def setup_k_paths(n, edges, rng, k=10):
+    graph = build_graph(a1, n, edges)
+    device = a1.Device("v0")
+    device.network = graph
+    target = f"v{rng.randrange(1, n)}"
+    return lambda: device.find_k_paths(target, k)
+
+
+def setup_route_index_build(n, edges, rng):
+    graph = build_graph(a1, n, edges)
+    return lambda: a1.ContractionHierarchy(graph)
+
+
+def setup_route_index_query(n, edges, rng, queries=100):
+    graph = build_graph(a1, n, edges)
+    index = a1.ContractionHierarchy(graph)
+    pairs = [(f"v{rng.randrange(n)}", f"v{rng.randrange(n)}") for _ in range(queries)]
+
+    def run():
+        for source, target in pairs:
+            index.query(source, target)
+    return run
+
+
+def setup_discover_network(n, edges, rng):
+    adjacency = {}
+    for u, v, weight in edges:
+        adjacency.setdefault(f"v{u}", []).append((f"v{u}", f"v{v}", weight))
+        adjacency.setdefault(f"v{v}", []).append((f"v{v}", f"v{u}", weight))
+
+    def find_devices(path):
+        return adjacency.get(path[-1], [])
+
+    def run():
+        a1.Device("v0").discover_network(find_devices)
+    return run
+
+
+def setup_kruskal(n, edges, rng):
+    graph = build_graph(a2, n, edges)
+
+    def run():
+        # time the cold path, not the cached edge list
+        graph.touch()
+        a2.kruskal_mst(graph)
+    return run
+
+
+def setup_prim(n, edges, rng):
+    graph = build_graph(a2, n, edges)
+    return lambda: a2.prim_mst(graph)
+
+
+def setup_union_find(n, edges, rng):
+    names = [f"v{i}" for i in range(n)]
+    pairs = [(names[u], names[v]) for u, v, _ in edges]
+
+    def run():
+        uf = a2.UnionFind(names)
+        for x, y in pairs:
+            uf.union(x, y)
+        for x in names:
+            uf.find(x)
+    return run
+
+
+def setup_components(n, edges, rng):
+    csr = a2.CSRGraph.from_graph(build_graph(a2, n, edges))
+    return lambda: a2.connected_components(csr)
+
+
+def setup_articulation(n, edges, rng):
+    csr = a2.CSRGraph.from_graph(build_graph(a2, n, edges))
+    return lambda: a2.articulation_points(csr)
+
+
+def setup_queue(m, rng):
+    priorities = [rng.randrange(m) for _ in range(m)]
+
+    def run():
+        queue = a3.Queue(m)
+        for i, pri in enumerate(priorities):
+            queue.add(i, pri)
+        while queue.pop() is not None:
+            pass
+    return run
+
+
+class _Packet:
+    def __init__(self, packet_id, packet_type, ack_time_tolerance):
+        self.packet_id = packet_id
+        self.packet_type = packet_type
+        self.ack_time_tolerance = ack_time_tolerance
+
+
+def setup_tower(m, rng, loss=0.1, rtt=6, tolerance=8):
+    types = ["text", "picture", "audio", "video"]
+    # pre-roll the link so only Tower.process is timed
+    arrivals_at = [rng.random() < 0.7 for _ in range(m)]
+    lost = [rng.random() < loss for _ in range(4 * m)]
+    kinds = [rng.choice(types) for _ in range(m)]
+
+    def run():
+        tower = a3.Tower()
+        pending = {}
+        next_id = 0
+        coin = 0
+        for tick in range(m):
+            packets = pending.pop(tick, [])
+            if arrivals_at[tick]:
+                packets.append(_Packet(next_id, kinds[tick], tolerance))
+                next_id += 1
+            _, sent, _ = tower.process(packets)
+            for packet in sent:
+                coin = (coin + 1) % len(lost)
+                if not lost[coin]:
+                    pending.setdefault(tick + rtt, []).append(_Packet(packet.packet_id, "ack", 0))
+    return run
+
+
+GRAPH_BENCHMARKS = {
+    "find_path": setup_find_path,
+    "find_paths": setup_find_paths,
+    "k_paths": setup_k_paths,
+    "route_index_build": setup_route_index_build,
+    "route_index_query": setup_route_index_query,
+    "discover_network": setup_discover_network,
+    "kruskal_mst": setup_kruskal,
+    "prim_mst": setup_prim,
+    "union_find": setup_union_find,
+    "components": setup_components,
+    "articulation": setup_articulation,
+}
+OTHER_BENCHMARKS = {
+    "queue": setup_queue,
+    "tower": setup_tower,
+}
+
+
+def time_it(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes, families, only, repeat, seed):
+    results = []
+
+    def record(bench, family, size, n, m, run):
+        if size > MAX_SIZE[bench]:
+            entry = {"bench": bench, "family": family, "size": size, "skipped": True}
+        else:
+            best, median = time_it(run(), repeat)
+            entry = {"bench": bench, "family": family, "size": size, "n": n, "m": m,
+                     "best_s": best, "median_s": median}
+        results.append(entry)
+        print_row(entry)
+
+    for size in sizes:
+        for family in families:
+            wanted = [name for name in GRAPH_BENCHMARKS if only is None or name in only]
+            if not any(size <= MAX_SIZE[name] for name in wanted):
+                continue
+            n, edges = generate(family, size, seed)
+            for name in wanted:
+                setup = GRAPH_BENCHMARKS[name]
+                rng = random.Random(f"{name}-{family}-{size}-{seed}")
+                record(name, family, size, n, len(edges), lambda: setup(n, edges, rng))
+            del edges
+        for name, setup in OTHER_BENCHMARKS.items():
+            if only is None or name in only:
+                rng = random.Random(f"{name}-{size}-{seed}")
+                record(name, "-", size, None, size, lambda: setup(size, rng))
+    return results
+
+
+def print_row(entry):
+    if entry.get("skipped"):
+        print(f"{entry['bench']:<17} {entry['family']:<9} {entry['size']:>9} {'skipped':>10}")
+    else:
+        print(f"{entry['bench']:<17} {entry['family']:<9} {entry['size']:>9} "
+              f"{entry['best_s']:>10.4f} {entry['median_s']:>10.4f}")
+
+
+def key(entry):
+    return f"{entry['bench']}/{entry['family']}/{entry['size']}"
+
+
+def compare(results, baseline, threshold, min_time):
+    """Prints the change against baseline and returns the keys that regressed."""
+    old = {key(e): e for e in baseline["results"] if not e.get("skipped")}
+    regressions = []
+    print()
+    print(f"{'benchmark':<40} {'baseline s':>10} {'now s':>10} {'change':>8}")
+    for entry in results:
+        before = old.get(key(entry))
+        if before is None or entry.get("skipped"):
+            continue
+        change = entry["best_s"] / before["best_s"] - 1 if before["best_s"] > 0 else 0.0
+        flag = ""
+        # ignore timings too short to tell apart from noise
+        if change > threshold and max(before["best_s"], entry["best_s"]) >= min_time:
+            regressions.append(key(entry))
+            flag = "  REGRESSION"
+        print(f"{key(entry):<40} {before['best_s']:>10.4f} {entry['best_s']:>10.4f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="comma-separated edge counts")
+    parser.add_argument("--families", default=",".join(FAMILIES))
+    parser.add_argument("--only", default=None, help="comma-separated benchmark names")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=263)
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    parser.add_argument("--baseline", default=None, help="compare against this results file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown, 0.2 is 20%%")
+    parser.add_argument("--min-time", type=float, default=0.001,
+                        help="timings below this many seconds never count as regressions")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    families = args.families.split(",")
+    only = set(args.only.split(",")) if args.only else None
+    for family in families:
+        if family not in GENERATORS:
+            parser.error(f"unknown family {family!r}")
+    for name in only or ():
+        if name not in MAX_SIZE:
+            parser.error(f"unknown benchmark {name!r}")
+
+    print(f"{'benchmark':<17} {'family':<9} {'size':>9} {'best s':>10} {'median s':>10}")
+    results = run_suite(sizes, families, only, args.repeat, args.seed)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "sizes": sizes,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"].get("seed") != args.seed:
+            print("warning: baseline was recorded with a different seed")
+        regressions = compare(results, baseline, args.threshold, args.min_time)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())